@@ -0,0 +1,276 @@
+# address_normalizer.py
+import re
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import state_data
+from state_fuzzy import correct_state
+
+# ====== USPS Publication 28 abbreviations ======
+# Street suffixes (C1): full names and common variants -> standard abbreviation
+_SUFFIX_GROUPS = {
+    "ALY": "ALLEY ALLY", "AVE": "AVENUE AV AVEN AVENU AVN", "BLVD": "BOULEVARD BLV BOUL BOULV",
+    "BR": "BRANCH BRNCH", "BRG": "BRIDGE BRDGE", "CSWY": "CAUSEWAY CAUSWAY", "CTR": "CENTER CENTRE CNTR CENTR",
+    "CIR": "CIRCLE CIRC CRCL", "CT": "COURT CRT", "CV": "COVE", "CRK": "CREEK", "XING": "CROSSING CRSSNG",
+    "CYN": "CANYON CANYN", "DR": "DRIVE DRIV DRV", "ESTS": "ESTATES", "EXPY": "EXPRESSWAY EXPR EXPW EXPRESS",
+    "FRD": "FORD", "FRST": "FOREST FORESTS", "FWY": "FREEWAY FRWY", "GDNS": "GARDENS", "GRV": "GROVE",
+    "HBR": "HARBOR HARB", "HTS": "HEIGHTS HT", "HL": "HILL", "HOLW": "HOLLOW", "HWY": "HIGHWAY HIWAY HIWY HWAY",
+    "JCT": "JUNCTION JCTN", "LK": "LAKE", "LNDG": "LANDING", "LN": "LANE", "LOOP": "LOOPS", "MNR": "MANOR",
+    "MDWS": "MEADOWS", "MT": "MOUNT", "MTN": "MOUNTAIN MNTN", "ORCH": "ORCHARD", "PARK": "PARKS PRK",
+    "PKWY": "PARKWAY PARKWY PKWAY PKY", "PASS": "", "PATH": "PATHS", "PIKE": "PIKES", "PL": "PLACE",
+    "PLZ": "PLAZA PLZA", "PT": "POINT", "RNCH": "RANCH RANCHES", "RDG": "RIDGE", "RD": "ROAD",
+    "RTE": "ROUTE", "ROW": "", "RUN": "", "SHR": "SHORE", "SPGS": "SPRINGS", "SQ": "SQUARE SQR",
+    "STA": "STATION STATN", "ST": "STREET STRT STR", "SMT": "SUMMIT", "TER": "TERRACE TERR",
+    "TPKE": "TURNPIKE TRNPK", "TRL": "TRAIL TRAILS TRLS", "VLY": "VALLEY", "VW": "VIEW", "VLG": "VILLAGE VILL",
+    "WALK": "WALKS", "WAY": "WY",
+}
+STREET_SUFFIXES: Mapping[str, str] = MappingProxyType({
+    **{abbr: abbr for abbr in _SUFFIX_GROUPS},
+    **{variant: abbr for abbr, variants in _SUFFIX_GROUPS.items() for variant in variants.split()},
+})
+
+DIRECTIONALS: Mapping[str, str] = MappingProxyType({
+    "NORTH": "N", "SOUTH": "S", "EAST": "E", "WEST": "W",
+    "NORTHEAST": "NE", "NORTHWEST": "NW", "SOUTHEAST": "SE", "SOUTHWEST": "SW",
+    **{d: d for d in ("N", "S", "E", "W", "NE", "NW", "SE", "SW")},
+})
+
+# Secondary unit designators (C2)
+_UNIT_GROUPS = {
+    "APT": "APARTMENT", "STE": "SUITE", "UNIT": "", "BLDG": "BUILDING", "FL": "FLOOR", "RM": "ROOM",
+    "DEPT": "DEPARTMENT", "OFC": "OFFICE", "PH": "PENTHOUSE", "SPC": "SPACE", "TRLR": "TRAILER",
+    "LOT": "", "HNGR": "HANGAR", "BSMT": "BASEMENT", "FRNT": "FRONT", "REAR": "", "LBBY": "LOBBY",
+}
+UNIT_DESIGNATORS: Mapping[str, str] = MappingProxyType({
+    **{abbr: abbr for abbr in _UNIT_GROUPS},
+    **{variant: abbr for abbr, variants in _UNIT_GROUPS.items() for variant in variants.split()},
+})
+_UNIT_NO_NUMBER = frozenset(("BSMT", "FRNT", "REAR", "LBBY", "PH"))
+
+# ====== ZIP prefix (first 3 digits) ranges per state, for a consistency warning ======
+_ZIP3_RANGES: Mapping[str, Tuple[Tuple[int, int], ...]] = MappingProxyType({
+    "AL": ((350, 369),), "AK": ((995, 999),), "AZ": ((850, 865),), "AR": ((716, 729), (755, 755)),
+    "CA": ((900, 961),), "CO": ((800, 816),), "CT": ((60, 69),), "DE": ((197, 199),),
+    "DC": ((200, 205), (569, 569)), "FL": ((320, 349),), "GA": ((300, 319), (398, 399)),
+    "HI": ((967, 968),), "ID": ((832, 838),), "IL": ((600, 629),), "IN": ((460, 479),),
+    "IA": ((500, 528),), "KS": ((660, 679),), "KY": ((400, 427),), "LA": ((700, 714),),
+    "ME": ((39, 49),), "MD": ((206, 219),), "MA": ((10, 27), (55, 55)), "MI": ((480, 499),),
+    "MN": ((550, 567),), "MS": ((386, 397),), "MO": ((630, 658),), "MT": ((590, 599),),
+    "NE": ((680, 693),), "NV": ((889, 898),), "NH": ((30, 38),), "NJ": ((70, 89),),
+    "NM": ((870, 884),), "NY": ((5, 5), (63, 63), (100, 149)), "NC": ((270, 289),),
+    "ND": ((580, 588),), "OH": ((430, 459),), "OK": ((730, 749),), "OR": ((970, 979),),
+    "PA": ((150, 196),), "RI": ((28, 29),), "SC": ((290, 299),), "SD": ((570, 577),),
+    "TN": ((370, 385),), "TX": ((750, 799), (885, 885)), "UT": ((840, 847),), "VT": ((50, 59),),
+    "VA": ((201, 201), (220, 246)), "WA": ((980, 994),), "WV": ((247, 268),),
+    "WI": ((530, 549),), "WY": ((820, 831), (834, 834)),
+})
+
+# ====== Compiled patterns ======
+_PO_BOX = re.compile(
+    r"\b(?:P\s*\.?\s*O\s*\.?\s*(?:BOX\b|B\s*\.?\s*#?\s*\d+)|POST\s+OFFICE\s+BOX|POST\s+BOX|POB\s*#?\s*\d+|LOCK\s*BOX|BOX\s*#?\s*\d+)",
+    re.IGNORECASE,
+)
+_PMB = re.compile(r"\b(?:PMB|PRIVATE\s+MAIL\s*BOX)\b", re.IGNORECASE)
+_ZIP_TAIL = re.compile(r"(?:^|[\s,])(\d{5})(?:\s*-\s*(\d{4})|\s+(\d{4}))?\s*$")
+_BAD_ZIP_TAIL = re.compile(r"(?:^|[\s,])(\d{3,4}|\d{6,9}|\d{5}-\d{1,3})\s*$")
+_COUNTRY_TAIL = re.compile(r"[\s,]+(?:USA|U\s*S\s*A|US|U\s*S|UNITED\s+STATES(?:\s+OF\s+AMERICA)?)\s*$")
+_HOUSE_NUMBER = re.compile(r"^(?:\d+[A-Z]?(?:-\d+[A-Z]?)?|\d+\s*1/2)$")
+_SPLIT = re.compile(r"\s*(?:,|\n|;)\s*")
+
+
+def _err(code: str, message: str) -> Dict[str, str]:
+    return {"code": code, "message": message}
+
+
+class AddressNormalizer:
+    """
+    Deterministic US mailing-address parsing and USPS-style normalization.
+
+    Public methods used by the app:
+      - normalize(address) -> dict
+    """
+
+    @classmethod
+    def normalize(cls, address: str) -> Dict[str, Any]:
+        """
+        Returns a dict:
+          {
+            "valid": bool,
+            "normalized": "123 N MAIN ST APT 4B, SPRINGFIELD, IL 62701" | None,
+            "components": {"number", "street", "unit", "city", "state", "stateName", "zip"},
+            "errors": [{"code", "message"}, ...],     # every blocking problem at once
+            "warnings": [{"code", "message"}, ...]    # non-blocking (e.g. ZIP/state mismatch)
+          }
+        """
+        raw = (address or "").strip()
+        errors: List[Dict[str, str]] = []
+        warnings: List[Dict[str, str]] = []
+        comps: Dict[str, Optional[str]] = dict.fromkeys(
+            ("number", "street", "unit", "city", "state", "stateName", "zip")
+        )
+        if not raw:
+            errors.append(_err("address_missing", "Please provide a full mailing address (street, city, state, ZIP)."))
+            return cls._result(comps, errors, warnings)
+
+        if _PO_BOX.search(raw):
+            errors.append(_err("po_box_not_allowed", "PO Boxes can't be used; please provide a street address."))
+        if _PMB.search(raw):
+            errors.append(_err("pmb_not_allowed", "Private mailboxes (PMB) can't be used; please provide a street address."))
+
+        text = raw.upper().replace(".", "")
+        text = _COUNTRY_TAIL.sub("", text)
+
+        # ZIP (tail)
+        rest = text
+        m = _ZIP_TAIL.search(text)
+        if m:
+            comps["zip"] = m.group(1) + (f"-{m.group(2) or m.group(3)}" if (m.group(2) or m.group(3)) else "")
+            rest = text[:m.start(1)]
+        else:
+            bad = _BAD_ZIP_TAIL.search(text)
+            if bad:
+                errors.append(_err("zip_invalid", f"ZIP code '{bad.group(1)}' must be 5 digits (or ZIP+4, e.g. 12345-6789)."))
+                rest = text[:bad.start(1)]
+            else:
+                errors.append(_err("zip_missing", "Please include the 5-digit ZIP code."))
+
+        parts = [p for p in _SPLIT.split(rest.strip(" ,")) if p]
+
+        # State (tail of the remaining text)
+        state_code, parts = cls._take_state(parts)
+        if state_code:
+            comps["state"] = state_code
+            comps["stateName"] = state_data.STATE_CODE_TO_NAME[state_code]
+        else:
+            errors.append(_err("state_missing", "Please include the state (e.g. CA or California)."))
+
+        # City + street lines
+        street_tokens, city = cls._split_city(parts)
+        if city:
+            comps["city"] = city
+        else:
+            errors.append(_err("city_missing", "Please include the city (e.g. '123 Main St, Springfield, IL 62701')."))
+
+        number, street, unit = cls._parse_street(street_tokens)
+        comps.update(number=number, street=street, unit=unit)
+        if not number and not any(e["code"] in ("po_box_not_allowed", "pmb_not_allowed") for e in errors):
+            errors.append(_err("street_number_missing", "Please include the street number (e.g. '123 Main St')."))
+        if not street:
+            errors.append(_err("street_missing", "Please include the street name."))
+
+        if state_code and comps["zip"] and not cls._zip_matches_state(comps["zip"], state_code):
+            warnings.append(_err("zip_state_mismatch", f"ZIP {comps['zip'][:5]} is not usually in {comps['stateName']}; please double-check."))
+
+        return cls._result(comps, errors, warnings)
+
+    # ---------- internals ----------
+    @staticmethod
+    def _result(comps: Dict[str, Optional[str]], errors: List, warnings: List) -> Dict[str, Any]:
+        normalized = None
+        if not errors:
+            line1 = " ".join(x for x in (comps["number"], comps["street"], comps["unit"]) if x)
+            normalized = f"{line1}, {comps['city']}, {comps['state']} {comps['zip']}"
+        return {
+            "valid": not errors,
+            "normalized": normalized,
+            "components": comps,
+            "errors": errors,
+            "warnings": warnings,
+        }
+
+    @staticmethod
+    def _take_state(parts: List[str]) -> Tuple[Optional[str], List[str]]:
+        """Peel the state off the last part: longest exact alias of its trailing tokens wins."""
+        if not parts:
+            return None, parts
+        tokens = parts[-1].split()
+        for n in range(min(4, len(tokens)), 0, -1):
+            name = state_data.resolve_state(" ".join(tokens[-n:]))
+            if name:
+                code = state_data.STATES[state_data.state_index(name)][0]
+                remainder = " ".join(tokens[:-n])
+                rest = parts[:-1] + ([remainder] if remainder else [])
+                # "Washington DC" is also a DC alias: give its first token back as the city
+                # when nothing else is left for it (and the rest still names DC)
+                if (
+                    code == "DC" and n > 1
+                    and AddressNormalizer._split_city(rest)[1] is None
+                    and state_data.resolve_state(" ".join(tokens[-n + 1:]))
+                ):
+                    rest = parts[:-1] + [" ".join(tokens[:-n + 1])]
+                return code, rest
+        # A part that is only the state, misspelled ("Calfornia")
+        if len(parts) > 1:
+            name = correct_state(parts[-1])
+            if name:
+                return state_data.STATES[state_data.state_index(name)][0], parts[:-1]
+        return None, parts
+
+    @staticmethod
+    def _split_city(parts: List[str]) -> Tuple[List[str], Optional[str]]:
+        """Comma-separated: last part is the city. Otherwise the city follows the street suffix / unit."""
+        if len(parts) >= 2:
+            return " ".join(parts[:-1]).split(), parts[-1]
+        tokens = parts[0].split() if parts else []
+        cut = None
+        i = 1
+        while i < len(tokens):
+            tok = tokens[i]
+            if tok in UNIT_DESIGNATORS or tok.startswith("#"):
+                unit = UNIT_DESIGNATORS.get(tok)
+                step = 1 if (tok.startswith("#") and len(tok) > 1) or unit in _UNIT_NO_NUMBER else 2
+                cut = i + step
+                i += step
+                continue
+            if tok in STREET_SUFFIXES:
+                cut = i + 1
+                if i + 1 < len(tokens) and tokens[i + 1] in DIRECTIONALS:
+                    cut = i + 2
+            i += 1
+        if cut is None or cut >= len(tokens):
+            return tokens, None
+        return tokens[:cut], " ".join(tokens[cut:])
+
+    @staticmethod
+    def _parse_street(tokens: List[str]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        tokens = [t for t in tokens if t]
+        number = None
+        if tokens and _HOUSE_NUMBER.match(tokens[0]):
+            number = tokens.pop(0)
+            if tokens and tokens[0] == "1/2":
+                number += " " + tokens.pop(0)
+
+        # Split off the secondary unit ("APT 4B", "SUITE 200", "#12", "# 12")
+        unit = None
+        for i, tok in enumerate(tokens):
+            if i == 0:
+                continue
+            if tok.startswith("#"):
+                ident = tok[1:] or " ".join(tokens[i + 1:i + 2])
+                unit = f"# {ident}".strip()
+                tokens = tokens[:i]
+                break
+            if tok in UNIT_DESIGNATORS:
+                abbr = UNIT_DESIGNATORS[tok]
+                ident = " ".join(tokens[i + 1:i + 2]).lstrip("#")
+                unit = f"{abbr} {ident}".strip()
+                tokens = tokens[:i]
+                break
+
+        if not tokens:
+            return number, None, unit
+        # Pre-directional, suffix and post-directional only when a street name remains
+        out = list(tokens)
+        if len(out) > 1 and out[0] in DIRECTIONALS:
+            out[0] = DIRECTIONALS[out[0]]
+        if len(out) > 1 and out[-1] in DIRECTIONALS and out[-2] in STREET_SUFFIXES:
+            out[-1] = DIRECTIONALS[out[-1]]
+            out[-2] = STREET_SUFFIXES[out[-2]]
+        elif len(out) > 1 and out[-1] in STREET_SUFFIXES:
+            out[-1] = STREET_SUFFIXES[out[-1]]
+        return number, " ".join(out), unit
+
+    @staticmethod
+    def _zip_matches_state(zip_code: str, state_code: str) -> bool:
+        prefix = int(zip_code[:3])
+        return any(lo <= prefix <= hi for lo, hi in _ZIP3_RANGES.get(state_code, ()))
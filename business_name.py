@@ -0,0 +1,297 @@
+# business_name.py
+"""
+Legal-name rules for the LLC and Corp flows: designators and restricted words.
+
+Built once at import:
+  - DESIGNATORS: every accepted designator spelling per family, keyed by its
+    lowercase form ('L.L.C.' -> 'l.l.c'), with per-state allow-lists
+  - one suffix regex (strip a trailing designator) and one in-name regex per
+    family (catch 'Inc' inside an LLC name)
+  - one restricted-word regex per state (national list + state extras), so a
+    name check is a handful of regex scans instead of per-word lookups
+"""
+import re
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Pattern, Tuple
+
+from state_data import STATES, normalize_entity, state_index
+
+# ====== Designators ======
+# Strong forms identify the entity family wherever they appear; weak forms are
+# legal designators in some states but are ordinary words too ("Smith Company LLC").
+_STRONG: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "llc": ("Limited Liability Company", "Limited Liability Co.", "Ltd. Liability Company", "Ltd. Liability Co.",
+            "L.L.C.", "LLC"),
+    "corp": ("Corporation", "Incorporated", "Corp.", "Inc."),
+})
+_WEAK: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "llc": ("Limited Company", "Ltd. Co.", "L.C.", "LC"),
+    "corp": ("Company", "Limited", "Co.", "Ltd."),
+})
+# The options the chat offers (Step 1 of each flow)
+OFFERED: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "llc": ("LLC", "L.L.C.", "Limited Liability Company"),
+    "corp": ("Corporation", "Corp.", "Inc."),
+})
+# States that accept weak forms (LLC) or reject them (Corp); everything else uses the family default
+_LLC_WEAK_STATES = frozenset(("IA", "TX", "UT"))
+_CORP_NO_COMPANY_STATES = frozenset(("NY",))
+
+# ====== Restricted words ======
+# (spellings, approver); approval words warn, prohibited words block
+_APPROVAL: Tuple[Tuple[Tuple[str, ...], str], ...] = (
+    (("bank", "banking", "banker", "bancorp"), "the state banking regulator"),
+    (("trust", "trustee", "trust company"), "the state banking regulator"),
+    (("credit union",), "the state credit union regulator"),
+    (("insurance", "insurer", "reinsurance", "assurance", "underwriter"), "the state insurance department"),
+    (("university", "college"), "the state education department"),
+    (("engineer", "engineers", "engineering"), "the state engineering licensing board"),
+    (("architect", "architects", "architecture"), "the state architecture licensing board"),
+    (("attorney", "attorneys", "lawyer", "lawyers", "law firm", "legal services"), "the state bar"),
+    (("cpa", "certified public accountant", "certified public accountants"), "the state board of accountancy"),
+    (("olympic", "olympiad"), "the U.S. Olympic & Paralympic Committee"),
+    (("cooperative", "co-op"), "the state cooperative statute"),
+)
+_PROHIBITED: Tuple[str, ...] = (
+    "FBI", "Federal Bureau of Investigation", "CIA", "Central Intelligence Agency", "Secret Service",
+    "Department of Defense", "Pentagon", "Federal Reserve", "Department of the Treasury", "Treasury Department",
+    "United States Government", "U.S. Government",
+)
+_STATE_APPROVAL: Mapping[str, Tuple[Tuple[Tuple[str, ...], str], ...]] = MappingProxyType({
+    "NY": ((("acceptance", "annuity", "benefit", "bond", "casualty", "doctor", "endowment", "fidelity", "finance",
+             "guaranty", "indemnity", "investment", "loan", "mortgage", "savings", "surety", "title"),
+            "the NY Department of Financial Services"),
+           (("board of trade", "chamber of commerce"), "the NY Department of State")),
+    "CA": ((("trust company", "savings", "thrift"), "the CA Department of Financial Protection and Innovation"),),
+    "TX": ((("lottery", "lotto"), "the Texas Lottery Commission"),),
+})
+
+_WORD_EDGE_L, _WORD_EDGE_R = r"(?<![\w&])", r"(?![\w&])"
+MAX_NAME_LENGTH = 120
+
+
+def designator_key(form: Optional[str]) -> str:
+    """'L.L.C' -> 'l.l.c', ' Inc ' -> 'inc'; keeps inner dots so 'L.L.C.' and 'LLC' stay distinct choices."""
+    return re.sub(r"[^a-z.]", "", (form or "").lower()).rstrip(".")
+
+
+def _letters(phrase: str) -> str:
+    return re.sub(r"[^a-z]", "", phrase.lower())
+
+
+def _phrase_pattern(phrase: str) -> str:
+    """'L.L.C.' matches LLC / L.L.C / L. L. C.; 'credit union' matches any spacing or hyphen."""
+    out = []
+    for ch in phrase:
+        if ch == ".":
+            out.append(r"\.?\s*")
+        elif ch in " -":
+            out.append(r"[\s\-]+")
+        else:
+            out.append(re.escape(ch))
+    pattern = "".join(out)
+    return pattern[:-3] if pattern.endswith(r"\s*") else pattern
+
+
+def _alternation(phrases: Iterable[str]) -> str:
+    # Longest first so 'Limited Liability Company' wins over 'Limited'
+    return "|".join(_phrase_pattern(p) for p in sorted(set(phrases), key=len, reverse=True))
+
+
+def _build_designators() -> Mapping[str, Mapping[str, str]]:
+    """family -> {designator_key (lowercase, inner dots kept) -> canonical spelling}."""
+    return MappingProxyType({
+        fam: MappingProxyType({designator_key(f): f for f in _STRONG[fam] + _WEAK[fam]}) for fam in _STRONG
+    })
+
+
+def _build_restricted() -> Mapping[str, Tuple[Pattern, Mapping[str, Tuple[str, str]]]]:
+    """state code -> (compiled regex, letters-only phrase -> (kind, approver)); states without extras share one."""
+    base: Dict[str, Tuple[str, str]] = {}
+    for words, approver in _APPROVAL:
+        for w in words:
+            base[_letters(w)] = ("approval", approver)
+    for w in _PROHIBITED:
+        base[_letters(w)] = ("prohibited", "")
+    phrases = [w for words, _ in _APPROVAL for w in words] + list(_PROHIBITED)
+
+    def compile_for(table: Dict[str, Tuple[str, str]], words: List[str]):
+        rx = re.compile(rf"{_WORD_EDGE_L}(?:{_alternation(words)}){_WORD_EDGE_R}", re.IGNORECASE)
+        return rx, MappingProxyType(table)
+
+    shared = compile_for(base, phrases)
+    out = {}
+    for code, _ in STATES:
+        extras = _STATE_APPROVAL.get(code)
+        if not extras:
+            out[code] = shared
+            continue
+        table = dict(base)
+        words = list(phrases)
+        for ws, approver in extras:
+            for w in ws:
+                table[_letters(w)] = ("approval", approver)
+                words.append(w)
+        out[code] = compile_for(table, words)
+    out[""] = shared
+    return MappingProxyType(out)
+
+
+DESIGNATORS: Mapping[str, Mapping[str, str]] = _build_designators()
+_STRONG_KEYS: Mapping[str, str] = MappingProxyType({designator_key(f): fam for fam in _STRONG for f in _STRONG[fam]})
+_SUFFIX_RE = re.compile(
+    rf"(?:^|[\s,]+)({_alternation(f for fam in _STRONG for f in _STRONG[fam])})\s*\.?\s*$", re.IGNORECASE
+)
+_IN_NAME_RE: Mapping[str, Pattern] = MappingProxyType({
+    fam: re.compile(rf"{_WORD_EDGE_L}({_alternation(_STRONG[fam])}){_WORD_EDGE_R}", re.IGNORECASE) for fam in _STRONG
+})
+_RESTRICTED = _build_restricted()
+
+
+def _family(entity_type: Optional[str]) -> Optional[str]:
+    label = normalize_entity(entity_type)
+    if label is None:
+        return None
+    return "llc" if label == "LLC" else "corp"
+
+
+def allowed_designators(family: str, state_code: str = "") -> Tuple[str, ...]:
+    """Every designator spelling the state accepts for the family."""
+    if family == "llc":
+        return _STRONG["llc"] + (_WEAK["llc"] if state_code in _LLC_WEAK_STATES else ())
+    if state_code in _CORP_NO_COMPANY_STATES:
+        return _STRONG["corp"] + ("Limited", "Ltd.")
+    return _STRONG["corp"] + _WEAK["corp"]
+
+
+def _issue(code: str, message: str) -> Dict[str, str]:
+    return {"code": code, "message": message}
+
+
+class BusinessNameChecker:
+    """
+    Builds the Legal Business Name and flags designator / restricted-word problems.
+
+    Public methods used by the app:
+      - check(business_name, entity_type, state=None, designator=None) -> dict
+    """
+
+    @classmethod
+    def check(
+        cls,
+        business_name: Optional[str],
+        entity_type: Optional[str],
+        state: Optional[str] = None,
+        designator: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Returns a dict:
+          {
+            "valid": bool,
+            "businessName": "Smith Consulting",     # without any designator
+            "designator": "LLC" | None,
+            "legalName": "Smith Consulting LLC" | None,   # None until a designator is chosen
+            "allowedDesignators": ["LLC", "L.L.C.", "Limited Liability Company"],
+            "errors": [{"code", "message"}, ...],
+            "warnings": [...],
+            "missing": ["designator", ...]
+          }
+        """
+        errors: List[Dict[str, str]] = []
+        warnings: List[Dict[str, str]] = []
+        missing: List[str] = []
+
+        family = _family(entity_type)
+        i = state_index(state)
+        code = STATES[i][0] if i is not None else ""
+        if family is None:
+            errors.append(_issue("entity_type_invalid", "Entity type must be LLC, C-Corp or S-Corp."))
+            return cls._result(None, None, (), errors, warnings, ["entity_type"])
+        allowed = allowed_designators(family, code)
+        allowed_keys = {designator_key(f) for f in allowed}
+        offered = tuple(f for f in OFFERED[family] if designator_key(f) in allowed_keys)
+
+        core = " ".join((business_name or "").split()).strip(" ,;")
+        if not core:
+            missing.append("businessName")
+            return cls._result(None, None, offered, errors, warnings, missing + ["designator"] * (not designator))
+
+        # Trailing designator typed into the name ("Acme Holdings, Inc.")
+        from_name = None
+        m = _SUFFIX_RE.search(core)
+        if m and m.start() > 0:
+            from_name = m.group(1)
+            core = core[:m.start()].strip(" ,;")
+            if _STRONG_KEYS[designator_key(from_name)] != family:
+                errors.append(_issue(
+                    "designator_conflict",
+                    f"'{from_name}' is a {'corporate' if family == 'llc' else 'LLC'} designator and can't end an "
+                    f"{'LLC' if family == 'llc' else 'corporation'} name.",
+                ))
+                from_name = None
+
+        other = "corp" if family == "llc" else "llc"
+        hit = _IN_NAME_RE[other].search(core)
+        if hit:
+            errors.append(_issue(
+                "designator_conflict",
+                f"'{hit.group(1)}' implies a {'corporation' if other == 'corp' else 'LLC'} and can't appear in "
+                f"{'an LLC' if family == 'llc' else 'a corporation'} name.",
+            ))
+        hit = _IN_NAME_RE[family].search(core)
+        if hit:
+            errors.append(_issue("designator_repeated", f"The designator '{hit.group(1)}' should appear only once, at the end of the name."))
+
+        if len(core) > MAX_NAME_LENGTH:
+            errors.append(_issue("name_too_long", f"Business names can be at most {MAX_NAME_LENGTH} characters."))
+        if not re.search(r"[A-Za-z0-9]", core):
+            errors.append(_issue("name_invalid", "The business name must contain letters or numbers."))
+
+        cls._scan_restricted(core, code, errors, warnings)
+
+        chosen = None
+        if designator:
+            chosen = DESIGNATORS[family].get(designator_key(designator))
+            if chosen is None or designator_key(chosen) not in allowed_keys:
+                errors.append(_issue(
+                    "designator_invalid",
+                    f"'{designator}' isn't an accepted designator here; choose one of: {', '.join(offered)}",
+                ))
+                chosen = None
+            elif from_name and designator_key(from_name) != designator_key(chosen):
+                warnings.append(_issue("designator_replaced", f"Replaced '{from_name}' in the name with the chosen designator '{chosen}'."))
+        elif from_name and designator_key(from_name) in allowed_keys:
+            chosen = DESIGNATORS[family][designator_key(from_name)]
+            warnings.append(_issue("designator_from_name", f"Using '{chosen}' from the business name as the designator."))
+        if chosen is None and not any(e["code"] == "designator_invalid" for e in errors):
+            missing.append("designator")
+
+        return cls._result(core, chosen, offered, errors, warnings, missing)
+
+    @staticmethod
+    def _scan_restricted(core: str, code: str, errors: List, warnings: List) -> None:
+        rx, table = _RESTRICTED[code]
+        seen = set()
+        for m in rx.finditer(core):
+            key = _letters(m.group(0))
+            if key in seen:
+                continue
+            seen.add(key)
+            kind, approver = table.get(key, ("approval", "the state filing office"))
+            if kind == "prohibited":
+                errors.append(_issue("prohibited_word", f"'{m.group(0)}' implies a government agency and can't be used in a business name."))
+            else:
+                warnings.append(_issue("restricted_word", f"'{m.group(0)}' usually requires approval from {approver} before filing."))
+
+    @staticmethod
+    def _result(core, chosen, offered, errors, warnings, missing) -> Dict[str, Any]:
+        return {
+            "valid": not errors,
+            "businessName": core,
+            "designator": chosen,
+            "legalName": f"{core} {chosen}" if core and chosen and not errors else None,
+            "allowedDesignators": list(offered),
+            "errors": errors,
+            "warnings": warnings,
+            "missing": missing,
+        }
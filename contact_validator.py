@@ -0,0 +1,186 @@
+# contact_validator.py
+import re
+from typing import Any, Dict, List, Optional
+
+# ====== Compiled patterns ======
+EMAIL_RE = re.compile(
+    r"(?<![\w.+-])([A-Za-z0-9](?:[A-Za-z0-9._%+-]{0,62}[A-Za-z0-9_%+-])?@"
+    r"(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,24})(?![\w-])"
+)
+# 10 digits with an optional "+1" / "1-" country prefix and (), space, dot or dash separators; never part of a longer number
+PHONE_RE = re.compile(r"(?<![\d+])(?:\+1[\s.-]?|1[\s.-])?\(?(\d{3})\)?[\s.-]?(\d{3})[\s.-]?(\d{4})(?!\d)")
+_NAME_WORD = r"[A-Za-zÀ-ÖØ-öø-ÿ](?:[A-Za-zÀ-ÖØ-öø-ÿ'’.-]*[A-Za-zÀ-ÖØ-öø-ÿ.])?"
+NAME_RE = re.compile(rf"^{_NAME_WORD}(?:\s+{_NAME_WORD}){{1,4}}$")
+# Explicit name label: the only source allowed to replace a name already on file
+_NAME_LABEL = re.compile(r"(?:(?:full\s+|legal\s+)*name\s*(?:is|:|-))[ \t]*", re.IGNORECASE)
+# Self-introductions ("I'm Jane Doe") are only a guess, like an unlabeled name
+_SELF_INTRO = re.compile(r"\b(?:i\s+am|i'm|this\s+is)\b[ \t]*", re.IGNORECASE)
+# Where a labeled name ends ("my name is Jane Doe and my email is ...")
+_NAME_STOP = re.compile(
+    r"\s*(?:[\n,;|]|\s-\s|\b(?:and|my|email|e-mail|phone|mobile|cell|number|with|at)\b)", re.IGNORECASE
+)
+_FIELD_LABELS = re.compile(
+    r"\b(?:(?:full\s+|legal\s+)*name|e-?mail(?:\s+address)?|(?:primary\s+|mobile\s+|cell\s+)?phone(?:\s+number)?|"
+    r"number|contact|my|is|and|here|are|details|it's|its)\b\s*[:=-]?",
+    re.IGNORECASE,
+)
+_SEGMENTS = re.compile(r"\s*(?:[,;\n|]|\s-\s)\s*")
+_NOT_NAMES = frozenset(("hi", "hello", "hey", "thanks", "thank you", "yes", "no", "ok", "okay"))
+# Words that never appear in a person's name; rejects unlabeled segments like "please send to"
+_NOT_NAME_WORDS = frozenset(
+    "a an the to for of in on at by is are am was be it my me you your our we i please send use want need "
+    "here this that with from and or email phone number contact call text start form company business llc "
+    "corp inc help hi hello hey thanks".split()
+)
+# Chat filler that reads like two capitalized words ("Sounds good", "Oops typo"); rejects name guesses only
+_CHATTER_WORDS = frozenset(
+    "sounds good great fine sure ok okay oops sorry typo yes yeah yep no nope correct right wrong actually "
+    "update updated change changed correction new old meant instead also just got done perfect cool awesome "
+    "wait sent mistake really".split()
+)
+
+
+def _err(field: str, code: str, message: str) -> Dict[str, str]:
+    return {"field": field, "code": code, "message": message}
+
+
+class ContactValidator:
+    """
+    Extracts and validates the Base intake contact fields (full name, email, 10-digit phone).
+
+    Public methods used by the app:
+      - validate(full_name, email, phone) -> dict
+      - extract(text) -> dict
+    """
+
+    @classmethod
+    def validate(
+        cls, full_name: Optional[str] = None, email: Optional[str] = None, phone: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Returns a dict:
+          {
+            "valid": bool,                    # all three present and valid
+            "fullName": "Jane Doe" | None,
+            "email": "jane@example.com" | None,
+            "phone": "5551234567" | None,     # exactly 10 digits
+            "missing": ["phone", ...],
+            "errors": [{"field", "code", "message"}, ...]
+          }
+        """
+        errors: List[Dict[str, str]] = []
+        missing: List[str] = []
+
+        name = cls.normalize_name(full_name)
+        if not (full_name or "").strip():
+            missing.append("fullName")
+        elif name is None:
+            errors.append(_err("fullName", "name_invalid", "Please provide your full legal name (first and last name)."))
+
+        mail = cls.normalize_email(email)
+        if not (email or "").strip():
+            missing.append("email")
+        elif mail is None:
+            errors.append(_err("email", "email_invalid", "That email address doesn't look valid (e.g. name@example.com)."))
+
+        digits = cls.normalize_phone(phone)
+        if not (phone or "").strip():
+            missing.append("phone")
+        elif digits is None:
+            count = len(re.sub(r"\D", "", phone or ""))
+            errors.append(_err("phone", "phone_invalid", f"Phone must be exactly 10 digits (got {count})."))
+
+        return {
+            "valid": not errors and not missing,
+            "fullName": name,
+            "email": mail,
+            "phone": digits,
+            "missing": missing,
+            "errors": errors,
+        }
+
+    @classmethod
+    def extract(cls, text: str, guess_name: bool = True) -> Dict[str, Optional[str]]:
+        """
+        Pull whichever contact fields appear in a free-text message: {"fullName", "email", "phone"}.
+
+        A name after an explicit label ("my name is …", "full name: …") is always returned.
+        With `guess_name` (pass False once a name is on file) a self-introduction or an
+        unlabeled segment next to the email/phone is accepted when it is typed like a name.
+        """
+        text = text or ""
+        out: Dict[str, Optional[str]] = {"fullName": None, "email": None, "phone": None}
+
+        m = EMAIL_RE.search(text)
+        if m:
+            out["email"] = m.group(1)
+            text = text[:m.start()] + " , " + text[m.end():]
+        m = PHONE_RE.search(text)
+        if m:
+            out["phone"] = "".join(m.groups())
+            text = text[:m.start()] + " , " + text[m.end():]
+
+        m = _NAME_LABEL.search(text)
+        if m:
+            out["fullName"] = cls.normalize_name(cls._labeled(text[m.end():]))
+        if out["fullName"] or not guess_name:
+            return out
+        m = _SELF_INTRO.search(text)
+        if m:
+            out["fullName"] = cls._guess(cls._labeled(text[m.end():]), text)
+        if not out["fullName"] and (out["email"] or out["phone"]):
+            # Unlabeled name next to other contact fields ("Jane Doe, jane@x.com, 555-123-4567")
+            for seg in _SEGMENTS.split(text):
+                name = cls._guess(_FIELD_LABELS.sub(" ", seg).strip(" .:"), text)
+                if name:
+                    out["fullName"] = name
+                    break
+        return out
+
+    @staticmethod
+    def _labeled(rest: str) -> str:
+        """The text after a name label, up to where the name ends ("… and my email is …")."""
+        stop = _NAME_STOP.search(rest)
+        return rest[:stop.start()] if stop else rest
+
+    @classmethod
+    def _guess(cls, segment: str, text: str) -> Optional[str]:
+        """
+        An unlabeled name candidate: every word capitalized (or the whole message typed in
+        lower case) and no chat filler, so "Sounds good" / "Oops typo" are not names.
+        """
+        words = segment.split()
+        if not words or any(w.lower().strip(".,") in _CHATTER_WORDS for w in words):
+            return None
+        if not all(w[:1].isupper() for w in words) and text != text.lower():
+            return None
+        return cls.normalize_name(segment)
+
+    # ---------- normalizers ----------
+    @staticmethod
+    def normalize_email(email: Optional[str]) -> Optional[str]:
+        s = (email or "").strip().strip("<>").rstrip(".")
+        m = EMAIL_RE.fullmatch(s)
+        if not m:
+            return None
+        local, domain = s.rsplit("@", 1)
+        if ".." in s:
+            return None
+        return f"{local}@{domain.lower()}"
+
+    @staticmethod
+    def normalize_phone(phone: Optional[str]) -> Optional[str]:
+        m = PHONE_RE.fullmatch((phone or "").strip())
+        return "".join(m.groups()) if m else None
+
+    @staticmethod
+    def normalize_name(name: Optional[str]) -> Optional[str]:
+        s = " ".join((name or "").split()).strip(" ,.")
+        if not NAME_RE.match(s) or s.lower() in _NOT_NAMES:
+            return None
+        if any(w.lower().strip(".") in _NOT_NAME_WORDS for w in s.split()):
+            return None
+        # Keep user casing unless it is all upper/lower
+        if s.isupper() or s.islower():
+            s = " ".join(w[:1].upper() + w[1:].lower() for w in s.split())
+        return s
@@ -0,0 +1,285 @@
+# corp_structure.py
+from decimal import Decimal
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from validation_utils import check_address, clean_name, fmt_decimal, issue, name_key, parse_decimal, parse_int
+
+DESIGNATORS: Mapping[str, str] = {
+    "corporation": "Corporation", "corp": "Corp.", "inc": "Inc.", "incorporated": "Inc.",
+}
+OFFICER_ROLES = ("President/CEO", "Treasurer/CFO", "Secretary")
+_ROLE_ALIASES: Mapping[str, str] = {
+    "president": "President/CEO", "ceo": "President/CEO", "president/ceo": "President/CEO",
+    "chief executive officer": "President/CEO",
+    "treasurer": "Treasurer/CFO", "cfo": "Treasurer/CFO", "treasurer/cfo": "Treasurer/CFO",
+    "chief financial officer": "Treasurer/CFO",
+    "secretary": "Secretary", "corporate secretary": "Secretary",
+}
+MAX_IN_CHAT = 3
+RECOMMENDED_MIN_SHARES = 1500
+S_CORP_MAX_SHAREHOLDERS = 100
+_HUNDRED = Decimal(100)
+
+
+class CorpStructureValidator:
+    """
+    Deterministic checks for the Corp flow's cap table, directors and officers.
+
+    Public methods used by the app:
+      - validate(structure) -> dict
+    """
+
+    @classmethod
+    def validate(cls, structure: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        `structure` keys (all optional; only what has been captured so far):
+          designator, authorizedShares, parValue, entityType, totalShareholders,
+          shareholders: [{name, address, shares | percent}], directors: [{name, address}],
+          officers: [{role, name}]
+
+        Returns a dict:
+          {
+            "valid": bool,            # no violations in what was provided
+            "complete": bool,         # valid and nothing required is missing
+            "errors": [{"code", "field", "message"}, ...],
+            "warnings": [...],
+            "missing": ["directors", "officers.Secretary", ...],
+            "normalized": {...},      # canonical values to store
+            "summary": {"Designator", "Authorized Shares", "Par Value", "Shareholders", "Directors", "Officers"}
+          }
+        """
+        errors: List[Dict[str, str]] = []
+        warnings: List[Dict[str, str]] = []
+        missing: List[str] = []
+        norm: Dict[str, Any] = {}
+
+        cls._check_designator(structure.get("designator"), norm, errors, missing)
+        authorized = cls._check_authorized(structure.get("authorizedShares"), norm, errors, warnings, missing)
+        cls._check_par(structure.get("parValue"), norm, errors, missing)
+
+        addresses: Dict[str, str] = {}
+        cls._check_shareholders(structure, authorized, norm, addresses, errors, warnings, missing)
+        cls._check_directors(structure.get("directors") or [], norm, addresses, errors, warnings, missing)
+        cls._check_officers(structure.get("officers") or [], norm, errors, missing)
+
+        return {
+            "valid": not errors,
+            "complete": not errors and not missing,
+            "errors": errors,
+            "warnings": warnings,
+            "missing": missing,
+            "normalized": norm,
+            "summary": cls._summary(norm),
+        }
+
+    # ---------- sections ----------
+    @staticmethod
+    def _check_designator(raw: Optional[str], norm: Dict, errors: List, missing: List) -> None:
+        if not (raw or "").strip():
+            missing.append("designator")
+            return
+        key = raw.strip().lower().rstrip(".")
+        if key not in DESIGNATORS:
+            errors.append(issue("designator_invalid", "designator", "Designator must be Corporation, Corp. or Inc."))
+            return
+        norm["designator"] = DESIGNATORS[key]
+
+    @staticmethod
+    def _check_authorized(raw: Any, norm: Dict, errors: List, warnings: List, missing: List) -> Optional[int]:
+        if raw in (None, ""):
+            missing.append("authorizedShares")
+            return None
+        n = parse_int(raw)
+        if n is None or n <= 0:
+            errors.append(issue("authorized_shares_invalid", "authorizedShares", "Authorized shares must be a whole number greater than 0."))
+            return None
+        if n < RECOMMENDED_MIN_SHARES:
+            warnings.append(issue("authorized_shares_low", "authorizedShares", f"We recommend at least {RECOMMENDED_MIN_SHARES:,} authorized shares."))
+        norm["authorizedShares"] = n
+        return n
+
+    @staticmethod
+    def _check_par(raw: Any, norm: Dict, errors: List, missing: List) -> None:
+        if raw in (None, ""):
+            missing.append("parValue")
+            return
+        d = parse_decimal(raw)
+        if d is None or d <= 0:
+            errors.append(issue("par_value_invalid", "parValue", "Par value must be a dollar amount greater than $0 (e.g. $0.01)."))
+            return
+        norm["parValue"] = fmt_decimal(d)
+
+    @classmethod
+    def _check_shareholders(
+        cls, structure: Mapping[str, Any], authorized: Optional[int], norm: Dict, addresses: Dict[str, str],
+        errors: List, warnings: List, missing: List,
+    ) -> None:
+        rows: Sequence[Mapping[str, Any]] = structure.get("shareholders") or []
+        if not rows:
+            missing.append("shareholders")
+            return
+        total_overall = parse_int(structure.get("totalShareholders")) or len(rows)
+        if len(rows) > MAX_IN_CHAT:
+            errors.append(issue(
+                "shareholders_over_limit", "shareholders",
+                f"Only {MAX_IN_CHAT} shareholders can be captured here; our specialists will collect the rest before filing.",
+            ))
+        entity = (structure.get("entityType") or "").replace("-", "").replace(" ", "").lower()
+        if entity == "scorp" and total_overall > S_CORP_MAX_SHAREHOLDERS:
+            errors.append(issue("s_corp_shareholder_limit", "totalShareholders", f"An S-Corp can have at most {S_CORP_MAX_SHAREHOLDERS} shareholders."))
+
+        seen: Dict[str, int] = {}
+        out: List[Dict[str, Any]] = []
+        for i, row in enumerate(rows[:MAX_IN_CHAT]):
+            field = f"shareholders[{i}]"
+            name = clean_name(row.get("name"))
+            if not name:
+                errors.append(issue("shareholder_name_missing", field + ".name", f"Shareholder #{i + 1} needs a full legal name."))
+                continue
+            key = name_key(name)
+            if key in seen:
+                errors.append(issue("shareholder_duplicate", field + ".name", f"{name} is listed more than once as a shareholder."))
+                continue
+            seen[key] = i
+            entry: Dict[str, Any] = {"name": name}
+            address = check_address(row.get("address"), field, name, errors)
+            if address:
+                entry["address"] = address
+                addresses[key] = address
+            shares, percent = parse_int(row.get("shares")), parse_decimal(row.get("percent"))
+            if row.get("shares") not in (None, "") and (shares is None or shares <= 0):
+                errors.append(issue("shares_invalid", field + ".shares", f"{name}'s shares must be a whole number greater than 0."))
+            elif percent is not None and not (0 < percent <= _HUNDRED):
+                errors.append(issue("percent_invalid", field + ".percent", f"{name}'s percentage must be between 0 and 100."))
+            elif shares is None and percent is None:
+                errors.append(issue("allocation_missing", field, f"Please provide the number of shares or percentage for {name}."))
+            if shares:
+                entry["shares"] = shares
+            if percent is not None:
+                entry["percent"] = fmt_decimal(percent)
+            out.append(entry)
+        norm["shareholders"] = out
+        if len(out) < len(rows[:MAX_IN_CHAT]) or any("shares" not in e and "percent" not in e for e in out):
+            return
+
+        if total_overall > MAX_IN_CHAT:
+            # Provisional split of the first three; specialists finalize the rest
+            pct = [parse_decimal(e.get("percent")) for e in out]
+            if any(p is None for p in pct):
+                errors.append(issue("percent_required", "shareholders", "With more than 3 shareholders, give provisional percentages for the first 3."))
+            elif sum(pct) != _HUNDRED:
+                errors.append(issue("percent_total_mismatch", "shareholders", f"Provisional percentages total {fmt_decimal(sum(pct))}%; they must total 100%."))
+            return
+
+        if authorized is None:
+            return
+        # 3 or fewer shareholders: issued shares must equal authorized shares
+        for e in out:
+            if "shares" not in e:
+                raw = Decimal(authorized) * parse_decimal(e["percent"]) / _HUNDRED
+                if raw != raw.to_integral_value():
+                    errors.append(issue(
+                        "percent_not_whole_shares", "shareholders",
+                        f"{e['percent']}% of {authorized:,} shares for {e['name']} is not a whole number of shares; please give share counts.",
+                    ))
+                    return
+                e["shares"] = int(raw)
+        issued = sum(e["shares"] for e in out)
+        if issued != authorized:
+            diff = authorized - issued
+            errors.append(issue(
+                "shares_total_mismatch", "shareholders",
+                f"Issued shares total {issued:,} but authorized shares are {authorized:,} "
+                f"({'short by' if diff > 0 else 'over by'} {abs(diff):,}).",
+            ))
+        for e in out:
+            e["percent"] = fmt_decimal(Decimal(e["shares"]) * _HUNDRED / Decimal(authorized))
+
+    @classmethod
+    def _check_directors(
+        cls, rows: Sequence[Mapping[str, Any]], norm: Dict, addresses: Dict[str, str],
+        errors: List, warnings: List, missing: List,
+    ) -> None:
+        if not rows:
+            missing.append("directors")
+            return
+        if len(rows) > MAX_IN_CHAT:
+            errors.append(issue("directors_over_limit", "directors", f"At most {MAX_IN_CHAT} directors can be captured here."))
+        seen = set()
+        out: List[Dict[str, Any]] = []
+        for i, row in enumerate(rows[:MAX_IN_CHAT]):
+            field = f"directors[{i}]"
+            name = clean_name(row.get("name"))
+            if not name:
+                errors.append(issue("director_name_missing", field + ".name", f"Director #{i + 1} needs a full legal name."))
+                continue
+            key = name_key(name)
+            if key in seen:
+                errors.append(issue("director_duplicate", field + ".name", f"{name} is listed more than once as a director."))
+                continue
+            seen.add(key)
+            entry: Dict[str, Any] = {"name": name}
+            if (row.get("address") or "").strip():
+                address = check_address(row.get("address"), field, name, errors)
+                if address:
+                    entry["address"] = address
+            elif key in addresses:
+                entry["address"] = addresses[key]
+                warnings.append(issue("director_address_reused", field + ".address", f"Using {name}'s shareholder address; confirm or provide a different one."))
+            else:
+                errors.append(issue("director_address_missing", field + ".address", f"Please provide {name}'s mailing address (no PO boxes)."))
+            out.append(entry)
+        norm["directors"] = out
+
+    @staticmethod
+    def _check_officers(rows: Sequence[Mapping[str, Any]], norm: Dict, errors: List, missing: List) -> None:
+        holders: Dict[str, List[str]] = {role: [] for role in OFFICER_ROLES}
+        for i, row in enumerate(rows):
+            role = _ROLE_ALIASES.get(" ".join((row.get("role") or "").lower().replace(".", "").split()))
+            name = clean_name(row.get("name"))
+            if role is None:
+                errors.append(issue("officer_role_unknown", f"officers[{i}].role", f"'{row.get('role')}' is not an officer role; use President/CEO, Treasurer/CFO or Secretary."))
+                continue
+            if not name:
+                errors.append(issue("officer_name_missing", f"officers[{i}].name", f"Please provide a name for {role}."))
+                continue
+            if name_key(name) not in (name_key(n) for n in holders[role]):
+                holders[role].append(name)
+
+        officers: Dict[str, str] = {}
+        for role in OFFICER_ROLES:
+            names = holders[role]
+            if len(names) > 1:
+                errors.append(issue(
+                    "officer_role_duplicate", f"officers.{role}",
+                    f"{role} is a single-seat role but was assigned to {' and '.join(names)}; please choose one.",
+                ))
+            elif names:
+                officers[role] = names[0]
+            else:
+                missing.append(f"officers.{role}")
+        norm["officers"] = officers
+
+    # ---------- helpers ----------
+    @staticmethod
+    def _summary(norm: Dict[str, Any]) -> Dict[str, str]:
+        summary: Dict[str, str] = {}
+        if "designator" in norm:
+            summary["Designator"] = norm["designator"]
+        if "authorizedShares" in norm:
+            summary["Authorized Shares"] = f"{norm['authorizedShares']:,}"
+        if "parValue" in norm:
+            summary["Par Value"] = f"${norm['parValue']}"
+        if norm.get("shareholders"):
+            summary["Shareholders"] = " • ".join(
+                f"{e['name']} — {format(e['shares'], ',') if 'shares' in e else e['percent'] + '%'}"
+                + (f" ({e['address']})" if e.get("address") else "")
+                for e in norm["shareholders"]
+            )
+        if norm.get("directors"):
+            summary["Directors"] = " • ".join(
+                e["name"] + (f" ({e['address']})" if e.get("address") else "") for e in norm["directors"]
+            )
+        if norm.get("officers"):
+            summary["Officers"] = " • ".join(f"{role}: {name}" for role, name in norm["officers"].items())
+        return summary
@@ -0,0 +1,274 @@
+# email_outbox.py
+"""
+Persistent outbox for transactional email (OTP codes) with a background worker pool.
+
+`enqueue()` records the message for the file and returns immediately; worker threads deliver it
+through the injected `deliver(message)` callable, retrying transient errors on
+BACKOFF_SCHEDULE, and record the status for the UI:
+
+    queued -> sending -> sent
+                      -> retrying -> sending -> ...        (transient error)
+                      -> failed                            (PermanentEmailError / retries exhausted)
+    queued / retrying -> expired                           (not delivered before expires_at)
+
+Messages still queued, retrying or sending are reloaded by start(), so a restart resumes
+delivery (at least once: a message cut off mid-send is sent again). The optional
+`is_live(message)` callable vetoes that: a message whose content is no longer valid (an OTP
+whose code only lived in the old process) is closed as expired instead of being resent.
+Bodies are dropped from the file as soon as a message is final, so delivered OTP codes do
+not stay on disk.
+
+Status changes only mark the outbox dirty; a writer thread saves the file outside the
+worker lock, so a burst of changes costs one write.
+"""
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+QUEUED = "queued"
+SENDING = "sending"
+RETRYING = "retrying"
+SENT = "sent"
+FAILED = "failed"
+EXPIRED = "expired"
+PENDING = (QUEUED, SENDING, RETRYING)
+
+_BODY_KEYS = ("text", "html")
+
+
+class PermanentEmailError(Exception):
+    """Delivery can never succeed (bad API key, unverified sender, rejected address): no retry."""
+
+
+class EmailOutbox:
+    """
+    Public methods used by the app:
+      - start() -> None                    # load the file, resume pending mail, start workers + writer
+      - enqueue(to, subject, text, html, key=None, expires_in=None) -> dict
+      - status(message_id) -> dict | None  # no bodies
+      - stop(timeout=5.0) -> None          # also saves the file one last time
+    """
+
+    # Seconds before retry 1, 2, ...; a message fails after the last one
+    BACKOFF_SCHEDULE = (2, 5, 15, 30, 60)
+    KEEP_FINAL = 500  # sent / failed / expired records kept for status lookups
+
+    def __init__(
+        self,
+        deliver: Callable[[Dict[str, Any]], None],
+        path: Optional[str] = None,
+        workers: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+        is_live: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> None:
+        self._deliver = deliver
+        self._is_live = is_live
+        self._path = path or os.getenv("EMAIL_OUTBOX_PATH", "email_outbox.json")
+        self._workers = max(1, workers or int(os.getenv("EMAIL_OUTBOX_WORKERS", "2")))
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._messages: Dict[str, Dict[str, Any]] = {}
+        self._due: List[Tuple[float, int, str]] = []  # (next_attempt_at, seq, id)
+        self._seq = itertools.count()
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+        self._dirty = threading.Event()
+        self._file_lock = threading.Lock()
+
+    # ---------- API ----------
+    def start(self) -> None:
+        with self._cond:
+            if self._threads:
+                return
+            self._stopping = False
+            # Messages enqueued before start() are already in memory; the file adds the ones from earlier runs
+            fresh = set(self._messages)
+            self._messages, self._due = {**self._load(), **self._messages}, []
+            resumed = dropped = 0
+            for msg in list(self._messages.values()):
+                if msg["status"] not in PENDING:
+                    continue
+                if msg["id"] not in fresh and self._is_live and not self._is_live(msg):
+                    msg["last_error"] = "not live after restart"
+                    self._close(msg, EXPIRED)
+                    dropped += 1
+                    continue
+                msg["status"] = RETRYING if msg["attempts"] else QUEUED
+                self._schedule(msg, msg.get("next_attempt_at") or self._clock())
+                resumed += msg["id"] not in fresh
+            self._threads = [
+                threading.Thread(target=self._work, name=f"email-outbox-{i}", daemon=True) for i in range(self._workers)
+            ]
+            self._threads.append(threading.Thread(target=self._write_loop, name="email-outbox-writer", daemon=True))
+            for thread in self._threads:
+                thread.start()
+            self._write()
+        print(
+            f"[OUTBOX] 📮 {self._workers} worker(s) started, {resumed} pending message(s) resumed, "
+            f"{dropped} no longer live"
+        )
+
+    def enqueue(
+        self,
+        to: str,
+        subject: str,
+        text: str,
+        html: str,
+        key: Optional[str] = None,
+        expires_in: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        now = self._clock()
+        msg = {
+            "id": uuid.uuid4().hex,
+            "key": key,
+            "to": to,
+            "subject": subject,
+            "text": text,
+            "html": html,
+            "status": QUEUED,
+            "attempts": 0,
+            "created_at": now,
+            "expires_at": now + expires_in if expires_in else None,
+            "next_attempt_at": now,
+            "sent_at": None,
+            "last_error": None,
+        }
+        with self._cond:
+            self._messages[msg["id"]] = msg
+            self._schedule(msg, now)
+            self._write()
+            status = self._public(msg)
+        if not self._threads:
+            self.start()
+        return status
+
+    def status(self, message_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        with self._cond:
+            msg = self._messages.get(message_id or "")
+            return self._public(msg) if msg else None
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            threads, self._threads = self._threads, []
+        self._dirty.set()
+        for thread in threads:
+            thread.join(timeout)
+        self._flush()
+
+    # ---------- workers ----------
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                msg = self._next()
+                if msg is None:
+                    return
+                msg["status"] = SENDING
+                msg["attempts"] += 1
+                self._write()
+                attempt = dict(msg)
+            error, permanent = None, False
+            try:
+                self._deliver(attempt)
+            except PermanentEmailError as e:
+                error, permanent = str(e), True
+            except Exception as e:
+                error = str(e)[:200]
+            with self._cond:
+                self._finish(msg, error, permanent)
+
+    def _next(self) -> Optional[Dict[str, Any]]:
+        """Wait for the earliest due message (expired ones are closed on the way)."""
+        while not self._stopping:
+            now = self._clock()
+            if self._due and self._due[0][0] <= now:
+                _, _, message_id = heapq.heappop(self._due)
+                msg = self._messages.get(message_id)
+                if msg is None or msg["status"] not in (QUEUED, RETRYING):
+                    continue
+                if msg["expires_at"] and now > msg["expires_at"]:
+                    self._close(msg, EXPIRED)
+                    self._write()
+                    print(f"[OUTBOX] ⌛ {msg['id'][:8]} expired before delivery")
+                    continue
+                return msg
+            self._cond.wait(timeout=self._due[0][0] - now if self._due else None)
+        return None
+
+    def _finish(self, msg: Dict[str, Any], error: Optional[str], permanent: bool) -> None:
+        if error is None:
+            msg["sent_at"] = self._clock()
+            self._close(msg, SENT)
+            print(f"[OUTBOX] ✅ {msg['id'][:8]} sent (attempt {msg['attempts']})")
+        elif permanent or msg["attempts"] > len(self.BACKOFF_SCHEDULE):
+            msg["last_error"] = error
+            self._close(msg, FAILED)
+            print(f"[OUTBOX] ❌ {msg['id'][:8]} failed after {msg['attempts']} attempt(s): {error}")
+        else:
+            delay = self.BACKOFF_SCHEDULE[msg["attempts"] - 1]
+            msg["last_error"] = error
+            msg["status"] = RETRYING
+            self._schedule(msg, self._clock() + delay)
+            print(f"[OUTBOX] 🔁 {msg['id'][:8]} attempt {msg['attempts']} failed, retrying in {delay}s: {error}")
+        self._write()
+
+    def _write_loop(self) -> None:
+        while True:
+            self._dirty.wait()
+            self._dirty.clear()
+            self._flush()
+            with self._cond:
+                if self._stopping:
+                    return
+
+    # ---------- internals (caller holds the lock) ----------
+    def _schedule(self, msg: Dict[str, Any], at: float) -> None:
+        msg["next_attempt_at"] = at
+        heapq.heappush(self._due, (at, next(self._seq), msg["id"]))
+        self._cond.notify()
+
+    def _close(self, msg: Dict[str, Any], status: str) -> None:
+        msg["status"] = status
+        msg["next_attempt_at"] = None
+        for key in _BODY_KEYS:
+            msg.pop(key, None)
+        final = [m for m in self._messages.values() if m["status"] not in PENDING]
+        if len(final) > self.KEEP_FINAL:
+            final.sort(key=lambda m: m["created_at"])
+            for old in final[:len(final) - self.KEEP_FINAL]:
+                del self._messages[old["id"]]
+
+    @staticmethod
+    def _public(msg: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in msg.items() if k not in _BODY_KEYS}
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                return {m["id"]: m for m in json.load(f)}
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+            return {}
+
+    def _write(self) -> None:
+        """Mark the file stale; the writer thread saves it."""
+        self._dirty.set()
+
+    # ---------- file (no lock held) ----------
+    def _flush(self) -> None:
+        with self._file_lock:
+            # Copy under the lock, serialize outside it: workers never wait on the disk
+            with self._cond:
+                records = [dict(m) for m in self._messages.values()]
+            tmp = f"{self._path}.tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(records, f, indent=2, ensure_ascii=False)
+                os.replace(tmp, self._path)
+            except Exception as e:
+                print(f"[OUTBOX] ⚠️ Failed to save {self._path}: {e}")
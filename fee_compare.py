@@ -0,0 +1,158 @@
+# fee_compare.py
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# NumPy is optional at import-time; the pure-Python path gives identical results.
+try:
+    import numpy as np  # pip install numpy
+except Exception:  # pragma: no cover
+    np = None
+
+import state_data
+from quote_engine import QuoteEngine
+from state_fuzzy import correct_state
+from stripe_catalog import PLANS, plan_key
+
+# Plan axis of the cost cube, in PLANS order
+PLAN_KEYS: Tuple[Tuple[str, str], ...] = tuple(PLANS)
+_PAYMENTS_PER_YEAR = {"yearly": 1, "monthly": 12}
+
+
+def _build_cubes() -> Tuple[Any, Any]:
+    """
+    (due_now, first_year) in cents, shape states × entities × plans:
+      due_now    = plan price for one billing cycle + state filing fee
+      first_year = plan price × payments in year one + state filing fee
+    """
+    fees = [[fee * 100 for fee in row] for row in state_data.FEE_MATRIX]
+    cycle = [PLANS[k] for k in PLAN_KEYS]
+    year = [PLANS[k] * _PAYMENTS_PER_YEAR[k[1]] for k in PLAN_KEYS]
+    if np is not None:
+        f = np.asarray(fees, dtype=np.int64)[:, :, None]
+        return f + np.asarray(cycle, dtype=np.int64), f + np.asarray(year, dtype=np.int64)
+    due_now = [[[f + c for c in cycle] for f in row] for row in fees]
+    first_year = [[[f + y for y in year] for f in row] for row in fees]
+    return due_now, first_year
+
+
+class FeeComparator:
+    """
+    Ranks every jurisdiction (or a subset) by cost for one entity type and plan in
+    a single call, precomputed as a states × entities × plans cube at import.
+
+    Public methods used by the app:
+      - compare(entity_type, product_name=None, billing_cycle=None, chosen_state=None,
+                states=None, top_n=5) -> dict
+    """
+
+    DEFAULT_TOP_N = 5
+    MAX_TOP_N = 15
+
+    _DUE_NOW, _FIRST_YEAR = _build_cubes()
+
+    @classmethod
+    def compare(
+        cls,
+        entity_type: str,
+        product_name: Optional[str] = None,
+        billing_cycle: Optional[str] = None,
+        chosen_state: Optional[str] = None,
+        states: Optional[Sequence[str]] = None,
+        top_n: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Returns a dict:
+          {
+            "entity_type": "LLC", "plan": "Classic|yearly" | None, "compared": int,
+            "results": [{"rank", "state", "stateFilingFee", "totalDueNow", "firstYearCost",
+                         "diffVsChosen", "display": {...}}, ...],   # top N, cheapest first
+            "chosen": {...same row shape...} | None
+          }
+        or {"error": "..."} on failure. Without a plan, totals are the filing fee alone.
+        """
+        j = state_data.entity_index(entity_type)
+        if j is None:
+            return {"error": "missing_params", "entity_type": entity_type}
+
+        p = None
+        if product_name:
+            plan = QuoteEngine.normalize_plan(product_name)
+            cycle = (billing_cycle or "yearly").strip().lower()
+            if plan is None or (plan, cycle) not in PLANS:
+                return {"error": "unknown_plan", "productName": product_name, "billingCycle": billing_cycle}
+            p = PLAN_KEYS.index((plan, cycle))
+
+        rows = list(range(len(state_data.STATES)))
+        if states:
+            picked = [state_data.state_index(correct_state(s)) for s in states]
+            rows = sorted({i for i in picked if i is not None})
+            if not rows:
+                return {"error": "unknown_states", "states": list(states)}
+
+        chosen = state_data.state_index(correct_state(chosen_state)) if chosen_state else None
+        due_now, first_year = cls._column(rows, j, p)
+        fees = [state_data.FEE_MATRIX[i][j] * 100 for i in rows]
+        order = cls._rank(first_year)
+
+        c_due = c_year = None
+        if chosen is not None:
+            c_due, c_year = (v[0] for v in cls._column([chosen], j, p))
+
+        n = max(1, min(int(top_n or cls.DEFAULT_TOP_N), cls.MAX_TOP_N))
+        rank_of = {rows[k]: r for r, k in enumerate(order, 1)}
+        results = [
+            cls._row(r, rows[k], fees[k], due_now[k], first_year[k], c_year)
+            for r, k in enumerate(order[:n], 1)
+        ]
+
+        out: Dict[str, Any] = {
+            "entity_type": state_data.ENTITY_LABELS[j],
+            "plan": plan_key(*PLAN_KEYS[p]) if p is not None else None,
+            "compared": len(rows),
+            "results": results,
+            "chosen": None,
+        }
+        if chosen is not None:
+            fee = state_data.FEE_MATRIX[chosen][j] * 100
+            out["chosen"] = cls._row(rank_of.get(chosen), chosen, fee, c_due, c_year, None)
+        return out
+
+    # ---------- internals ----------
+    @classmethod
+    def _column(cls, rows: List[int], j: int, p: Optional[int]) -> Tuple[List[int], List[int]]:
+        """Due-now and first-year cents for the given state rows (filing fee only when p is None)."""
+        if p is None:
+            fees = [state_data.FEE_MATRIX[i][j] * 100 for i in rows]
+            return fees, list(fees)
+        if np is not None:
+            idx = np.asarray(rows, dtype=np.intp)
+            return cls._DUE_NOW[idx, j, p].tolist(), cls._FIRST_YEAR[idx, j, p].tolist()
+        return [cls._DUE_NOW[i][j][p] for i in rows], [cls._FIRST_YEAR[i][j][p] for i in rows]
+
+    @staticmethod
+    def _rank(costs: List[int]) -> List[int]:
+        """Positions sorted by cost, ties kept in table order."""
+        if np is not None:
+            return np.argsort(np.asarray(costs, dtype=np.int64), kind="stable").tolist()
+        return sorted(range(len(costs)), key=costs.__getitem__)
+
+    @staticmethod
+    def _row(
+        rank: Optional[int], i: int, fee: int, due_now: int, first_year: int, base: Optional[int]
+    ) -> Dict[str, Any]:
+        row: Dict[str, Any] = {
+            "rank": rank,
+            "state": state_data.STATE_NAMES[i],
+            "stateFilingFee": fee / 100,
+            "totalDueNow": due_now / 100,
+            "firstYearCost": first_year / 100,
+            "display": {
+                "stateFilingFee": QuoteEngine.format_usd(fee),
+                "totalDueNow": QuoteEngine.format_usd(due_now),
+                "firstYearCost": QuoteEngine.format_usd(first_year),
+            },
+        }
+        if base is not None:
+            diff = first_year - base
+            row["diffVsChosen"] = diff / 100
+            row["display"]["diffVsChosen"] = ("-" if diff < 0 else "+") + QuoteEngine.format_usd(abs(diff))
+        return row
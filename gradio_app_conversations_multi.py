@@ -2,7 +2,8 @@
 import os
 import json
 import contextvars
-from typing import TypedDict, Optional, Literal, Dict
+import time
+from typing import Any, TypedDict, Optional, Literal, Dict, List
 
 # Bootstrap env (OpenAI, SendGrid, Stripe, SITE_URL, etc.)
 import config  # side-effect: sets env on import
@@ -11,13 +12,32 @@ import gradio as gr
 from agents import Agent, Runner, function_tool, OpenAIConversationsSession
 
 from base_prompt import BasePrompt
-from llc_prompt import LLCPrompt
+from llc_prompt import LLCPrompt, LLC_STEPS
 from corp_prompt import CorpPrompt
 from payment_prompt import PaymentPrompt
 from otp_service import OTPService
 
 # Use the real PaymentService
 from payment_service import PaymentService
+from state_data import resolve_state, normalize_entity, filing_fee
+from state_fuzzy import match_state, correct_state
+from contact_validator import ContactValidator
+from stripe_catalog import StripeCatalog
+from payment_watcher import PaymentWatcher
+from quote_engine import QuoteEngine
+from fee_compare import FeeComparator
+from naics_index import NaicsIndex
+from address_normalizer import AddressNormalizer
+from corp_structure import CorpStructureValidator
+from llc_members import LlcMembersValidator
+from business_name import BusinessNameChecker
+from token_metrics import TokenMetrics, count_tokens
+from server_state import ServerState
+from snapshot import CORP_STRUCTURE, LLC_STRUCTURE, RENDERED_MODES, Snapshot
+from intake import IntakeRecord, IntakeStore, session_key
+from output_guard import OutputGuard
+from ui_events import ENTITY_SWITCHED, OTP_DELIVERY_FAILED, OTP_SENT, PAYMENT_LINK_PENDING, PAYMENT_LINK_READY, UiEvents
+from prompt_bench import Cassette
 
 
 # ========= GLOBAL CONTEXT =========
@@ -32,12 +52,20 @@ class VerifyEmailOtpArgs(TypedDict):
     email: str
     code: str
 
+class ValidateContactArgs(TypedDict):
+    fullName: Optional[str]
+    email: Optional[str]
+    phone: Optional[str]
+
 class SetEntityArgs(TypedDict):
     entity_type: Literal["BASE", "LLC", "C-CORP", "S-CORP", "PAYMENT"]
 
 class UpdateEntityTypeArgs(TypedDict):
     entity_type: Literal["LLC", "C-CORP", "S-CORP"]  # used in Payment to switch mid-checkout
 
+class SetLlcStepArgs(TypedDict):
+    step: Literal[1, 2, 3, 4, 5, 6, 7]
+
 class UpdateToPaymentArgs(TypedDict):
     _: Optional[str]
 
@@ -52,6 +80,93 @@ class CreatePaymentLinkArgs(TypedDict):
     stateFilingFee: float
     totalDueNow: float
 
+class GetQuoteArgs(TypedDict):
+    productName: Literal["Classic", "Premium", "Elite"]
+    billingCycle: Optional[Literal["yearly", "monthly"]]
+    state: str
+    entity_type: Literal["LLC", "C-Corp", "S-Corp", "C-CORP", "S-CORP"]
+
+class CompareStateFeesArgs(TypedDict):
+    entity_type: Literal["LLC", "C-Corp", "S-Corp", "C-CORP", "S-CORP"]
+    productName: Optional[Literal["Classic", "Premium", "Elite"]]
+    billingCycle: Optional[Literal["yearly", "monthly"]]
+    chosenState: Optional[str]
+    states: Optional[List[str]]
+    topN: Optional[int]
+
+class NormalizeAddressArgs(TypedDict):
+    address: str
+
+class ShareholderArgs(TypedDict):
+    name: str
+    address: Optional[str]
+    shares: Optional[int]
+    percent: Optional[float]
+
+class DirectorArgs(TypedDict):
+    name: str
+    address: Optional[str]
+
+class OfficerArgs(TypedDict):
+    role: str
+    name: str
+
+class ValidateCorpStructureArgs(TypedDict):
+    entityType: Optional[Literal["C-Corp", "S-Corp"]]
+    designator: Optional[str]
+    authorizedShares: Optional[int]
+    parValue: Optional[str]
+    totalShareholders: Optional[int]
+    shareholders: Optional[List[ShareholderArgs]]
+    directors: Optional[List[DirectorArgs]]
+    officers: Optional[List[OfficerArgs]]
+
+class MemberArgs(TypedDict):
+    name: str
+    address: Optional[str]
+    percent: Optional[float]
+
+class ManagerArgs(TypedDict):
+    name: str
+    address: Optional[str]
+    isMember: Optional[bool]
+
+class ValidateLlcMembersArgs(TypedDict):
+    governanceType: Optional[Literal["Member-Managed", "Manager-Managed"]]
+    soleMember: Optional[bool]
+    totalMembers: Optional[int]
+    members: Optional[List[MemberArgs]]
+    managers: Optional[List[ManagerArgs]]
+
+class CheckBusinessNameArgs(TypedDict):
+    businessName: str
+    entity_type: Literal["LLC", "C-Corp", "S-Corp", "C-CORP", "S-CORP"]
+    state: Optional[str]
+    designator: Optional[str]
+
+class SetFieldArgs(TypedDict):
+    field: Literal[
+        "fullName", "email", "phone", "businessName", "businessPurpose", "state", "naicsCode",
+        "registeredAgent", "virtualBusinessAddress",
+    ]
+    value: Optional[str]  # "" clears the field
+
+class SetFieldsArgs(TypedDict):
+    # Only the fields captured or changed this turn; null = leave as is, "" = clear
+    fullName: Optional[str]
+    email: Optional[str]
+    phone: Optional[str]
+    businessName: Optional[str]
+    businessPurpose: Optional[str]
+    state: Optional[str]
+    naicsCode: Optional[str]  # 6-digit code or the full "<CODE> - <TITLE> — <SUMMARY>" string
+    registeredAgent: Optional[str]
+    virtualBusinessAddress: Optional[str]
+
+class SearchNaicsArgs(TypedDict):
+    purpose: str
+    k: Optional[int]
+
 class CheckPaymentStatusArgs(TypedDict):
     productName: Literal["Classic", "Premium", "Elite"]
     price: float
@@ -62,48 +177,218 @@ class CheckPaymentStatusArgs(TypedDict):
 def _normalize_entity_label(s: str) -> str:
     if not s:
         return s
-    x = s.strip().lower().replace(".", "").replace("_", "-")
-    if x == "llc": return "LLC"
-    if x in ("c-corp", "c corp", "ccorp"): return "C-Corp"
-    if x in ("s-corp", "s corp", "scorp", "s-ccorp", "s ccorp"): return "S-Corp"
-    return s
+    return normalize_entity(s) or s
+
+def _llc_gate_step(field: str, sole: bool) -> int:
+    """LLC step whose gate a validateLlcMembers `missing`/`errors` field belongs to."""
+    root = field.split("[", 1)[0].split(".", 1)[0]
+    if root == "governanceType":
+        return 2
+    if root == "managers":
+        return 4
+    if root in ("members", "totalMembers"):
+        return 3 if sole else 5
+    return 3
+
+def _ensure_conversation(session: OpenAIConversationsSession) -> Optional[str]:
+    """
+    A new OpenAIConversationsSession only creates its server-side conversation on first use.
+    Create it before the first turn's pre-run work (contact pre-parse, OTP auto-send) so the
+    intake record, OTP state, metrics and cassettes are keyed on the real id from the start;
+    it is also the id the banner shows for resuming.
+    """
+    cid = session_key(session)
+    if cid:
+        return cid
+    import asyncio, concurrent.futures
+    try:
+        with concurrent.futures.ThreadPoolExecutor() as ex:
+            ex.submit(lambda: asyncio.run(session.get_items(limit=1))).result(timeout=30)
+    except Exception as e:
+        print(f"[SESSION] ⚠️ Could not create the conversation yet: {e!r}")
+    return session_key(session)
+
+def _fields(sess: OpenAIConversationsSession) -> Dict[str, Any]:
+    """The conversation's intake record (rendered server-side as the Snapshot), loaded once per session."""
+    store = getattr(sess, "fields", None)
+    if store is None:
+        store = intake_store.get(session_key(sess))
+        setattr(sess, "fields", store)
+    return store
+
+def _record_fields(values: Dict[str, Optional[str]]) -> str:
+    """Shared body of setField / setFields: validate, write, and report inline."""
+    sess = CURRENT_SESSION.get()
+    if not isinstance(sess, OpenAIConversationsSession):
+        return json.dumps({"error": "no_session"})
+    record = _fields(sess)
+    out = IntakeRecord.apply(record, values, naics_lookup=naics_index.lookup)
+    out["missing"] = IntakeRecord.missing(record, getattr(sess, "entity_type", "BASE"))
+    intake_store.save(session_key(sess), record)
+    print(f"[TOOL LOG] 🗂️ fields -> applied={list(out['applied'])} cleared={out['cleared']} "
+          f"errors={[e['code'] for e in out['errors']]} rejected={out['rejected']}")
+    return json.dumps(out)
 
-def _resolve_state_name(input_state: str) -> Optional[str]:
-    if not input_state:
-        return None
-    s = input_state.strip()
-    if len(s) == 2:
-        codes = {
-            "AL":"Alabama","AK":"Alaska","AZ":"Arizona","AR":"Arkansas","CA":"California","CO":"Colorado",
-            "CT":"Connecticut","DE":"Delaware","FL":"Florida","GA":"Georgia","HI":"Hawaii","ID":"Idaho",
-            "IL":"Illinois","IN":"Indiana","IA":"Iowa","KS":"Kansas","KY":"Kentucky","LA":"Louisiana",
-            "ME":"Maine","MD":"Maryland","MA":"Massachusetts","MI":"Michigan","MN":"Minnesota",
-            "MS":"Mississippi","MO":"Missouri","MT":"Montana","NE":"Nebraska","NV":"Nevada",
-            "NH":"New Hampshire","NJ":"New Jersey","NM":"New Mexico","NY":"New York",
-            "NC":"North Carolina","ND":"North Dakota","OH":"Ohio","OK":"Oklahoma","OR":"Oregon",
-            "PA":"Pennsylvania","RI":"Rhode Island","SC":"South Carolina","SD":"South Dakota",
-            "TN":"Tennessee","TX":"Texas","UT":"Utah","VT":"Vermont","VA":"Virginia",
-            "WA":"Washington","WV":"West Virginia","WI":"Wisconsin","WY":"Wyoming","DC":"Washington, DC"
-        }
-        return codes.get(s.upper())
-    low = s.lower().replace(".", "").replace(",", "").strip()
-    if low in ("dc","d c","washington dc","washington d c","district of columbia"):
-        return "Washington, DC"
-    return s
+# Snapshot rows each validator is the source of truth for
+_LLC_SUMMARY_KEYS = ("governanceType", "soleMember", "members", "managers", "ownershipTotal")
+_CORP_SUMMARY_KEYS = ("authorizedShares", "parValue", "shareholders", "directors", "officers")
+
+def _switch_entity_fields(sess: OpenAIConversationsSession, entity_type: str) -> None:
+    store = _fields(sess)
+    dropped = Snapshot.purge(store, entity_type)
+    label = _normalize_entity_label(entity_type) if entity_type in ("LLC", "C-CORP", "S-CORP") else None
+    Snapshot.update(store, {"entityType": label})
+    if dropped:
+        print(f"[SNAPSHOT] 🧹 purged {dropped} after switch to {entity_type}")
+
+def _reset_llc_step(sess: OpenAIConversationsSession) -> None:
+    setattr(sess, "llc_step", 1)
+    setattr(sess, "llc_pending_steps", [])
 
 
 # ========= TOOLS =========
 otp = OTPService()
 
+# Create/look up plan Products & Prices once so checkouts can reference price ids
+_catalog = StripeCatalog()
+if _catalog.sync():
+    PaymentService.configure_catalog(_catalog)
+
+# Coalesced, backoff-scheduled Stripe checks shared by every open tab
+payment_watcher = PaymentWatcher()
+
+# Bundled NAICS catalog; memory-mapped and indexed on the first search
+naics_index = NaicsIndex()
+
+# Captured intake fields per conversation (survive restarts and history trimming)
+intake_store = IntakeStore()
+
+# Per-agent / per-conversation token counters (instruction sizes are measured once the agents exist)
+token_metrics = TokenMetrics()
+
 @function_tool
 async def sendEmailOtp(args: SendEmailOtpArgs) -> str:
     print(f"[TOOL LOG] ✉️ sendEmailOtp called with email={args.get('email')}")
-    return otp.send_otp_to_user(args)
+    sess = CURRENT_SESSION.get()
+    result = otp.send_otp_to_user(args, session_key(sess))
+    if isinstance(sess, OpenAIConversationsSession) and result.startswith("OTP sent"):
+        setattr(sess, "otp_sent_to", str(args.get("email", "")).strip())
+        setattr(sess, "otp_delivery", "queued")
+        UiEvents.emit(sess, OTP_SENT, email=getattr(sess, "otp_sent_to"))
+    return result
 
 @function_tool
 async def verifyEmailOtp(args: VerifyEmailOtpArgs) -> str:
     print(f"[TOOL LOG] 🔐 verifyEmailOtp called for email={args.get('email')} code={args.get('code')}")
-    return otp.verify_otp_from_user(args)
+    sess = CURRENT_SESSION.get()
+    result = otp.verify_otp_from_user(args, session_key(sess))
+    if isinstance(sess, OpenAIConversationsSession) and result == "Email verified successfully.":
+        setattr(sess, "otp_verified", True)
+        contact = dict(getattr(sess, "contact", None) or {})
+        contact["email"] = str(args.get("email", "")).strip() or contact.get("email")
+        setattr(sess, "contact", contact)
+        IntakeRecord.apply(_fields(sess), {k: contact.get(k) for k in ("fullName", "email", "phone")})
+    return result
+
+@function_tool
+async def validateContact(args: ValidateContactArgs) -> str:
+    print(f"[TOOL LOG] 🧾 validateContact called with args={args}")
+    out = ContactValidator.validate(args.get("fullName"), args.get("email"), args.get("phone"))
+    print(f"[TOOL LOG] 🧾 validateContact -> valid={out['valid']} missing={out['missing']} errors={[e['code'] for e in out['errors']]}")
+    return json.dumps(out)
+
+@function_tool
+async def searchNaics(args: SearchNaicsArgs) -> str:
+    print(f"[TOOL LOG] 📚 searchNaics called with args={args}")
+    k = max(1, min(int(args.get("k") or 6), 10))
+    try:
+        hits = naics_index.search(args.get("purpose", ""), k)
+    except Exception as e:
+        print(f"[TOOL LOG] 📚 searchNaics -> error: {e}")
+        return json.dumps({"error": "naics_unavailable"})
+    print(f"[TOOL LOG] 📚 searchNaics -> {[h['code'] for h in hits]}")
+    if not hits:
+        # The bundled catalog is a subset of NAICS 2022; never leave the user at a dead end
+        return json.dumps({
+            "results": [],
+            "noMatch": True,
+            "next": "Ask the user to describe the activity in other words, or to give their own 6-digit NAICS "
+                    "code (census.gov/naics); setFields records a well-formed code even if it is not in the catalog.",
+        })
+    return json.dumps({"results": hits})
+
+@function_tool
+async def normalizeAddress(args: NormalizeAddressArgs) -> str:
+    print(f"[TOOL LOG] 🏠 normalizeAddress called with args={args}")
+    out = AddressNormalizer.normalize(args.get("address", ""))
+    print(f"[TOOL LOG] 🏠 normalizeAddress -> valid={out['valid']} errors={[e['code'] for e in out['errors']]}")
+    return json.dumps(out)
+
+@function_tool
+async def validateCorpStructure(args: ValidateCorpStructureArgs) -> str:
+    print(f"[TOOL LOG] 🏛️ validateCorpStructure called with args={args}")
+    out = CorpStructureValidator.validate(args)
+    print(f"[TOOL LOG] 🏛️ validateCorpStructure -> valid={out['valid']} errors={[e['code'] for e in out['errors']]} missing={out['missing']}")
+    sess = CURRENT_SESSION.get()
+    if isinstance(sess, OpenAIConversationsSession):
+        record = _fields(sess)
+        Snapshot.from_summary(record, out["summary"], _CORP_SUMMARY_KEYS)
+        record[CORP_STRUCTURE] = out["normalized"]
+    return json.dumps(out)
+
+@function_tool
+async def validateLlcMembers(args: ValidateLlcMembersArgs) -> str:
+    print(f"[TOOL LOG] 👥 validateLlcMembers called with args={args}")
+    out = LlcMembersValidator.validate(args)
+    print(f"[TOOL LOG] 👥 validateLlcMembers -> valid={out['valid']} total={out['ownershipTotal']} errors={[e['code'] for e in out['errors']]} missing={out['missing']}")
+    sess = CURRENT_SESSION.get()
+    if isinstance(sess, OpenAIConversationsSession):
+        # Steps with open gates stay in the step-scoped LLC prompt until they are satisfied
+        sole = (out["normalized"].get("soleMember") == "Yes")
+        fields = out["missing"] + [e["field"] for e in out["errors"]]
+        setattr(sess, "llc_pending_steps", sorted({_llc_gate_step(f, sole) for f in fields}))
+        record = _fields(sess)
+        Snapshot.from_summary(record, out["summary"], _LLC_SUMMARY_KEYS)
+        record[LLC_STRUCTURE] = out["normalized"]
+    return json.dumps(out)
+
+@function_tool
+async def setLlcStep(args: SetLlcStepArgs) -> str:
+    sess = CURRENT_SESSION.get()
+    if not isinstance(sess, OpenAIConversationsSession):
+        print("[AGENT LOG] ❌ setLlcStep called but no active session")
+        return "No active session to update."
+    step = args.get("step")
+    if step not in LLC_STEPS:
+        return "Unknown LLC step."
+    old = getattr(sess, "llc_step", None)
+    setattr(sess, "llc_step", step)
+    print(f"[AGENT LOG] 🪜 setLlcStep -> {old} → {step}")
+    return f"LLC step set to {step}"
+
+@function_tool
+async def checkBusinessName(args: CheckBusinessNameArgs) -> str:
+    print(f"[TOOL LOG] 🏷️ checkBusinessName called with args={args}")
+    out = BusinessNameChecker.check(
+        args.get("businessName"), args.get("entity_type"), args.get("state"), args.get("designator")
+    )
+    print(f"[TOOL LOG] 🏷️ checkBusinessName -> legalName={out['legalName']!r} errors={[e['code'] for e in out['errors']]}")
+    sess = CURRENT_SESSION.get()
+    if isinstance(sess, OpenAIConversationsSession) and out["valid"]:
+        Snapshot.update(_fields(sess), {
+            "businessName": out["businessName"], "designator": out["designator"], "legalBusinessName": out["legalName"],
+        })
+    return json.dumps(out)
+
+@function_tool
+async def setField(args: SetFieldArgs) -> str:
+    print(f"[TOOL LOG] 🗂️ setField called with args={args}")
+    return _record_fields({args.get("field"): args.get("value") or ""})
+
+@function_tool
+async def setFields(args: SetFieldsArgs) -> str:
+    print(f"[TOOL LOG] 🗂️ setFields called with args={args}")
+    return _record_fields(dict(args))
 
 @function_tool
 async def setEntityType(args: SetEntityArgs) -> str:
@@ -114,6 +399,12 @@ async def setEntityType(args: SetEntityArgs) -> str:
     new_type = args.get("entity_type", "BASE")
     old_type = getattr(sess, "entity_type", "BASE")
     setattr(sess, "entity_type", new_type)
+    if new_type == "LLC" and old_type != "LLC":
+        _reset_llc_step(sess)
+    if new_type in ("LLC", "C-CORP", "S-CORP"):
+        _switch_entity_fields(sess, new_type)
+        if new_type != old_type:
+            UiEvents.emit(sess, ENTITY_SWITCHED, old=old_type, new=new_type)
     print(f"[AGENT LOG] 🔒 setEntityType -> {old_type} → {new_type}")
     return f"Entity type set to {new_type}"
 
@@ -125,6 +416,8 @@ async def updateToPaymentMode(args: UpdateToPaymentArgs) -> str:
         return "No active session to update."
     old = getattr(sess, "entity_type", "BASE")
     setattr(sess, "entity_type", "PAYMENT")
+    if old in ("LLC", "C-CORP", "S-CORP"):
+        setattr(sess, "original_entity_type", _normalize_entity_label(old))
     setattr(sess, "awaiting_payment", False)
     setattr(sess, "payment_status", None)
     print(f"[AGENT LOG] 💳 updateToPaymentMode -> {old} → PAYMENT (awaiting_payment=False, payment_status=None)")
@@ -142,85 +435,99 @@ async def updateEntityType(args: UpdateEntityTypeArgs) -> str:
         return "Unsupported entity type."
     old = getattr(sess, "entity_type", "PAYMENT")
     setattr(sess, "entity_type", "LLC" if target == "LLC" else "C-CORP" if target == "C-Corp" else "S-CORP")
+    if target == "LLC":
+        _reset_llc_step(sess)
+    _switch_entity_fields(sess, getattr(sess, "entity_type"))
+    old_entity = getattr(sess, "original_entity_type", None)
+    UiEvents.emit(sess, ENTITY_SWITCHED, old=(old_entity or "").upper() or old, new=getattr(sess, "entity_type"))
+    setattr(sess, "original_entity_type", target)
     setattr(sess, "awaiting_payment", False)
     setattr(sess, "payment_status", None)
+    # Totals change with the entity, so neither the old quote nor open Checkout Sessions may be reused
+    for attr in ("server_quote", "payment_quote", "payment_checkout_url", "payment_checkout_id"):
+        setattr(sess, attr, None)
+    PaymentService.invalidate_checkout_cache(session_key(sess))
+    payment_watcher.unwatch(session_key(sess))
     print(f"[AGENT LOG] 🔁 updateEntityType (Payment) -> {old} → {getattr(sess,'entity_type')} (flags reset)")
     return f"Entity type updated to {target}. We’ll refresh totals and continue."
 
-# Fallback fees (same as your table)
-_FALLBACK_FEES = {
-    'Alabama':        {'llc': 200, 's-corp': 208, 'c-corp': 208},
-    'Alaska':         {'llc': 250, 's-corp': 250, 'c-corp': 250},
-    'Arizona':        {'llc': 50,  's-corp': 60,  'c-corp': 60 },
-    'Arkansas':       {'llc': 45,  's-corp': 50,  'c-corp': 50 },
-    'California':     {'llc': 70,  's-corp': 100, 'c-corp': 100},
-    'Colorado':       {'llc': 50,  's-corp': 50,  'c-corp': 50 },
-    'Connecticut':    {'llc': 120, 's-corp': 250, 'c-corp': 250},
-    'Delaware':       {'llc': 90,  's-corp': 89,  'c-corp': 89 },
-    'Florida':        {'llc': 125, 's-corp': 70,  'c-corp': 70 },
-    'Georgia':        {'llc': 100, 's-corp': 100, 'c-corp': 100},
-    'Hawaii':         {'llc': 50,  's-corp': 50,  'c-corp': 50 },
-    'Idaho':          {'llc': 100, 's-corp': 100, 'c-corp': 100},
-    'Illinois':       {'llc': 150, 's-corp': 150, 'c-corp': 150},
-    'Indiana':        {'llc': 95,  's-corp': 90,  'c-corp': 90 },
-    'Iowa':           {'llc': 50,  's-corp': 50,  'c-corp': 50 },
-    'Kansas':         {'llc': 160, 's-corp': 90,  'c-corp': 90 },
-    'Kentucky':       {'llc': 40,  's-corp': 50,  'c-corp': 50 },
-    'Louisiana':      {'llc': 100, 's-corp': 75, 'c-corp': 75 },
-    'Maine':          {'llc': 175, 's-corp': 145, 'c-corp': 145},
-    'Maryland':       {'llc': 150, 's-corp': 120, 'c-corp': 120},
-    'Massachusetts':  {'llc': 500, 's-corp': 275, 'c-corp': 275},
-    'Michigan':       {'llc': 50,  's-corp': 60,  'c-corp': 60 },
-    'Minnesota':      {'llc': 155, 's-corp': 135, 'c-corp': 135},
-    'Mississippi':    {'llc': 50,  's-corp': 50,  'c-corp': 50 },
-    'Missouri':       {'llc': 50,  's-corp': 58,  'c-corp': 58 },
-    'Montana':        {'llc': 35,  's-corp': 70,  'c-corp': 70 },
-    'Nebraska':       {'llc': 100, 's-corp': 60,  'c-corp': 60 },
-    'Nevada':         {'llc': 425, 's-corp': 725, 'c-corp': 725},
-    'New Hampshire':  {'llc': 100, 's-corp': 100, 'c-corp': 100},
-    'New Jersey':     {'llc': 125, 's-corp': 125, 'c-corp': 125},
-    'New Mexico':     {'llc': 50,  's-corp': 100,  'c-corp': 100},
-    'New York':       {'llc': 200, 's-corp': 125, 'c-corp': 125},
-    'North Carolina': {'llc': 125, 's-corp': 125, 'c-corp': 125},
-    'North Dakota':   {'llc': 135, 's-corp': 100,  'c-corp': 100},
-    'Ohio':           {'llc': 99,  's-corp': 99,  'c-corp': 99 },
-    'Oklahoma':       {'llc': 100, 's-corp': 50,  'c-corp': 50 },
-    'Oregon':         {'llc': 100, 's-corp': 100, 'c-corp': 100},
-    'Pennsylvania':   {'llc': 125, 's-corp': 125, 'c-corp': 125},
-    'Rhode Island':   {'llc': 150, 's-corp': 230,  'c-corp': 230},
-    'South Carolina': {'llc': 110, 's-corp': 125,  'c-corp': 125},
-    'South Dakota':   {'llc': 150, 's-corp': 150,  'c-corp': 150},
-    'Tennessee':      {'llc': 300, 's-corp': 100,  'c-corp': 100},
-    'Texas':          {'llc': 300, 's-corp': 300,  'c-corp': 300},
-    'Utah':           {'llc': 70,  's-corp': 70,  'c-corp': 70 },
-    'Vermont':        {'llc': 125, 's-corp': 125,  'c-corp': 125},
-    'Virginia':       {'llc': 100, 's-corp': 25,   'c-corp': 25 },
-    'Washington':     {'llc': 200, 's-corp': 200,  'c-corp': 200},
-    'West Virginia':  {'llc': 100, 's-corp': 50,   'c-corp': 50 },
-    'Wisconsin':      {'llc': 130, 's-corp': 100,  'c-corp': 100},
-    'Wyoming':        {'llc': 100, 's-corp': 100,  'c-corp': 100},
-    'Washington, DC': {'llc': 99,  's-corp': 99,   'c-corp': 99 },
-}
-
 @function_tool
 async def stateFeeLookup(args: StateFeeLookupArgs) -> str:
     print(f"[TOOL LOG] 🔎 stateFeeLookup called with args={args}")
     state_raw = args.get("state", "")
     ent_raw = args.get("entity_type", "")
-    label = _normalize_entity_label(ent_raw)
-    state_name = _resolve_state_name(state_raw)
+    label = normalize_entity(ent_raw)
+    # Exact alias, then a confident typo correction ("Calfornia", "N. Carolina", "wash dc")
+    state_name = correct_state(state_raw) or (state_raw or "").strip()
 
-    if not state_name or label not in ("LLC", "C-Corp", "S-Corp"):
+    if not state_name or not label:
         print("[TOOL LOG] 🔎 stateFeeLookup -> missing params")
         return json.dumps({"error": "missing_params", "state": state_raw, "entity_type": ent_raw})
 
-    key = "llc" if label == "LLC" else "c-corp" if label == "C-Corp" else "s-corp"
-    fee = _FALLBACK_FEES.get(state_name, {}).get(key)
+    fee = filing_fee(state_name, label)
     if fee is None:
-        print(f"[TOOL LOG] 🔎 stateFeeLookup (fallback) -> fee_not_found for {state_name}/{label}")
-        return json.dumps({"error": "fee_not_found", "state": state_name, "entity_type": label})
+        print(f"[TOOL LOG] 🔎 stateFeeLookup -> fee_not_found for {state_name}/{label}")
+        out = {"error": "fee_not_found", "state": state_name, "entity_type": label}
+        match = match_state(state_raw)
+        if match.name:
+            out.update(suggestion=match.name, confidence=match.confidence)
+        return json.dumps(out)
     out = {"state": state_name, "entity_type": label, "stateFilingFee": float(fee)}
-    print(f"[TOOL LOG] 🔎 stateFeeLookup (fallback) -> {out}")
+    if resolve_state(state_raw) is None:
+        out["correctedFrom"] = state_raw
+    print(f"[TOOL LOG] 🔎 stateFeeLookup -> {out}")
+    return json.dumps(out)
+
+@function_tool
+async def getQuote(args: GetQuoteArgs) -> str:
+    print(f"[TOOL LOG] 🧮 getQuote called with args={args}")
+    q = QuoteEngine.get_quote(
+        args.get("productName", ""), args.get("billingCycle"),
+        args.get("state", ""), args.get("entity_type", ""),
+    )
+    if "error" in q:
+        print(f"[TOOL LOG] 🧮 getQuote -> {q}")
+        return json.dumps(q)
+
+    sess = CURRENT_SESSION.get()
+    if isinstance(sess, OpenAIConversationsSession):
+        # createPaymentLink charges this server-computed quote, not model arithmetic
+        setattr(sess, "server_quote", q)
+
+    out = {
+        "productName": q["productName"],
+        "billingCycle": q["billingCycle"],
+        "state": q["state"],
+        "entity_type": q["entity_type"],
+        "price": q["price"],
+        "stateFilingFee": q["stateFilingFee"],
+        "totalDueNow": q["totalDueNow"],
+        "display": {
+            "plan": f"{q['productName']} — {QuoteEngine.format_usd(q['planPriceCents'])}/{q['billingCycle']}",
+            "stateFilingFee": QuoteEngine.format_usd(q["stateFilingFeeCents"]),
+            "totalDueNow": QuoteEngine.format_usd(q["totalDueNowCents"]),
+        },
+    }
+    if "correctedFrom" in q:
+        out["correctedFrom"] = q["correctedFrom"]
+    print(f"[TOOL LOG] 🧮 getQuote -> {out}")
+    return json.dumps(out)
+
+@function_tool
+async def compareStateFees(args: CompareStateFeesArgs) -> str:
+    print(f"[TOOL LOG] 📊 compareStateFees called with args={args}")
+    out = FeeComparator.compare(
+        args.get("entity_type", ""),
+        product_name=args.get("productName"),
+        billing_cycle=args.get("billingCycle"),
+        chosen_state=args.get("chosenState"),
+        states=args.get("states"),
+        top_n=args.get("topN"),
+    )
+    if "error" in out:
+        print(f"[TOOL LOG] 📊 compareStateFees -> {out}")
+    else:
+        print(f"[TOOL LOG] 📊 compareStateFees -> {out['compared']} compared, top={[r['state'] for r in out['results']]}")
     return json.dumps(out)
 
 @function_tool
@@ -231,20 +538,44 @@ async def createPaymentLink(args: CreatePaymentLinkArgs) -> str:
         print("[TOOL LOG] 🔗 createPaymentLink -> no session")
         return "link_error:no_session"
 
-    # ✅ ensure a conversation_id exists
-    conv_id = getattr(sess, "conversation_id", None)
+    # ✅ ensure a conversation_id exists (normally the SDK conversation id, see _ensure_conversation)
+    conv_id = session_key(sess)
     if not conv_id:
         import uuid
         conv_id = str(uuid.uuid4())
         setattr(sess, "conversation_id", conv_id)
 
-    quote = {
-        "productName": args.get("productName"),
-        "price": float(args.get("price", 0)),
-        "billingCycle": args.get("billingCycle"),
-        "stateFilingFee": float(args.get("stateFilingFee", 0)),
-        "totalDueNow": float(args.get("totalDueNow", 0)),
-    }
+    server_quote = getattr(sess, "server_quote", None)
+    if (
+        server_quote
+        and server_quote["productName"] == args.get("productName")
+        and server_quote["billingCycle"] == (args.get("billingCycle") or "yearly")
+    ):
+        quote = {k: server_quote[k] for k in ("productName", "price", "billingCycle", "stateFilingFee", "totalDueNow")}
+        if abs(float(args.get("totalDueNow", 0)) - quote["totalDueNow"]) >= 0.005:
+            print(f"[TOOL LOG] 🔗 createPaymentLink -> model total {args.get('totalDueNow')} replaced by server quote {quote['totalDueNow']}")
+    else:
+        # No matching server quote: price the requested plan on the server from the session's
+        # state and entity type. Model-supplied amounts are never charged.
+        record = _fields(sess)
+        state = record.get("state") or (server_quote or {}).get("state")
+        entity = (
+            getattr(sess, "original_entity_type", None) or record.get("entityType")
+            or (server_quote or {}).get("entity_type")
+        )
+        q = (
+            QuoteEngine.get_quote(args.get("productName", ""), args.get("billingCycle"), state, entity)
+            if state and entity else {"error": "missing_params", "state": state, "entity_type": entity}
+        )
+        if "error" in q:
+            print(f"[TOOL LOG] 🔗 createPaymentLink -> no server quote: {q}")
+            return (
+                f"link_error:quote_required ({q['error']}) — call getQuote with the plan, billing cycle, "
+                "state and entity type, confirm the total with the user, then call createPaymentLink again"
+            )
+        setattr(sess, "server_quote", q)
+        quote = {k: q[k] for k in ("productName", "price", "billingCycle", "stateFilingFee", "totalDueNow")}
+        print(f"[TOOL LOG] 🔗 createPaymentLink -> priced server-side for {q['state']} {q['entity_type']}: {quote['totalDueNow']}")
 
     setattr(sess, "awaiting_payment", True)
     setattr(sess, "payment_status", "pending")
@@ -276,8 +607,12 @@ async def createPaymentLink(args: CreatePaymentLinkArgs) -> str:
         
         # ✅ SAVE again with the checkout details
         _save_session_attributes(conv_id, sess)
+        payment_watcher.watch(conv_id)
+        if checkout_url:
+            UiEvents.emit(sess, PAYMENT_LINK_READY, url=checkout_url, reused=bool(out.get("reused")), **quote)
         
-        print(f"[TOOL LOG] 🔗 Stripe Checkout created id={checkout_id} url={('…'+checkout_url[-24:]) if checkout_url else None}")
+        verb = "reused" if out.get("reused") else "created"
+        print(f"[TOOL LOG] 🔗 Stripe Checkout {verb} id={checkout_id} url={('…'+checkout_url[-24:]) if checkout_url else None}")
     except Exception as e:
         print("[TOOL LOG] 🔗 PaymentService error (non-fatal):", e)
 
@@ -293,9 +628,10 @@ async def checkPaymentStatus(args: CheckPaymentStatusArgs) -> str:
         print("[TOOL LOG] 🧾 checkPaymentStatus -> unknown (no session)")
         return "unknown"
 
-    status = PaymentService.check_payment_status(getattr(sess, "conversation_id", None))
+    status = PaymentService.check_payment_status(session_key(sess))
     if status in ("completed", "pending", "failed"):
         setattr(sess, "payment_status", status)
+        payment_watcher.record_status(session_key(sess), status)
         # ⬇️ NEW: flip flags so we can trigger the Payment Agent summary right after completion
         if status == "completed":
             setattr(sess, "awaiting_payment", False)
@@ -309,11 +645,78 @@ async def checkPaymentStatus(args: CheckPaymentStatusArgs) -> str:
     return norm
 
 
+# ========= CONTACT PRE-PARSE =========
+def _refresh_otp_delivery(session: OpenAIConversationsSession) -> None:
+    """Pick up the outbox status of the pending code; a failed delivery is shown once."""
+    email = getattr(session, "otp_sent_to", None)
+    if not email or getattr(session, "otp_verified", False):
+        return
+    record = otp.delivery_status(session_key(session), email)
+    if not record:
+        return
+    previous = getattr(session, "otp_delivery", None)
+    setattr(session, "otp_delivery", record["status"])
+    if record["status"] in ("failed", "expired") and previous != record["status"]:
+        UiEvents.emit(session, OTP_DELIVERY_FAILED, email=email, status=record["status"], error=record.get("last_error"))
+
+def _prefill_contact(session: OpenAIConversationsSession, message: str) -> Optional[str]:
+    """
+    Extract name/email/phone from a Base-mode message, merge them into session.contact and,
+    once all three are valid, send the OTP directly. Returns a note for the agent, or None.
+    A name already on file is only replaced by an explicitly labeled one ("my name is …").
+    """
+    if getattr(session, "entity_type", "BASE") != "BASE" or getattr(session, "otp_verified", False):
+        return None
+    contact = dict(getattr(session, "contact", None) or {})
+    has_name = bool(contact.get("fullName") or _fields(session).get("fullName"))
+    found = {k: v for k, v in ContactValidator.extract(message, guess_name=not has_name).items() if v}
+    if not found:
+        return None
+
+    contact.update(found)
+    setattr(session, "contact", contact)
+    IntakeRecord.apply(_fields(session), found)
+    v = ContactValidator.validate(contact.get("fullName"), contact.get("email"), contact.get("phone"))
+    print(f"[CONTACT] 🧾 pre-parse found={sorted(found)} valid={v['valid']} missing={v['missing']}")
+    if not v["valid"]:
+        return None
+
+    if getattr(session, "otp_sent_to", None) != v["email"]:
+        result = otp.send_otp_to_user({"email": v["email"]}, session_key(session))
+        print(f"[CONTACT] ✉️ OTP auto-send -> {result}")
+        if not result.startswith("OTP sent"):
+            return None
+        setattr(session, "otp_sent_to", v["email"])
+        setattr(session, "otp_delivery", "queued")
+        UiEvents.emit(session, OTP_SENT, email=v["email"])
+    return (
+        "[SERVER NOTE] Contact validated server-side: "
+        f"fullName={v['fullName']}, email={v['email']}, phone={v['phone']}. "
+        f"The verification code has ALREADY been sent to {v['email']} — do NOT call sendEmailOtp; "
+        "confirm the details and ask the user for the code."
+    )
+
+
 # ========= AGENTS =========
+def _with_server_state(instructions):
+    """
+    Append the per-turn server_state line to an agent's instructions (a string or another
+    instructions callable). Evaluated before every model call, so tool updates made earlier
+    in the same run are already visible to the next request.
+    """
+    def build(ctx, agent) -> str:
+        text = instructions(ctx, agent) if callable(instructions) else instructions
+        text = f"{text}\n\n{ServerState.render(CURRENT_SESSION.get(), [t.name for t in agent.tools])}"
+        token_metrics.set_instruction_size(agent.name, text)
+        return text
+    # Static prompts stay measurable at startup (token_metrics.register_agents)
+    build.static_instructions = None if callable(instructions) else instructions
+    return build
+
 corp_agent = Agent(
     name="Corp Assistant",
     model="gpt-4o",
-    instructions=(
+    instructions=_with_server_state(
         "🏷️ AGENT IDENTIFICATION: You are the Corporate Formation Assistant. "
         "Always start your responses with '[CORP AGENT]'.\n\n"
         + CorpPrompt.get_mode_prompt()
@@ -321,48 +724,84 @@ corp_agent = Agent(
         "- If the user explicitly asks to switch entity type only to (LLC), call `setEntityType` with that type.\n"
         "- Do not call the `setEntityType` if the switching is asked for entity type other than LLC.\n"
         "- Do not answer LLC-specific questions in Corp mode; switch with `setEntityType` when appropriate.\n"
-        "- After the exact phrase __I Confirm__, call `updateToPaymentMode` to continue with payment."
+        "- For cost or cheapest-state questions, call `compareStateFees` once and cite its `display` values; never recall fees from memory.\n"
+        "- Before showing the Shares/Directors/Officers snapshot rows, call `validateCorpStructure` with everything captured so far; relay its `errors` verbatim and use its `summary` values.\n"
+        "- Once the designator is chosen (or the business name changes), call `checkBusinessName` and show its `legalName` as the Legal Business Name.\n"
+        "- Record every captured or changed field with one `setFields` call per message (`setField` for a single value); relay its `errors` and re-ask only those fields. The server renders the Snapshot table from the record, so never write it yourself.\n"
+        "- After the exact phrase __I Confirm__, call `updateToPaymentMode` to continue with payment.\n"
+        "- After `setEntityType` or `updateToPaymentMode` succeeds, stop with a one-line acknowledgment: the next assistant answers in the same message."
     ),
-    tools=[setEntityType, updateToPaymentMode]
+    tools=[setEntityType, updateToPaymentMode, compareStateFees, normalizeAddress, validateCorpStructure, checkBusinessName, setField, setFields]
+)
+
+_LLC_HEADER = (
+    "🏷️ AGENT IDENTIFICATION: You are the LLC Formation Assistant. "
+    "Always start your responses with '[LLC AGENT]'.\n\n"
+)
+_LLC_ROUTING = (
+    "\n\nRouting rules:\n"
+    "- If the user explicitly asks to switch entity type only to (C-Corp or S-Corp) call `setEntityType` with that type.\n"
+    "- Do not call the `setEntityType` if the switching is asked for entity type other than S-Corp or C-Corp.\n"
+    "- Do not answer corporate-specific questions in LLC mode; switch with `setEntityType` when appropriate.\n"
+    "- For cost or cheapest-state questions, call `compareStateFees` once and cite its `display` values; never recall fees from memory.\n"
+    "- After any change to governance, sole member, members or managers, call `validateLlcMembers` with everything captured so far; relay its `errors` verbatim and use its `summary` values.\n"
+    "- Once the designator is chosen (or the business name changes), call `checkBusinessName` and show its `legalName` as the Legal Business Name.\n"
+    "- Record every captured or changed field with one `setFields` call per message (`setField` for a single value); relay its `errors` and re-ask only those fields. The server renders the Snapshot table from the record, so never write it yourself.\n"
+    "- Before asking the first question of a new step (1–7), call `setLlcStep` with that step number; only the current and next steps' rules are shown above.\n"
+    "- After the exact phrase __I Confirm__, call `updateToPaymentMode` to continue with payment.\n"
+    "- After `setEntityType` or `updateToPaymentMode` succeeds, stop with a one-line acknowledgment: the next assistant answers in the same message."
 )
 
+# Size of the unscoped prompt, for the per-turn comparison log
+_LLC_FULL_PROMPT = _LLC_HEADER + LLCPrompt.get_mode_prompt() + _LLC_ROUTING
+_LLC_FULL_SIZE = (len(_LLC_FULL_PROMPT.encode("utf-8")), count_tokens(_LLC_FULL_PROMPT))
+
+def _llc_instructions(ctx, agent) -> str:
+    """Evaluated before every model call, so a `setLlcStep` mid-run already shrinks the next request."""
+    sess = CURRENT_SESSION.get()
+    step = getattr(sess, "llc_step", None)
+    pending = getattr(sess, "llc_pending_steps", None) or ()
+    text = _LLC_HEADER + LLCPrompt.get_step_prompt(step, pending) + _LLC_ROUTING
+    print(f"[PROMPT LOG] 📐 LLC step={step} pending={list(pending)} -> {len(text.encode('utf-8')):,} bytes ≈ {count_tokens(text):,} tokens "
+          f"(full: {_LLC_FULL_SIZE[0]:,} bytes ≈ {_LLC_FULL_SIZE[1]:,} tokens)")
+    return text
+
 llc_agent = Agent(
     name="LLC Assistant",
     model="gpt-4o",
-    instructions=(
-        "🏷️ AGENT IDENTIFICATION: You are the LLC Formation Assistant. "
-        "Always start your responses with '[LLC AGENT]'.\n\n"
-        + LLCPrompt.get_mode_prompt()
-        + "\n\nRouting rules:\n"
-        "- If the user explicitly asks to switch entity type only to (C-Corp or S-Corp) call `setEntityType` with that type.\n"
-        "- Do not call the `setEntityType` if the switching is asked for entity type other than S-Corp or C-Corp.\n"
-        "- Do not answer corporate-specific questions in LLC mode; switch with `setEntityType` when appropriate.\n"
-        "- After the exact phrase __I Confirm__, call `updateToPaymentMode` to continue with payment."
-    ),
-    tools=[setEntityType, updateToPaymentMode]
+    instructions=_with_server_state(_llc_instructions),
+    tools=[setEntityType, updateToPaymentMode, compareStateFees, normalizeAddress, validateLlcMembers, checkBusinessName, setLlcStep, setField, setFields]
 )
 
 payment_agent = Agent(
     name="Payment Assistant",
     model="gpt-4o",
-    instructions=PaymentPrompt.getModePrompt(),
-    tools=[stateFeeLookup, createPaymentLink, checkPaymentStatus, updateEntityType]
+    instructions=_with_server_state(PaymentPrompt.getModePrompt()),
+    tools=[getQuote, stateFeeLookup, compareStateFees, createPaymentLink, checkPaymentStatus, updateEntityType]
 )
 
 base_agent = Agent(
     name="Incubation AI (Base Assistant)",
     model="gpt-4o",
-    instructions=(
+    instructions=_with_server_state(
         "🏷️ AGENT IDENTIFICATION: You are the Base Assistant. "
         "Always start your responses with '[BASE AGENT]'.\n\n"
         + BasePrompt.get_mode_prompt()
         + "\n\nRouting rules:\n"
         "- When the user chooses an entity type (LLC / C-CORP / S-CORP), call `setEntityType` with that type immediately.\n"
-        "- Do NOT answer LLC- or Corp-specific questions here; ask to choose entity and set it via `setEntityType` first."
+        "- After `setEntityType` succeeds, stop with a one-line acknowledgment: the specialist assistant answers in the same message.\n"
+        "- Do NOT answer LLC- or Corp-specific questions here; ask to choose entity and set it via `setEntityType` first.\n"
+        "- For cost or cheapest-state questions, call `compareStateFees` once and cite its `display` values; never recall fees from memory.\n"
+        "- In Step 5, call `searchNaics` with the business purpose and offer only the codes it returns.\n"
+        "- Record every captured or changed field with one `setFields` call per message (`setField` for a single value); relay its `errors` and re-ask only those fields. The server renders the Snapshot table from the record, so never write it yourself.\n"
+        "- If the message carries a [SERVER NOTE] saying the code was already sent, do NOT call `sendEmailOtp`; ask for the code.\n"
+        "- Otherwise validate contact details with `validateContact` and call `sendEmailOtp` only when it returns valid=true."
     ),
-    tools=[sendEmailOtp, verifyEmailOtp, setEntityType]
+    tools=[sendEmailOtp, verifyEmailOtp, validateContact, setEntityType, compareStateFees, searchNaics, setField, setFields]
 )
 
+token_metrics.register_agents([base_agent, llc_agent, corp_agent, payment_agent])
+
 
 # ========= ROUTER =========
 def _agent_for_entity(entity_type: str):
@@ -379,9 +818,28 @@ def _agent_for_entity(entity_type: str):
     return base_agent, "Base Agent"
 
 
+# Re-dispatches per user message (Base → LLC → Payment is the longest legitimate chain)
+MAX_SAME_TURN_HANDOFFS = 2
+
+def _handoff_input(session: OpenAIConversationsSession) -> str:
+    """Input for the specialist that takes over mid-turn; the user's message is already in the session history."""
+    return (
+        "SYSTEM_TRIGGER:HANDOFF\n"
+        f"The conversation was just routed to you (entity_type={session.entity_type}) while answering the user's last message. "
+        "Answer that message now and continue your flow from its current step. "
+        "Do not greet again and do not mention the switch or this trigger."
+    )
+
+
+def _add_usage(total: Dict[str, Any], delta: Dict[str, Any]) -> None:
+    """Sum one run's TokenMetrics delta into the turn's usage (for benchmark cassettes)."""
+    for key in ("input_tokens", "output_tokens", "requests"):
+        total[key] += delta.get(key, 0)
+
+
 # ========= UI HELPERS =========
 def banner_for(session: Optional[OpenAIConversationsSession]) -> str:
-    cid = getattr(session, "conversation_id", None)
+    cid = session_key(session)
     return f"**Conversation ID:** `{cid}` — keep this if you want to resume later." if cid else ""
 
 def init_session() -> OpenAIConversationsSession:
@@ -411,6 +869,12 @@ def _save_session_attributes(conv_id: str, session: OpenAIConversationsSession):
             "payment_quote": getattr(session, "payment_quote", None),
             "payment_checkout_url": getattr(session, "payment_checkout_url", None),
             "payment_checkout_id": getattr(session, "payment_checkout_id", None),
+            "contact": getattr(session, "contact", None),
+            "otp_sent_to": getattr(session, "otp_sent_to", None),
+            "otp_verified": getattr(session, "otp_verified", False),
+            "original_entity_type": getattr(session, "original_entity_type", None),
+            "llc_step": getattr(session, "llc_step", None),
+            "llc_pending_steps": getattr(session, "llc_pending_steps", []),
         }
         
         # ✅ FIX: Use separate key structure to avoid conflict with PaymentService
@@ -458,6 +922,7 @@ def _restore_or_create_session(conv_id: str) -> OpenAIConversationsSession:
         # Try to create session with existing conversation_id
         # This should preserve the OpenAI conversation history
         session = OpenAIConversationsSession(conversation_id=conv_id)
+        session_key(session)
         
         # If we have stored session attributes, restore them
         session_data = _load_session_attributes(conv_id)
@@ -476,6 +941,7 @@ def _restore_or_create_session(conv_id: str) -> OpenAIConversationsSession:
         print(f"[SESSION] ⚠️ Error restoring session {conv_id}: {e}")
         # Fallback: create new session
         session = OpenAIConversationsSession(conversation_id=conv_id)
+        session_key(session)
         setattr(session, "entity_type", "PAYMENT")
         setattr(session, "awaiting_payment", True)
         return session
@@ -505,6 +971,7 @@ def _run_payment_completed_summary(session: OpenAIConversationsSession) -> str:
             finally:
                 CURRENT_SESSION.reset(token)
             print("[RUN LOG] ✅ Payment Agent summary generated")
+            token_metrics.record_run(session_key(session), payment_agent.name, payment_agent.model, result)
             return (result.final_output or "").strip()
         finally:
             loop.close()
@@ -546,11 +1013,12 @@ def start_or_resume(conv_id: str, session: Optional[OpenAIConversationsSession])
         if conv_id and conv_id.strip()
         else init_session()
     )
+    session_key(session)
     if not hasattr(session, "entity_type"):
         session.entity_type = "BASE"
 
     msg = "Resumed your conversation. Welcome back! 🎉" if conv_id.strip() else "Started a new conversation."
-    print(f"[UI LOG] start_or_resume -> {msg} | entity_type={session.entity_type} | conv_id={getattr(session,'conversation_id',None)}")
+    print(f"[UI LOG] start_or_resume -> {msg} | entity_type={session.entity_type} | conv_id={session_key(session)}")
     chat = [{"role": "assistant", "content": f"{msg}\n\n{banner_for(session)}"}]
     return (
         chat, session, banner_for(session),
@@ -571,6 +1039,7 @@ def respond(message: str, history, session: Optional[OpenAIConversationsSession]
 
     if not hasattr(session, "entity_type"):
         session.entity_type = "BASE"
+    _ensure_conversation(session)
 
     # Broadened detection for "I've paid" phrasing to trigger status check
     lower_msg = (message or "").lower().strip()
@@ -596,7 +1065,16 @@ def respond(message: str, history, session: Optional[OpenAIConversationsSession]
         print("[UI LOG] 🔍 Payment status check requested...")
         message = "Please check my payment status"
 
+    # OTP emails are delivered in the background; surface their latest status before the run
+    _refresh_otp_delivery(session)
+
+    # Server-side contact pre-parse: fires the OTP send without a model round trip
+    contact_note = _prefill_contact(session, message)
+    agent_input = f"{message}\n\n{contact_note}" if contact_note else message
+
     current_agent, agent_name = _agent_for_entity(session.entity_type)
+    turn_mode, turn_step = session.entity_type, getattr(session, "llc_step", None)
+    usage = {"input_tokens": 0, "output_tokens": 0, "requests": 0}
     print(f"[RUN LOG] ▶ Routing message to {agent_name} | entity_type={session.entity_type}")
     print(f"[RUN LOG] 📨 User message (first 120): {message[:120]!r}")
 
@@ -604,22 +1082,38 @@ def respond(message: str, history, session: Optional[OpenAIConversationsSession]
         def run_agent():
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
+            conv_id = session_key(session)
+            agent, name = current_agent, agent_name
             try:
                 token = CURRENT_SESSION.set(session)
                 try:
-                    print(f"[RUN LOG] 🔧 Runner.run({agent_name}) starting…")
-                    result = loop.run_until_complete(Runner.run(current_agent, message, session=session))
+                    print(f"[RUN LOG] 🔧 Runner.run({name}) starting…")
+                    result = loop.run_until_complete(Runner.run(agent, agent_input, session=session))
+                    _add_usage(usage, token_metrics.record_run(conv_id, agent.name, agent.model, result))
+                    # A tool switched the mode (setEntityType / updateToPaymentMode / updateEntityType):
+                    # let the new specialist answer in this same turn instead of after a filler reply
+                    for _ in range(MAX_SAME_TURN_HANDOFFS):
+                        next_agent, next_name = _agent_for_entity(session.entity_type)
+                        if next_agent is agent:
+                            break
+                        print(f"[RUN LOG] 🔀 Same-turn handoff {name} → {next_name} (entity_type={session.entity_type})")
+                        token_metrics.record_handoff(conv_id, agent.name, next_agent.name)
+                        agent, name = next_agent, next_name
+                        result = loop.run_until_complete(Runner.run(agent, _handoff_input(session), session=session))
+                        _add_usage(usage, token_metrics.record_run(conv_id, agent.name, agent.model, result))
                 finally:
                     CURRENT_SESSION.reset(token)
-                print(f"[RUN LOG] ✅ Runner.run({agent_name}) finished")
-                return result
+                print(f"[RUN LOG] ✅ Runner.run({name}) finished")
+                return result, name
             finally:
                 loop.close()
 
+        started = time.perf_counter()
         with concurrent.futures.ThreadPoolExecutor() as executor:
-            result = executor.submit(run_agent).result(timeout=120)
-            response_content = (result.final_output or "").strip()
-            print(f"[RUN LOG] 💬 {agent_name} response (first 160): {response_content[:160]!r}")
+            result, agent_name = executor.submit(run_agent).result(timeout=120)
+        usage["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        response_content = (result.final_output or "").strip()
+        print(f"[RUN LOG] 💬 {agent_name} response (first 160): {response_content[:160]!r}")
 
     except Exception as e:
         response_content = f"I encountered an error processing your message. Please try again. Error: {str(e)[:120]}..."
@@ -628,41 +1122,56 @@ def respond(message: str, history, session: Optional[OpenAIConversationsSession]
     # If payment just completed (flag set in checkPaymentStatus), run the Payment Agent summary now
     if session.entity_type == "PAYMENT" and getattr(session, "show_payment_summary", False):
         try:
-            summary = _run_payment_completed_summary(session)
+            summary = payment_watcher.summary_once(
+                session_key(session), lambda: _run_payment_completed_summary(session)
+            )
             response_content = (response_content + "\n\n" + summary).strip() if response_content else summary
         finally:
             setattr(session, "show_payment_summary", False)
 
-    # Detect the payment popup trigger line and replace with full payment details including URL
-    checkout_url = getattr(session, "payment_checkout_url", None)
-    if response_content.strip().startswith("_Your secure payment gateway is now open.") and checkout_url:
-        # Extract details from the trigger line
-        import re
-        match = re.search(r'Total due now: \$?([0-9.,]+).*Plan: ([^—]+)—([^+]+)\+.*State filing fees: \$?([0-9.,]+)', response_content)
-        
-        if match:
-            total_due = match.group(1)
-            plan_name = match.group(2).strip()
-            billing_cycle = match.group(3).strip()
-            state_fee = match.group(4)
-            
-            # Replace with detailed payment response including the actual URL
-            response_content = f"""🔗 **Your secure payment link is ready!**
+    # Formatting rules (tables, emphasis, HTML, single Snapshot) are enforced here instead of by the prompts;
+    # in server-rendered Snapshot modes every model copy of the Snapshot is dropped
+    response_content, fixes = OutputGuard.apply(response_content, drop_snapshots=session.entity_type in RENDERED_MODES)
+    if fixes:
+        print(f"[GUARD] 🧽 {fixes}")
 
-**Total Due Now: ${total_due}**
-- Plan: {plan_name} — {billing_cycle}
-- State filing fees: ${state_fee}
-
-**Click here to complete your payment:**
-{checkout_url}
-
-Once you complete payment, return here and I'll automatically verify your payment status."""
-            
-            print(f"[UI] 🔗 Payment trigger converted to full response with URL")
-        else:
-            # Fallback: just append the URL
-            response_content = response_content + f"\n\n**Payment Link:** {checkout_url}"
-            print(f"[UI] 🔗 Payment URL appended to response")
+    # Tool events (payment link, entity switch, OTP sent) are rendered here; nothing is parsed from the reply
+    events = UiEvents.drain(session)
+    checkout_url = getattr(session, "payment_checkout_url", None)
+    if (
+        session.entity_type == "PAYMENT"
+        and getattr(session, "awaiting_payment", False)
+        and checkout_url
+        and not any(e["type"] == PAYMENT_LINK_READY for e in events)
+    ):
+        events.append({
+            "type": PAYMENT_LINK_PENDING, "url": checkout_url,
+            "totalDueNow": (getattr(session, "payment_quote", None) or {}).get("totalDueNow"),
+        })
+    event_blocks = UiEvents.render_all(events)
+    if event_blocks:
+        response_content = f"{response_content}\n\n{event_blocks}" if response_content else event_blocks
+        print(f"[UI] 📣 Rendered events {[e['type'] for e in events]}")
+
+    # Tool writes made during the run (validators, entity switch) are persisted once per turn
+    intake_store.save(session_key(session), _fields(session))
+
+    # The Snapshot is rendered here from the intake record, always last
+    if session.entity_type in RENDERED_MODES:
+        table = Snapshot.render(_fields(session), session.entity_type)
+        if table:
+            response_content = f"{response_content}\n\n{table}" if response_content else table
+
+    # Benchmark recording (prompt_bench.py replays these per prompt fingerprint)
+    cassette_dir = os.getenv("BENCH_CASSETTE_DIR")
+    if cassette_dir:
+        # One fresh cassette per app session; BENCH_SCRIPT names it after the script it re-records
+        run_id = session_key(session)
+        Cassette.record(cassette_dir, os.getenv("BENCH_SCRIPT") or run_id, run_id, {
+            "mode": turn_mode, "step": turn_step if turn_mode == "LLC" else None,
+            "user": message, "assistant": response_content, **usage,
+            "completed": any(e["type"] == PAYMENT_LINK_READY for e in events),
+        })
 
     # No popup needed - payment link is now directly in chat
     panel_update = gr.update(visible=False, value="")
@@ -677,6 +1186,21 @@ Once you complete payment, return here and I'll automatically verify your paymen
         panel_update
     )
 
+def _redirect_status(conv_id: str, status_hint: Optional[str]) -> str:
+    """Status for a Stripe redirect; Stripe decides, a cancel redirect closes an unpaid checkout.
+
+    The result is fed to the watcher: final statuses end polling for every tab, anything
+    else (re)starts the backoff so the timer keeps checking after the reload.
+    """
+    st = PaymentService.check_payment_status(conv_id)
+    if st not in PaymentWatcher.TERMINAL and (status_hint or "").lower() in ("cancel", "canceled", "cancelled"):
+        st = "failed"
+    if st not in PaymentWatcher.TERMINAL:
+        payment_watcher.watch(conv_id)
+    payment_watcher.record_status(conv_id, st)
+    return st
+
+
 def process_url_params(qs: str, session: Optional[OpenAIConversationsSession], chat):
     """Handle Stripe redirects like ?conv=...&payment=success&cs=... OR
        ?conv_id=...&status=success&session_id=... to auto-check payment on reload."""
@@ -700,8 +1224,9 @@ def process_url_params(qs: str, session: Optional[OpenAIConversationsSession], c
             return chat, session, banner_for(session), gr.update(), gr.update(), gr.update(visible=False, value="")
 
         # Resume or create a session for this conv_id
-        if not isinstance(session, OpenAIConversationsSession) or getattr(session, "conversation_id", None) != conv_id:
+        if not isinstance(session, OpenAIConversationsSession) or session_key(session) != conv_id:
             session = OpenAIConversationsSession(conversation_id=conv_id)
+            session_key(session)
 
         # Make sure we're in Payment mode on return
         setattr(session, "entity_type", "PAYMENT")
@@ -717,17 +1242,17 @@ def process_url_params(qs: str, session: Optional[OpenAIConversationsSession], c
                 print("[UI LOG] process_url_params: failed to persist mapping:", e)
 
         # Check status right away using the same conversation_id
-        st = PaymentService.check_payment_status(conv_id)
+        st = _redirect_status(conv_id, status_hint)
         setattr(session, "payment_status", st)
 
         if st == "completed":
             setattr(session, "awaiting_payment", False)
             # Run & show the Payment Agent final summary immediately
-            summary = _run_payment_completed_summary(session)
-            new_msg_block = summary
+            new_msg_block = payment_watcher.summary_once(conv_id, lambda: _run_payment_completed_summary(session))
         elif st == "pending":
             new_msg_block = "[PAYMENT AGENT]\n\nℹ️ Your payment is still pending confirmation. If you just paid, this can take a moment."
         else:
+            setattr(session, "awaiting_payment", st != "failed")
             new_msg_block = "[PAYMENT AGENT]\n\n❌ Payment not completed. You can try the link again from your conversation."
 
         chat = (chat or []) + [{"role": "assistant", "content": new_msg_block}]
@@ -809,17 +1334,18 @@ def boot(qs: str = ""):
             print("[BOOT] ⚠️ could not persist checkout mapping:", e)
 
     # Check payment now and show the right message immediately
-    st = PaymentService.check_payment_status(conv_id)
+    st = _redirect_status(conv_id, status_hint)
     setattr(session, "payment_status", st)
 
     if st == "completed":
         setattr(session, "awaiting_payment", False)
-        summary = _run_payment_completed_summary(session)
+        summary = payment_watcher.summary_once(conv_id, lambda: _run_payment_completed_summary(session))
         chat = [{"role": "assistant", "content": summary}]
     elif st == "pending":
         chat = [{"role": "assistant", "content":
                 "[PAYMENT AGENT]\n\nℹ️ Your payment is still pending confirmation. If you just paid, this can take a moment."}]
     else:
+        setattr(session, "awaiting_payment", st != "failed")
         chat = [{"role": "assistant", "content":
                 "[PAYMENT AGENT]\n\n❌ Payment not completed. You can try the link again from your conversation."}]
 
@@ -831,9 +1357,38 @@ def boot(qs: str = ""):
     )
 
 
+def poll_payment_status(history, session: Optional[OpenAIConversationsSession]):
+    """Timer tick: push the payment confirmation into the chat without a user turn."""
+    if (
+        not isinstance(session, OpenAIConversationsSession)
+        or getattr(session, "entity_type", None) != "PAYMENT"
+        or not getattr(session, "awaiting_payment", False)
+    ):
+        return gr.update(), gr.update()
+
+    conv_id = session_key(session)
+    st = payment_watcher.poll(conv_id)
+    if st == "completed":
+        setattr(session, "awaiting_payment", False)
+        setattr(session, "payment_status", "completed")
+        summary = payment_watcher.summary_once(conv_id, lambda: _run_payment_completed_summary(session))
+        block = summary
+    elif st == "failed":
+        setattr(session, "awaiting_payment", False)
+        setattr(session, "payment_status", "failed")
+        block = "[PAYMENT AGENT]\n\n❌ Payment not completed. You can try the link again from your conversation."
+    else:
+        return gr.update(), gr.update()
+
+    _save_session_attributes(conv_id, session)
+    print(f"[UI LOG] ⏱️ poll_payment_status -> pushed {st} for conv_id={conv_id}")
+    return (history or []) + [{"role": "assistant", "content": block}], session
+
+
 def end_session(history, session: Optional[OpenAIConversationsSession]):
     end_note = "Session ended. You can now **paste a Conversation ID** (optional) and press **Start / Resume**."
     print("[UI LOG] 🛑 end_session -> dropping session & enabling Start/Resume inputs")
+    payment_watcher.unwatch(session_key(session))
     return (
         [{"role": "assistant", "content": end_note}],
         None,
@@ -892,8 +1447,8 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
     start_btn.click(fn=start_or_resume, inputs=[conv_id_in, st_session],
                     outputs=[chat, st_session, conv_banner, conv_id_in, start_btn, pay_panel])
 
-    msg.submit(fn=respond, inputs=[msg, chat, st_session],
-               outputs=[chat, st_session, conv_banner, conv_id_in, start_btn, pay_panel])
+    msg_event = msg.submit(fn=respond, inputs=[msg, chat, st_session],
+                           outputs=[chat, st_session, conv_banner, conv_id_in, start_btn, pay_panel])
     msg.submit(lambda: "", None, msg)
 
     def clear_chat():
@@ -901,6 +1456,22 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
         return []
 
     clear_btn.click(fn=clear_chat, outputs=[chat])
+
+    # Usage and cost across every conversation is operator data: the panel is opt-in for internal
+    # deployments (SHOW_METRICS_PANEL=1); otherwise metrics only go to the [METRICS] logs
+    if os.getenv("SHOW_METRICS_PANEL", "").strip().lower() in ("1", "true", "yes"):
+        with gr.Accordion("Token & cost metrics (admin)", open=False):
+            metrics_md = gr.Markdown(token_metrics.render_markdown())
+
+        def metrics_view(session):
+            return token_metrics.render_markdown(session_key(session))
+
+        msg_event.then(fn=metrics_view, inputs=[st_session], outputs=[metrics_md], show_progress="hidden")
+
+    # Server-push payment status: cheap ticks, Stripe calls follow PaymentWatcher's backoff
+    payment_timer = gr.Timer(2.0)
+    payment_timer.tick(fn=poll_payment_status, inputs=[chat, st_session],
+                       outputs=[chat, st_session], show_progress="hidden")
     end_btn.click(fn=end_session, inputs=[chat, st_session],
                   outputs=[chat, st_session, conv_banner, conv_id_in, start_btn, pay_panel])
 
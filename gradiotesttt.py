@@ -1,7 +1,16 @@
-# gradio_app_conversations_multi.py
+# gradiotesttt.py
+"""DEPRECATED legacy copy of gradio_app_conversations_multi.py.
+
+Not maintained and not launched by start_app.py; run
+gradio_app_conversations_multi.py instead. The old payment trigger-line
+parsing ("_Your secure payment gateway is now open.") was removed here:
+payment links now reach the UI as events (see ui_events.py), so that line
+is never emitted.
+"""
 import os
 import json
 import uuid
+import warnings
 import contextvars
 from typing import TypedDict, Optional, Literal, Dict
 
@@ -19,6 +28,15 @@ from otp_service import OTPService
 
 # Use the real PaymentService
 from payment_service import PaymentService
+from state_data import resolve_state, normalize_entity, filing_fee
+from state_fuzzy import match_state, correct_state
+from contact_validator import ContactValidator
+
+warnings.warn(
+    "gradiotesttt.py is a deprecated legacy copy; run gradio_app_conversations_multi.py",
+    DeprecationWarning,
+    stacklevel=2,
+)
 
 
 # ========= GLOBAL CONTEXT =========
@@ -34,6 +52,11 @@ class VerifyEmailOtpArgs(TypedDict):
     email: str
     code: str
 
+class ValidateContactArgs(TypedDict):
+    fullName: Optional[str]
+    email: Optional[str]
+    phone: Optional[str]
+
 class SetEntityArgs(TypedDict):
     entity_type: Literal["BASE", "LLC", "C-CORP", "S-CORP", "PAYMENT"]
 
@@ -64,34 +87,7 @@ class CheckPaymentStatusArgs(TypedDict):
 def _normalize_entity_label(s: str) -> str:
     if not s:
         return s
-    x = s.strip().lower().replace(".", "").replace("_", "-")
-    if x == "llc": return "LLC"
-    if x in ("c-corp", "c corp", "ccorp"): return "C-Corp"
-    if x in ("s-corp", "s corp", "scorp", "s-ccorp", "s ccorp"): return "S-Corp"
-    return s
-
-def _resolve_state_name(input_state: str) -> Optional[str]:
-    if not input_state:
-        return None
-    s = input_state.strip()
-    if len(s) == 2:
-        codes = {
-            "AL":"Alabama","AK":"Alaska","AZ":"Arizona","AR":"Arkansas","CA":"California","CO":"Colorado",
-            "CT":"Connecticut","DE":"Delaware","FL":"Florida","GA":"Georgia","HI":"Hawaii","ID":"Idaho",
-            "IL":"Illinois","IN":"Indiana","IA":"Iowa","KS":"Kansas","KY":"Kentucky","LA":"Louisiana",
-            "ME":"Maine","MD":"Maryland","MA":"Massachusetts","MI":"Michigan","MN":"Minnesota",
-            "MS":"Mississippi","MO":"Missouri","MT":"Montana","NE":"Nebraska","NV":"Nevada",
-            "NH":"New Hampshire","NJ":"New Jersey","NM":"New Mexico","NY":"New York",
-            "NC":"North Carolina","ND":"North Dakota","OH":"Ohio","OK":"Oklahoma","OR":"Oregon",
-            "PA":"Pennsylvania","RI":"Rhode Island","SC":"South Carolina","SD":"South Dakota",
-            "TN":"Tennessee","TX":"Texas","UT":"Utah","VT":"Vermont","VA":"Virginia",
-            "WA":"Washington","WV":"West Virginia","WI":"Wisconsin","WY":"Wyoming","DC":"Washington, DC"
-        }
-        return codes.get(s.upper())
-    low = s.lower().replace(".", "").replace(",", "").strip()
-    if low in ("dc","d c","washington dc","washington d c","district of columbia"):
-        return "Washington, DC"
-    return s
+    return normalize_entity(s) or s
 
 
 # ========= TOOLS =========
@@ -100,12 +96,27 @@ otp = OTPService()
 @function_tool
 async def sendEmailOtp(args: SendEmailOtpArgs) -> str:
     print(f"[TOOL LOG] ✉️ sendEmailOtp called with email={args.get('email')}")
-    return otp.send_otp_to_user(args)
+    result = otp.send_otp_to_user(args)
+    sess = CURRENT_SESSION.get()
+    if isinstance(sess, OpenAIConversationsSession) and result.startswith("OTP sent"):
+        setattr(sess, "otp_sent_to", str(args.get("email", "")).strip())
+    return result
 
 @function_tool
 async def verifyEmailOtp(args: VerifyEmailOtpArgs) -> str:
     print(f"[TOOL LOG] 🔐 verifyEmailOtp called for email={args.get('email')} code={args.get('code')}")
-    return otp.verify_otp_from_user(args)
+    result = otp.verify_otp_from_user(args)
+    sess = CURRENT_SESSION.get()
+    if isinstance(sess, OpenAIConversationsSession) and result == "Email verified successfully.":
+        setattr(sess, "otp_verified", True)
+    return result
+
+@function_tool
+async def validateContact(args: ValidateContactArgs) -> str:
+    print(f"[TOOL LOG] 🧾 validateContact called with args={args}")
+    out = ContactValidator.validate(args.get("fullName"), args.get("email"), args.get("phone"))
+    print(f"[TOOL LOG] 🧾 validateContact -> valid={out['valid']} missing={out['missing']} errors={[e['code'] for e in out['errors']]}")
+    return json.dumps(out)
 
 @function_tool
 async def setEntityType(args: SetEntityArgs) -> str:
@@ -146,83 +157,36 @@ async def updateEntityType(args: UpdateEntityTypeArgs) -> str:
     setattr(sess, "entity_type", "LLC" if target == "LLC" else "C-CORP" if target == "C-Corp" else "S-CORP")
     setattr(sess, "awaiting_payment", False)
     setattr(sess, "payment_status", None)
+    # Totals change with the entity, so open Checkout Sessions must not be reused
+    PaymentService.invalidate_checkout_cache(getattr(sess, "conversation_id", None))
     print(f"[AGENT LOG] 🔁 updateEntityType (Payment) -> {old} → {getattr(sess,'entity_type')} (flags reset)")
     return f"Entity type updated to {target}. We’ll refresh totals and continue."
 
-# Fallback fees
-_FALLBACK_FEES = {
-    'Alabama':        {'llc': 200, 's-corp': 208, 'c-corp': 208},
-    'Alaska':         {'llc': 250, 's-corp': 250, 'c-corp': 250},
-    'Arizona':        {'llc': 50,  's-corp': 60,  'c-corp': 60 },
-    'Arkansas':       {'llc': 45,  's-corp': 50,  'c-corp': 50 },
-    'California':     {'llc': 70,  's-corp': 100, 'c-corp': 100},
-    'Colorado':       {'llc': 50,  's-corp': 50,  'c-corp': 50 },
-    'Connecticut':    {'llc': 120, 's-corp': 250, 'c-corp': 250},
-    'Delaware':       {'llc': 90,  's-corp': 89,  'c-corp': 89 },
-    'Florida':        {'llc': 125, 's-corp': 70,  'c-corp': 70 },
-    'Georgia':        {'llc': 100, 's-corp': 100, 'c-corp': 100},
-    'Hawaii':         {'llc': 50,  's-corp': 50,  'c-corp': 50 },
-    'Idaho':          {'llc': 100, 's-corp': 100, 'c-corp': 100},
-    'Illinois':       {'llc': 150, 's-corp': 150, 'c-corp': 150},
-    'Indiana':        {'llc': 95,  's-corp': 90,  'c-corp': 90 },
-    'Iowa':           {'llc': 50,  's-corp': 50,  'c-corp': 50 },
-    'Kansas':         {'llc': 160, 's-corp': 90,  'c-corp': 90 },
-    'Kentucky':       {'llc': 40,  's-corp': 50,  'c-corp': 50 },
-    'Louisiana':      {'llc': 100, 's-corp': 75, 'c-corp': 75 },
-    'Maine':          {'llc': 175, 's-corp': 145, 'c-corp': 145},
-    'Maryland':       {'llc': 150, 's-corp': 120, 'c-corp': 120},
-    'Massachusetts':  {'llc': 500, 's-corp': 275, 'c-corp': 275},
-    'Michigan':       {'llc': 50,  's-corp': 60,  'c-corp': 60 },
-    'Minnesota':      {'llc': 155, 's-corp': 135, 'c-corp': 135},
-    'Mississippi':    {'llc': 50,  's-corp': 50,  'c-corp': 50 },
-    'Missouri':       {'llc': 50,  's-corp': 58,  'c-corp': 58 },
-    'Montana':        {'llc': 35,  's-corp': 70,  'c-corp': 70 },
-    'Nebraska':       {'llc': 100, 's-corp': 60,  'c-corp': 60 },
-    'Nevada':         {'llc': 425, 's-corp': 725, 'c-corp': 725},
-    'New Hampshire':  {'llc': 100, 's-corp': 100, 'c-corp': 100},
-    'New Jersey':     {'llc': 125, 's-corp': 125, 'c-corp': 125},
-    'New Mexico':     {'llc': 50,  's-corp': 100,  'c-corp': 100},
-    'New York':       {'llc': 200, 's-corp': 125, 'c-corp': 125},
-    'North Carolina': {'llc': 125, 's-corp': 125, 'c-corp': 125},
-    'North Dakota':   {'llc': 135, 's-corp': 100,  'c-corp': 100},
-    'Ohio':           {'llc': 99,  's-corp': 99,  'c-corp': 99 },
-    'Oklahoma':       {'llc': 100, 's-corp': 50,  'c-corp': 50 },
-    'Oregon':         {'llc': 100, 's-corp': 100, 'c-corp': 100},
-    'Pennsylvania':   {'llc': 125, 's-corp': 125, 'c-corp': 125},
-    'Rhode Island':   {'llc': 150, 's-corp': 230,  'c-corp': 230},
-    'South Carolina': {'llc': 110, 's-corp': 125,  'c-corp': 125},
-    'South Dakota':   {'llc': 150, 's-corp': 150,  'c-corp': 150},
-    'Tennessee':      {'llc': 300, 's-corp': 100,  'c-corp': 100},
-    'Texas':          {'llc': 300, 's-corp': 300,  'c-corp': 300},
-    'Utah':           {'llc': 70,  's-corp': 70,  'c-corp': 70 },
-    'Vermont':        {'llc': 125, 's-corp': 125,  'c-corp': 125},
-    'Virginia':       {'llc': 100, 's-corp': 25,   'c-corp': 25 },
-    'Washington':     {'llc': 200, 's-corp': 200,  'c-corp': 200},
-    'West Virginia':  {'llc': 100, 's-corp': 50,   'c-corp': 50 },
-    'Wisconsin':      {'llc': 130, 's-corp': 100,  'c-corp': 100},
-    'Wyoming':        {'llc': 100, 's-corp': 100,  'c-corp': 100},
-    'Washington, DC': {'llc': 99,  's-corp': 99,   'c-corp': 99 },
-}
-
 @function_tool
 async def stateFeeLookup(args: StateFeeLookupArgs) -> str:
     print(f"[TOOL LOG] 🔎 stateFeeLookup called with args={args}")
     state_raw = args.get("state", "")
     ent_raw = args.get("entity_type", "")
-    label = _normalize_entity_label(ent_raw)
-    state_name = _resolve_state_name(state_raw)
+    label = normalize_entity(ent_raw)
+    # Exact alias, then a confident typo correction ("Calfornia", "N. Carolina", "wash dc")
+    state_name = correct_state(state_raw) or (state_raw or "").strip()
 
-    if not state_name or label not in ("LLC", "C-Corp", "S-Corp"):
+    if not state_name or not label:
         print("[TOOL LOG] 🔎 stateFeeLookup -> missing params")
         return json.dumps({"error": "missing_params", "state": state_raw, "entity_type": ent_raw})
 
-    key = "llc" if label == "LLC" else "c-corp" if label == "C-Corp" else "s-corp"
-    fee = _FALLBACK_FEES.get(state_name, {}).get(key)
+    fee = filing_fee(state_name, label)
     if fee is None:
-        print(f"[TOOL LOG] 🔎 stateFeeLookup (fallback) -> fee_not_found for {state_name}/{label}")
-        return json.dumps({"error": "fee_not_found", "state": state_name, "entity_type": label})
+        print(f"[TOOL LOG] 🔎 stateFeeLookup -> fee_not_found for {state_name}/{label}")
+        out = {"error": "fee_not_found", "state": state_name, "entity_type": label}
+        match = match_state(state_raw)
+        if match.name:
+            out.update(suggestion=match.name, confidence=match.confidence)
+        return json.dumps(out)
     out = {"state": state_name, "entity_type": label, "stateFilingFee": float(fee)}
-    print(f"[TOOL LOG] 🔎 stateFeeLookup (fallback) -> {out}")
+    if resolve_state(state_raw) is None:
+        out["correctedFrom"] = state_raw
+    print(f"[TOOL LOG] 🔎 stateFeeLookup -> {out}")
     return json.dumps(out)
 
 @function_tool
@@ -277,7 +241,8 @@ async def createPaymentLink(args: CreatePaymentLinkArgs) -> str:
         # ✅ SAVE again with the checkout details
         _save_session_attributes(conv_id, sess)
 
-        print(f"[TOOL LOG] 🔗 Stripe Checkout created id={checkout_id} url={('…'+checkout_url[-24:]) if checkout_url else None}")
+        verb = "reused" if out.get("reused") else "created"
+        print(f"[TOOL LOG] 🔗 Stripe Checkout {verb} id={checkout_id} url={('…'+checkout_url[-24:]) if checkout_url else None}")
     except Exception as e:
         print("[TOOL LOG] 🔗 PaymentService error (non-fatal):", e)
 
@@ -307,6 +272,40 @@ async def checkPaymentStatus(args: CheckPaymentStatusArgs) -> str:
     return norm
 
 
+# ========= CONTACT PRE-PARSE =========
+def _prefill_contact(session: OpenAIConversationsSession, message: str) -> Optional[str]:
+    """
+    Extract name/email/phone from a Base-mode message, merge them into session.contact and,
+    once all three are valid, send the OTP directly. Returns a note for the agent, or None.
+    """
+    if getattr(session, "entity_type", "BASE") != "BASE" or getattr(session, "otp_verified", False):
+        return None
+    found = {k: v for k, v in ContactValidator.extract(message).items() if v}
+    if not found:
+        return None
+
+    contact = dict(getattr(session, "contact", None) or {})
+    contact.update(found)
+    setattr(session, "contact", contact)
+    v = ContactValidator.validate(contact.get("fullName"), contact.get("email"), contact.get("phone"))
+    print(f"[CONTACT] 🧾 pre-parse found={sorted(found)} valid={v['valid']} missing={v['missing']}")
+    if not v["valid"]:
+        return None
+
+    if getattr(session, "otp_sent_to", None) != v["email"]:
+        result = otp.send_otp_to_user({"email": v["email"]})
+        print(f"[CONTACT] ✉️ OTP auto-send -> {result}")
+        if not result.startswith("OTP sent"):
+            return None
+        setattr(session, "otp_sent_to", v["email"])
+    return (
+        "[SERVER NOTE] Contact validated server-side: "
+        f"fullName={v['fullName']}, email={v['email']}, phone={v['phone']}. "
+        f"The verification code has ALREADY been sent to {v['email']} — do NOT call sendEmailOtp; "
+        "confirm the details and ask the user for the code."
+    )
+
+
 # ========= AGENTS =========
 corp_agent = Agent(
     name="Corp Assistant",
@@ -358,11 +357,13 @@ base_agent = Agent(
         "- When the user chooses an entity type (LLC / C-CORP / S-CORP), call `setEntityType` with that type immediately.\n"
         "- Do NOT answer LLC- or Corp-specific questions here; ask to choose entity and set it via `setEntityType` first.\n\n"
         "CRITICAL OTP RULE:\n"
-        "- When user provides full name, valid email, and exactly 10-digit phone number, you MUST call sendEmailOtp function immediately.\n"
+        "- If the message carries a [SERVER NOTE] saying the code was already sent, do NOT call sendEmailOtp; ask for the code.\n"
+        "- Otherwise, when the user gives any contact details, call validateContact; call sendEmailOtp only when it returns valid=true, "
+        "and ask for every missing/invalid field from its errors in one reply.\n"
         "- NEVER say you sent a code without actually calling the sendEmailOtp function.\n"
         "- Only after successfully calling sendEmailOtp should you tell the user the code was sent."
     ),
-    tools=[sendEmailOtp, verifyEmailOtp, setEntityType]
+    tools=[sendEmailOtp, verifyEmailOtp, validateContact, setEntityType]
 )
 
 
@@ -418,6 +419,9 @@ def _save_session_attributes(conv_id: str, session: OpenAIConversationsSession):
             "payment_quote": getattr(session, "payment_quote", None),
             "payment_checkout_url": getattr(session, "payment_checkout_url", None),
             "payment_checkout_id": getattr(session, "payment_checkout_id", None),
+            "contact": getattr(session, "contact", None),
+            "otp_sent_to": getattr(session, "otp_sent_to", None),
+            "otp_verified": getattr(session, "otp_verified", False),
             # ✅ Add conversation history to saved attributes
             "conversation_history": getattr(session, "conversation_history", []),
         }
@@ -691,6 +695,10 @@ def respond(message: str, history, session: Optional[OpenAIConversationsSession]
         print("[UI LOG] 🔍 Payment status check requested...")
         message = "Please check my payment status"
 
+    # Server-side contact pre-parse: fires the OTP send without a model round trip
+    contact_note = _prefill_contact(session, message)
+    agent_input = f"{message}\n\n{contact_note}" if contact_note else message
+
     current_agent, agent_name = _agent_for_entity(session.entity_type)
     print(f"[RUN LOG] ▶ Routing message to {agent_name} | entity_type={session.entity_type}")
     print(f"[RUN LOG] 📨 User message (first 120): {message[:120]!r}")
@@ -704,7 +712,7 @@ def respond(message: str, history, session: Optional[OpenAIConversationsSession]
                 try:
                     print(f"[RUN LOG] 🔧 Runner.run({agent_name}) starting…")
                     print(f"[DEBUG] Available tools: {[getattr(tool, 'name', str(tool)) for tool in current_agent.tools] if hasattr(current_agent, 'tools') else 'No tools'}")
-                    result = loop.run_until_complete(Runner.run(current_agent, message, session=session))
+                    result = loop.run_until_complete(Runner.run(current_agent, agent_input, session=session))
                     print(f"[DEBUG] Agent result: {result}")
                 finally:
                     CURRENT_SESSION.reset(token)
@@ -751,30 +759,6 @@ def respond(message: str, history, session: Optional[OpenAIConversationsSession]
         finally:
             setattr(session, "show_payment_summary", False)
 
-    checkout_url = getattr(session, "payment_checkout_url", None)
-    if response_content.strip().startswith("_Your secure payment gateway is now open.") and checkout_url:
-        import re
-        match = re.search(r'Total due now: \$?([0-9.,]+).*Plan: ([^—]+)—([^+]+)\+.*State filing fees: \$?([0-9.,]+)', response_content)
-        if match:
-            total_due = match.group(1)
-            plan_name = match.group(2).strip()
-            billing_cycle = match.group(3).strip()
-            state_fee = match.group(4)
-            response_content = f"""🔗 **Your secure payment link is ready!**
-
-**Total Due Now: ${total_due}**
-- Plan: {plan_name} — {billing_cycle}
-- State filing fees: ${state_fee}
-
-**Click here to complete your payment:**
-{checkout_url}
-
-Once you complete payment, return here and I'll automatically verify your payment status."""
-            print(f"[UI] 🔗 Payment trigger converted to full response with URL")
-        else:
-            response_content = response_content + f"\n\n**Payment Link:** {checkout_url}"
-            print(f"[UI] 🔗 Payment URL appended to response")
-
     panel_update = gr.update(visible=False, value="")
 
     history = history + [
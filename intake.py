@@ -0,0 +1,243 @@
+# intake.py
+"""
+Per-conversation intake record: every value the chat has captured, typed and validated on
+write, so routing, quoting and summaries read it in O(1) instead of re-reading the transcript.
+
+  - IntakeRecord.apply(record, values, naics_lookup=None) -> dict
+      validates the model-captured fields (contact, company, RA / virtual address) and writes
+      the normalized values; rows owned by other tools (entity type, designator, members,
+      officers, ...) are written by those tools through Snapshot.update / from_summary
+  - IntakeStore: JSON-file persistence keyed by conversation id (session_key(session))
+"""
+import json
+import os
+import re
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from address_normalizer import AddressNormalizer
+from contact_validator import ContactValidator
+from snapshot import ALL_FIELDS, STRUCTURE_KEYS, Snapshot
+from state_data import resolve_state
+from state_fuzzy import correct_state, match_state
+from validation_utils import issue
+
+# Fields the model records directly; the rest are written by the tool that validates them
+MODEL_FIELDS: Tuple[str, ...] = (
+    "fullName", "email", "phone", "businessName", "businessPurpose", "state", "naicsCode",
+    "registeredAgent", "virtualBusinessAddress",
+)
+_NAICS_CODE = re.compile(r"\b(\d{6})\b")
+_INCUBATION = re.compile(r"incubation\.?\s*ai", re.IGNORECASE)
+
+
+def _text(raw: str, field: str, label: str, min_len: int = 2) -> Tuple[Optional[str], List[Dict[str, str]]]:
+    s = " ".join(raw.split())
+    if len(s) < min_len:
+        return None, [issue(f"{field}_invalid", field, f"Please provide the {label}.")]
+    return s, []
+
+
+def _contact(normalize: Callable[[str], Optional[str]], code: str, message: str):
+    def check(raw: str, field: str, lookup) -> Tuple[Optional[str], List, List]:
+        value = normalize(raw)
+        return value, ([] if value else [issue(code, field, message)]), []
+    return check
+
+
+def _business_name(raw: str, field: str, lookup) -> Tuple[Optional[str], List, List]:
+    value, errors = _text(raw, field, "business name")
+    return value, errors, []
+
+
+def _purpose(raw: str, field: str, lookup) -> Tuple[Optional[str], List, List]:
+    value, errors = _text(raw, field, "business purpose (a short description of what the business does)", 3)
+    return value, errors, []
+
+
+def _state(raw: str, field: str, lookup) -> Tuple[Optional[str], List, List]:
+    exact = resolve_state(raw)
+    if exact:
+        return exact, [], []
+    corrected = correct_state(raw)
+    if corrected:
+        return corrected, [], [issue("state_corrected", field, f"Interpreted “{raw.strip()}” as {corrected}.")]
+    match = match_state(raw)
+    hint = f" Did you mean {match.name}?" if match.name else ""
+    return None, [issue("state_invalid", field, f"“{raw.strip()}” is not a U.S. state.{hint}")], []
+
+
+def _naics(raw: str, field: str, lookup) -> Tuple[Optional[str], List, List]:
+    m = _NAICS_CODE.search(raw)
+    if not m:
+        return None, [issue("naics_invalid", field, "Please choose a 6-digit NAICS code from the suggested list.")], []
+    if lookup is None:
+        return " ".join(raw.split()), [], []
+    row = lookup(m.group(1))
+    if row is None:
+        # The bundled catalog is a subset of NAICS 2022: a well-formed code outside it is kept as given
+        return " ".join(raw.split()), [], [issue(
+            "naics_unknown", field,
+            f"{m.group(1)} isn't in our NAICS catalog; it was recorded as given — please double-check it at census.gov/naics.",
+        )]
+    # Always the full `<CODE> - <TITLE> — <SUMMARY>` string, never the bare code
+    return row["formatted"], [], []
+
+
+def _address_choice(label: str):
+    def check(raw: str, field: str, lookup) -> Tuple[Optional[str], List, List]:
+        value, errors = _text(raw, field, label)
+        if not value or _INCUBATION.search(value):
+            return value, errors, []
+        # Own agent / address: an optional leading name, then a street address (no PO boxes / PMBs)
+        name, _, rest = value.partition(",")
+        if any(c.isdigit() for c in name) or not rest.strip():
+            name, rest = "", value
+        result = AddressNormalizer.normalize(rest)
+        if not result["valid"]:
+            return None, [issue(e["code"], field, f"{e['message']} (for the {label})") for e in result["errors"]], []
+        warnings = [issue(w["code"], field, w["message"]) for w in result["warnings"]]
+        return ", ".join(p for p in (name.strip(), result["normalized"]) if p), [], warnings
+    return check
+
+
+_CHECKS: Mapping[str, Callable[..., Tuple[Optional[str], List, List]]] = MappingProxyType({
+    "fullName": _contact(ContactValidator.normalize_name, "name_invalid", "Please provide your full legal name (first and last name)."),
+    "email": _contact(ContactValidator.normalize_email, "email_invalid", "That email address doesn't look valid (e.g. name@example.com)."),
+    "phone": _contact(ContactValidator.normalize_phone, "phone_invalid", "Phone must be exactly 10 digits."),
+    "businessName": _business_name,
+    "businessPurpose": _purpose,
+    "state": _state,
+    "naicsCode": _naics,
+    "registeredAgent": _address_choice("registered agent"),
+    "virtualBusinessAddress": _address_choice("virtual business address"),
+})
+
+
+def session_key(session: Any) -> Optional[str]:
+    """
+    Stable per-conversation key: the Agents SDK conversation id. OpenAIConversationsSession keeps
+    it in `_session_id` (set at construction when resuming, on first use otherwise); it is
+    mirrored to `session.conversation_id`, which the payment code and the banner read.
+    """
+    if session is None:
+        return None
+    cid = getattr(session, "conversation_id", None) or getattr(session, "_session_id", None)
+    if cid and getattr(session, "conversation_id", None) != cid:
+        setattr(session, "conversation_id", cid)
+    return cid
+
+
+class IntakeRecord:
+    """
+    Public methods used by the app:
+      - apply(record, values, naics_lookup=None) -> dict
+      - missing(record, mode) -> list
+    """
+
+    @classmethod
+    def apply(
+        cls,
+        record: Dict[str, Any],
+        values: Mapping[str, Optional[str]],
+        naics_lookup: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        `values`: {field: raw string}; None = not provided (ignored), "" = clear the field.
+
+        Returns a dict:
+          {
+            "applied": {"state": "California", ...},   # normalized values now in the record
+            "cleared": ["registeredAgent", ...],
+            "errors": [{"code", "field", "message"}, ...],   # these fields were NOT written
+            "warnings": [...],
+            "rejected": ["designator", ...],            # not a model-recorded field
+          }
+        """
+        applied: Dict[str, Any] = {}
+        cleared: List[str] = []
+        errors: List[Dict[str, str]] = []
+        warnings: List[Dict[str, str]] = []
+        rejected: List[str] = []
+        for field, raw in values.items():
+            if raw is None:
+                continue
+            if field not in _CHECKS:
+                rejected.append(field)
+                continue
+            if not str(raw).strip():
+                cleared.append(field)
+                continue
+            value, errs, warns = _CHECKS[field](str(raw), field, naics_lookup)
+            errors += errs
+            warnings += warns
+            if value is not None and not errs:
+                applied[field] = value
+
+        Snapshot.update(record, {**applied, **{f: None for f in cleared}})
+        return {"applied": applied, "cleared": cleared, "errors": errors, "warnings": warnings, "rejected": rejected}
+
+    @staticmethod
+    def missing(record: Mapping[str, Any], mode: Optional[str]) -> List[str]:
+        """Snapshot fields of the mode that are still empty (Base fields first)."""
+        return [k for k in Snapshot.fields_for(mode) if record.get(k) in (None, "", [])]
+
+
+class IntakeStore:
+    """
+    Intake records on disk, keyed by conversation id. The whole file is loaded once and
+    rewritten atomically (temp file + rename) on every save.
+
+    Public methods used by the app:
+      - get(conversation_id) -> dict     # a copy; empty when unknown
+      - save(conversation_id, record) -> None
+      - delete(conversation_id) -> None
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self._path = path or os.getenv("INTAKE_RECORDS_PATH", "intake_records.json")
+        self._lock = threading.Lock()
+        self._records: Optional[Dict[str, Dict[str, Any]]] = None
+
+    # ---------- API ----------
+    def get(self, conversation_id: Optional[str]) -> Dict[str, Any]:
+        if not conversation_id:
+            return {}
+        with self._lock:
+            return dict(self._load().get(conversation_id, {}))
+
+    def save(self, conversation_id: Optional[str], record: Mapping[str, Any]) -> None:
+        if not conversation_id:
+            return
+        with self._lock:
+            records = self._load()
+            stored = {k: v for k, v in record.items() if k in ALL_FIELDS or k in STRUCTURE_KEYS}
+            if records.get(conversation_id) == stored:
+                return
+            records[conversation_id] = stored
+            self._write(records)
+
+    def delete(self, conversation_id: Optional[str]) -> None:
+        with self._lock:
+            if self._load().pop(conversation_id or "", None) is not None:
+                self._write(self._records)
+
+    # ---------- internals ----------
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._records is None:
+            try:
+                with open(self._path, "r", encoding="utf-8") as f:
+                    self._records = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._records = {}
+        return self._records
+
+    def _write(self, records: Dict[str, Dict[str, Any]]) -> None:
+        tmp = f"{self._path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(records, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, self._path)
+        except Exception as e:
+            print(f"[IntakeStore] ⚠️ Failed to save {self._path}: {e}")
@@ -0,0 +1,237 @@
+# llc_members.py
+from decimal import Decimal
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from validation_utils import check_address, clean_name, fmt_decimal, issue, name_key, parse_decimal, parse_int
+
+GOVERNANCE_TYPES: Mapping[str, str] = {
+    "member-managed": "Member-Managed", "member managed": "Member-Managed", "member": "Member-Managed",
+    "manager-managed": "Manager-Managed", "manager managed": "Manager-Managed", "manager": "Manager-Managed",
+}
+MAX_IN_CHAT = 3
+_HUNDRED = Decimal(100)
+_YES = frozenset(("yes", "y", "true", "1"))
+_NO = frozenset(("no", "n", "false", "0"))
+
+
+def _yes_no(value: Any) -> Optional[bool]:
+    if isinstance(value, bool):
+        return value
+    s = str(value or "").strip().lower()
+    return True if s in _YES else False if s in _NO else None
+
+
+class LlcMembersValidator:
+    """
+    Deterministic checks for the LLC flow's governance, members, managers and ownership split.
+
+    Public methods used by the app:
+      - validate(structure) -> dict
+    """
+
+    @classmethod
+    def validate(cls, structure: Mapping[str, Any]) -> Dict[str, Any]:
+        """
+        `structure` keys (all optional; only what has been captured so far):
+          governanceType, soleMember, totalMembers,
+          members: [{name, address, percent}], managers: [{name, address, isMember}]
+
+        Returns a dict:
+          {
+            "valid": bool,            # no violations in what was provided
+            "complete": bool,         # valid and nothing required is missing
+            "errors": [{"code", "field", "message"}, ...],
+            "warnings": [...],
+            "missing": ["members[0].address", "managers", ...],
+            "ownershipTotal": "66.67",
+            "normalized": {...},      # canonical values to store
+            "summary": {"Governance Type", "Sole Member", "Members", "Managers", "Ownership Total"}
+          }
+        """
+        errors: List[Dict[str, str]] = []
+        warnings: List[Dict[str, str]] = []
+        missing: List[str] = []
+        norm: Dict[str, Any] = {}
+
+        governance = cls._check_governance(structure.get("governanceType"), norm, errors, missing)
+        sole = _yes_no(structure.get("soleMember"))
+        if sole is None:
+            missing.append("soleMember")
+        else:
+            norm["soleMember"] = "Yes" if sole else "No"
+
+        members = cls._check_members(structure, sole, norm, errors, warnings, missing)
+        cls._check_managers(structure.get("managers") or [], governance, sole, members, norm, errors, missing)
+
+        return {
+            "valid": not errors,
+            "complete": not errors and not missing,
+            "errors": errors,
+            "warnings": warnings,
+            "missing": missing,
+            "ownershipTotal": norm.get("ownershipTotal"),
+            "normalized": norm,
+            "summary": cls._summary(norm),
+        }
+
+    # ---------- sections ----------
+    @staticmethod
+    def _check_governance(raw: Optional[str], norm: Dict, errors: List, missing: List) -> Optional[str]:
+        if not (raw or "").strip():
+            missing.append("governanceType")
+            return None
+        governance = GOVERNANCE_TYPES.get(" ".join(raw.lower().split()))
+        if governance is None:
+            errors.append(issue("governance_invalid", "governanceType", "Governance must be Member-Managed or Manager-Managed."))
+            return None
+        norm["governanceType"] = governance
+        return governance
+
+    @staticmethod
+    def _check_members(
+        structure: Mapping[str, Any], sole: Optional[bool], norm: Dict, errors: List, warnings: List, missing: List,
+    ) -> Dict[str, str]:
+        """Returns {name_key: display name} for the captured members."""
+        rows: Sequence[Mapping[str, Any]] = structure.get("members") or []
+        if not rows:
+            missing.append("members")
+            return {}
+        if len(rows) > MAX_IN_CHAT:
+            errors.append(issue(
+                "members_over_limit", "members",
+                f"I can only capture a maximum of {MAX_IN_CHAT} members here; our specialists will collect the rest during the final review.",
+            ))
+        if sole and len(rows) > 1:
+            others = ", ".join(clean_name(r.get("name")) for r in rows[1:])
+            errors.append(issue(
+                "sole_member_contradiction", "soleMember",
+                f"Sole member means 100% ownership with no other owners, but {others} is also listed as a member.",
+            ))
+        total_overall = parse_int(structure.get("totalMembers")) or len(rows)
+        if total_overall > MAX_IN_CHAT:
+            warnings.append(issue(
+                "members_beyond_chat", "totalMembers",
+                f"{total_overall - MAX_IN_CHAT} additional member(s) will be collected by our specialists before filing.",
+            ))
+
+        seen: Dict[str, str] = {}
+        out: List[Dict[str, Any]] = []
+        total = Decimal(0)
+        complete_split = True
+        for i, row in enumerate(rows[:MAX_IN_CHAT]):
+            field = f"members[{i}]"
+            name = clean_name(row.get("name"))
+            if not name:
+                errors.append(issue("member_name_missing", field + ".name", f"Member #{i + 1} needs a full legal name."))
+                continue
+            key = name_key(name)
+            if key in seen:
+                errors.append(issue("member_duplicate", field + ".name", f"{name} is listed more than once as a member."))
+                continue
+            seen[key] = name
+            entry: Dict[str, Any] = {"name": name}
+            if (row.get("address") or "").strip():
+                address = check_address(row.get("address"), field, name, errors)
+                if address:
+                    entry["address"] = address
+            else:
+                # Member Address Gate: blocks progression until filled
+                missing.append(field + ".address")
+
+            percent = parse_decimal(row.get("percent"))
+            if percent is None and sole and len(rows) == 1:
+                percent = _HUNDRED
+            if row.get("percent") not in (None, "") and parse_decimal(row.get("percent")) is None:
+                errors.append(issue("percent_invalid", field + ".percent", f"{name}'s ownership must be a percentage (e.g. 50%)."))
+                complete_split = False
+            elif percent is None:
+                missing.append(field + ".percent")
+                complete_split = False
+            elif not (0 < percent <= _HUNDRED):
+                errors.append(issue("percent_invalid", field + ".percent", f"{name}'s ownership must be greater than 0% and at most 100%."))
+                complete_split = False
+            else:
+                entry["percent"] = fmt_decimal(percent)
+                total += percent
+            out.append(entry)
+
+        norm["members"] = out
+        norm["ownershipTotal"] = fmt_decimal(total)
+        if sole and len(out) == 1 and out[0].get("percent") not in (None, "100"):
+            errors.append(issue("sole_member_percent", "members[0].percent", "A sole member owns 100% of the LLC."))
+        elif complete_split and total != _HUNDRED:
+            errors.append(issue(
+                "ownership_total_mismatch", "members",
+                f"Current ownership total: {fmt_decimal(total)}% of 100%. Please adjust the percentages so they total exactly 100%.",
+            ))
+        return seen
+
+    @staticmethod
+    def _check_managers(
+        rows: Sequence[Mapping[str, Any]], governance: Optional[str], sole: Optional[bool], members: Dict[str, str],
+        norm: Dict, errors: List, missing: List,
+    ) -> None:
+        if governance == "Member-Managed":
+            if rows:
+                errors.append(issue("managers_not_allowed", "managers", "A Member-Managed LLC has no managers; switch to Manager-Managed to add them."))
+            return
+        if not rows:
+            if governance == "Manager-Managed":
+                missing.append("managers")
+            return
+        if len(rows) > MAX_IN_CHAT:
+            errors.append(issue(
+                "managers_over_limit", "managers",
+                f"I can only capture {MAX_IN_CHAT} managers maximum; additional managers will be handled by our specialists.",
+            ))
+        seen = set()
+        out: List[Dict[str, Any]] = []
+        for i, row in enumerate(rows[:MAX_IN_CHAT]):
+            field = f"managers[{i}]"
+            name = clean_name(row.get("name"))
+            if not name:
+                errors.append(issue("manager_name_missing", field + ".name", f"Manager #{i + 1} needs a full legal name."))
+                continue
+            key = name_key(name)
+            if key in seen:
+                errors.append(issue("manager_duplicate", field + ".name", f"{name} is listed more than once as a manager."))
+                continue
+            seen.add(key)
+            entry: Dict[str, Any] = {"name": name, "isMember": key in members}
+            if (row.get("address") or "").strip():
+                address = check_address(row.get("address"), field, name, errors)
+                if address:
+                    entry["address"] = address
+            else:
+                missing.append(field + ".address")
+            if _yes_no(row.get("isMember")) and key not in members:
+                if sole:
+                    errors.append(issue(
+                        "manager_member_sole", field + ".isMember",
+                        f"With a sole member, {name} can be a manager but not an owner (0%).",
+                    ))
+                else:
+                    missing.append(f"members.{name}")
+            out.append(entry)
+        norm["managers"] = out
+
+    # ---------- helpers ----------
+    @staticmethod
+    def _summary(norm: Dict[str, Any]) -> Dict[str, str]:
+        summary: Dict[str, str] = {}
+        if "governanceType" in norm:
+            summary["Governance Type"] = norm["governanceType"]
+        if "soleMember" in norm:
+            summary["Sole Member"] = norm["soleMember"]
+        if norm.get("members"):
+            summary["Members"] = " • ".join(
+                " — ".join(p for p in (e["name"], e.get("percent") and e["percent"] + "%", e.get("address")) if p)
+                for e in norm["members"]
+            )
+            if any("percent" in e for e in norm["members"]):
+                summary["Ownership Total"] = f"{norm['ownershipTotal']}%"
+        if norm.get("managers"):
+            summary["Managers"] = " • ".join(
+                e["name"] + (f" ({e['address']})" if e.get("address") else "") for e in norm["managers"]
+            )
+        return summary
@@ -0,0 +1,144 @@
+# naics_index.py
+import heapq
+import math
+import mmap
+import os
+import re
+import threading
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or our that the their this to we will with "
+    "business company services service except other all".split()
+)
+# Title terms count more than summary / index terms (a cheap BM25F)
+_TITLE_WEIGHT = 2
+
+
+def _stem(tok: str) -> str:
+    """Tiny suffix stripper so 'bakeries' ~ 'bakery', 'cleaning' ~ 'clean'."""
+    if len(tok) > 4 and tok.endswith("ies"):
+        return tok[:-3] + "y"
+    if len(tok) > 5 and tok.endswith("ing"):
+        return tok[:-3]
+    if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+        return tok[:-1]
+    return tok
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(t) for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+class NaicsIndex:
+    """
+    BM25 search over the bundled NAICS 2022 catalog (data/naics_2022.tsv, a subset of ~256
+    common codes; callers must handle an empty result and codes outside it).
+
+    The file is memory-mapped and indexed on first use, so app startup never pays for it.
+    Postings are packed `array('I')` pairs (doc, tf); rows are decoded from the map
+    only for the hits returned.
+
+    Public methods used by the app:
+      - search(query, k=6) -> list[dict]
+      - lookup(code) -> Optional[dict]
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        # You can override with NAICS_CATALOG_PATH env var
+        self._path = path or os.getenv(
+            "NAICS_CATALOG_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "naics_2022.tsv")
+        )
+        self._lock = threading.Lock()
+        self._mm: Optional[mmap.mmap] = None
+        self._spans: List[Tuple[int, int]] = []          # doc -> (start, end) byte offsets in the map
+        self._codes: Dict[str, int] = {}                  # "541511" -> doc
+        self._postings: Dict[str, array] = {}             # term -> [doc, tf, doc, tf, ...]
+        self._doc_len = array("I")
+        self._avg_len = 0.0
+
+    # ====== Public: Search ======
+    def search(self, query: str, k: int = 6) -> List[Dict[str, Any]]:
+        self._ensure_loaded()
+        code = (query or "").strip()
+        if code.isdigit() and len(code) == 6:
+            hit = self.lookup(code)
+            return [hit] if hit else []
+
+        n = len(self._spans)
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query or "")):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings) // 2
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for p in range(0, len(postings), 2):
+                doc, tf = postings[p], postings[p + 1]
+                norm = self.K1 * (1 - self.B + self.B * self._doc_len[doc] / self._avg_len)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (self.K1 + 1) / (tf + norm)
+
+        top = heapq.nlargest(max(1, k), scores.items(), key=lambda kv: kv[1])
+        return [dict(self._row(doc), score=round(score, 3)) for doc, score in top]
+
+    # ====== Public: Exact code lookup ======
+    def lookup(self, code: str) -> Optional[Dict[str, Any]]:
+        self._ensure_loaded()
+        doc = self._codes.get((code or "").strip())
+        return None if doc is None else self._row(doc)
+
+    # ====== Internals ======
+    def _row(self, doc: int) -> Dict[str, Any]:
+        start, end = self._spans[doc]
+        code, title, summary, _terms = self._mm[start:end].decode("utf-8").split("\t")
+        return {
+            "code": code,
+            "title": title,
+            "summary": summary,
+            "formatted": f"{code} - {title} — {summary}",
+        }
+
+    def _ensure_loaded(self) -> None:
+        if self._mm is not None:
+            return
+        with self._lock:
+            if self._mm is None:
+                self._load()
+
+    def _load(self) -> None:
+        with open(self._path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        postings: Dict[str, array] = {}
+        pos = 0
+        size = len(mm)
+        while pos < size:
+            end = mm.find(b"\n", pos)
+            if end == -1:
+                end = size
+            line = mm[pos:end].decode("utf-8")
+            if line and not line.startswith("#"):
+                code, title, summary, terms = line.split("\t")
+                doc = len(self._spans)
+                self._spans.append((pos, end))
+                self._codes[code] = doc
+
+                tf: Dict[str, int] = {}
+                for tok in tokenize(title):
+                    tf[tok] = tf.get(tok, 0) + _TITLE_WEIGHT
+                for tok in tokenize(summary + " " + terms):
+                    tf[tok] = tf.get(tok, 0) + 1
+                for tok, count in tf.items():
+                    postings.setdefault(tok, array("I")).extend((doc, count))
+                self._doc_len.append(sum(tf.values()))
+            pos = end + 1
+
+        self._postings = postings
+        self._avg_len = sum(self._doc_len) / max(1, len(self._doc_len))
+        self._mm = mm
+        print(f"[NaicsIndex] 📚 Indexed {len(self._spans)} NAICS codes, {len(postings)} terms")
@@ -1,6 +1,11 @@
-# otp_service.py  — NO PEPPER, stores OTP in memory/plaintext (not logged)
+# otp_service.py  — NO PEPPER, stores OTP in memory/plaintext (not logged); the email body sits in
+# the outbox file only until it is delivered or expires
 import os, time, hmac, secrets, ssl
-from typing import Any, Dict
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from email_outbox import EmailOutbox, PermanentEmailError
+from otp_store import OtpStore
 
 # Import configuration to ensure environment variables are set
 try:
@@ -20,11 +25,12 @@ class OTPService:
     RESEND_COOLDOWN_SECONDS = 60
     OTP_LENGTH = 6
     MAX_ATTEMPTS = 5
-    SESSION_ID = "default-session"   # single-user/process in-memory
+    AUDIT_LIMIT = 1000               # masked send log kept in memory
 
     def __init__(self):
-        self._sessions: Dict[str, Dict[str, Any]] = {}
-        self._emails_sent: list[dict] = []
+        # One entry per conversation (code, cooldown, attempts), dropped when its TTL runs out
+        self._sessions = OtpStore()
+        self._emails_sent: Deque[dict] = deque(maxlen=self.AUDIT_LIMIT)
         self._sendgrid_key = os.environ.get("SENDGRID_API_KEY")
         self._from_email = os.environ.get("MAIL_FROM", "test@example.com")
         self._from_name = os.environ.get("MAIL_FROM_NAME", "Incubation AI")
@@ -34,13 +40,21 @@ class OTPService:
         print(f"[DEBUG] From Email: {self._from_email}")
         print(f"[DEBUG] From Name: {self._from_name}")
 
+        # Persistent outbox: resumes emails still pending from before a restart, except codes
+        # this process never issued (they lived in the old process's OtpStore)
+        self._outbox = EmailOutbox(self._send_via_sendgrid, is_live=self._otp_is_live)
+        self._outbox.start()
+
     # ---------- session helpers ----------
-    def _get_session(self) -> Dict[str, Any]:
-        sess = self._sessions.get(self.SESSION_ID)
-        if not sess:
-            sess = {"id": self.SESSION_ID}
-            self._sessions[self.SESSION_ID] = sess
-        return sess
+    @staticmethod
+    def _key(conversation_id: Optional[str], email: str) -> str:
+        # Without a conversation (e.g. scripts) the email itself scopes the OTP
+        return conversation_id or f"email:{email.lower()}"
+
+    def _otp_is_live(self, message: Dict[str, Any]) -> bool:
+        """Outbox resume filter: only resend a code this process still holds for that key."""
+        sess = self._sessions.get(message.get("key") or "")
+        return bool(sess and sess.get("message_id") == message["id"])
 
     def _now(self) -> int: 
         return int(time.time())
@@ -57,17 +71,28 @@ class OTPService:
     def _otp_generate(self) -> str:
         return f"{secrets.randbelow(10**self.OTP_LENGTH):0{self.OTP_LENGTH}d}"
 
-    def _send_via_sendgrid(self, to_email: str, code: str) -> None:
+    def _compose(self, code: str) -> Tuple[str, str, str]:
+        subject = "Your verification code"
+        text_body = f"Your OTP is {code}. It expires in {self.OTP_TTL_SECONDS // 60} minutes."
+        html_body = (
+            f"<p>Your verification code is:</p>"
+            f"<h2 style='letter-spacing:3px; font-family:monospace;'>{code}</h2>"
+            f"<p>This code will expire in <strong>{self.OTP_TTL_SECONDS // 60} minutes</strong>.</p>"
+            f"<p>If you didn't request this, you can ignore this email.</p>"
+        )
+        return subject, text_body, html_body
+
+    def _send_via_sendgrid(self, message: Dict[str, Any]) -> None:
+        """Outbox delivery callable (runs on an outbox worker thread, never in the agent turn)."""
+        to_email = message["to"]
         if not self._sendgrid_key:
             # For testing without SendGrid API key
-            print(f"[TEST MODE] Would send OTP {code} to {to_email}")
+            print(f"[TEST MODE] Would send to {to_email}: {message['text']}")
             return
-            
-        print(f"[DEBUG] Attempting to send OTP {code} to {to_email}")
+
+        print(f"[DEBUG] Attempting to send {message['subject']!r} to {self._mask_email(to_email)} (attempt {message['attempts']})")
         print(f"[DEBUG] Using sender: {self._from_email}")
-        print(f"[DEBUG] Subject: Your verification code")
-        print(f"[DEBUG] OTP Code in email: {code}")
-        
+
         try:
             # Initialize SendGrid client with SSL context
             sg = SendGridAPIClient(self._sendgrid_key)
@@ -76,19 +101,10 @@ class OTPService:
             import ssl
             ssl._create_default_https_context = ssl._create_unverified_context
             
-            subject = "Your verification code"
-            text_body = f"Your OTP is {code}. It expires in {self.OTP_TTL_SECONDS // 60} minutes."
-            html_body = (
-                f"<p>Your verification code is:</p>"
-                f"<h2 style='letter-spacing:3px; font-family:monospace;'>{code}</h2>"
-                f"<p>This code will expire in <strong>{self.OTP_TTL_SECONDS // 60} minutes</strong>.</p>"
-                f"<p>If you didn't request this, you can ignore this email.</p>"
-            )
-            
             msg = Mail(from_email=Email(self._from_email, self._from_name),
-                       to_emails=To(to_email), subject=subject)
-            msg.add_content(Content("text/plain", text_body))
-            msg.add_content(Content("text/html", html_body))
+                       to_emails=To(to_email), subject=message["subject"])
+            msg.add_content(Content("text/plain", message["text"]))
+            msg.add_content(Content("text/html", message["html"]))
             
             # Disable sandbox mode to send real emails
             # from sendgrid.helpers.mail import MailSettings, SandBoxMode
@@ -105,16 +121,25 @@ class OTPService:
                 raise Exception(f"SendGrid returned status {response.status_code}")
                 
         except Exception as e:
-            print(f"[DEBUG] SendGrid error: {str(e)}")
-            raise e
+            error_msg = str(e)
+            print(f"[DEBUG] SendGrid error: {error_msg}")
+            # Configuration / address problems will fail the same way on every retry
+            if "401" in error_msg or "Unauthorized" in error_msg:
+                raise PermanentEmailError("SendGrid API key is invalid. Please check your configuration.") from e
+            if "403" in error_msg or "Forbidden" in error_msg:
+                raise PermanentEmailError(f"Email sender '{self._from_email}' is not verified in SendGrid.") from e
+            if "400" in error_msg or "Bad Request" in error_msg:
+                raise PermanentEmailError(f"SendGrid rejected the message: {error_msg[:150]}") from e
+            raise
 
     # ---------- API ----------
-    def send_otp_to_user(self, args: Dict[str, Any]) -> str:
+    def send_otp_to_user(self, args: Dict[str, Any], conversation_id: Optional[str] = None) -> str:
         email = str(args.get("email", "")).strip()
         if "@" not in email:
             return "Please provide a valid email address."
 
-        sess = self._get_session()
+        key = self._key(conversation_id, email)
+        sess = self._sessions.get(key) or {"id": key}
         now = self._now()
 
         # Cooldown to avoid spamming inbox
@@ -133,27 +158,12 @@ class OTPService:
             "otp_verified": False,
             "otp_attempts": 0,
         })
+        self._sessions.put(key, sess, self.OTP_TTL_SECONDS)
 
-        try:
-            self._send_via_sendgrid(email, code)
-            print(f"[DEBUG] OTP sending successful!")
-        except Exception as e:
-            error_msg = str(e)
-            print(f"[DEBUG] OTP sending failed: {error_msg}")
-            
-            if not self._sendgrid_key:
-                # In test mode, continue without actual email sending
-                pass
-            else:
-                # Return more specific error information
-                if "401" in error_msg or "Unauthorized" in error_msg:
-                    return "SendGrid API key is invalid. Please check your configuration."
-                elif "403" in error_msg or "Forbidden" in error_msg:
-                    return "SendGrid sender email is not verified. Please verify 'test@example.com' in your SendGrid dashboard or use a verified sender."
-                elif "sender" in error_msg.lower() or "from" in error_msg.lower():
-                    return f"Email sender '{self._from_email}' is not verified in SendGrid. Please verify your sender domain."
-                else:
-                    return f"Email sending failed: {error_msg[:150]}..."
+        # Delivery happens on the outbox workers (retry + backoff); the turn never waits on SendGrid
+        subject, text_body, html_body = self._compose(code)
+        queued = self._outbox.enqueue(email, subject, text_body, html_body, key=key, expires_in=self.OTP_TTL_SECONDS)
+        sess["message_id"] = queued["id"]
 
         # Minimal audit (masked email, never log OTP)
         self._emails_sent.append({
@@ -165,18 +175,26 @@ class OTPService:
         if not self._sendgrid_key:
             success_msg += " (Check console for test mode OTP)"
         else:
-            success_msg += " (Real email sent - check your inbox!)"
+            success_msg += " (Email on its way - check your inbox!)"
         
         return success_msg
 
-    def verify_otp_from_user(self, args: Dict[str, Any]) -> str:
+    def delivery_status(self, conversation_id: Optional[str] = None, email: str = "") -> Optional[Dict[str, Any]]:
+        """Outbox record of the latest code sent in this conversation (status, attempts, last_error), if any."""
+        sess = self._sessions.get(self._key(conversation_id, email))
+        return self._outbox.status(sess.get("message_id")) if sess else None
+
+    def verify_otp_from_user(self, args: Dict[str, Any], conversation_id: Optional[str] = None) -> str:
         code = str(args.get("code", "")).strip()
         email = str(args.get("email", "")).strip()
 
         if not code.isdigit() or not (4 <= len(code) <= 8):
             return "Please enter the 4–8 digit code from your email."
 
-        sess = self._get_session()
+        sess = self._sessions.get(self._key(conversation_id, email))
+        if sess is None:
+            # Never sent here, or swept after OTP_TTL_SECONDS
+            return "Your code has expired. Please request a new one."
         if not sess.get("email") or (email and email != sess["email"]):
             return "This email does not match the pending verification request."
         if sess.get("otp_verified", False):
@@ -186,6 +204,9 @@ class OTPService:
         if not sent_at or self._now() - sent_at > self.OTP_TTL_SECONDS:
             return "Your code has expired. Please request a new one."
 
+        if sess.get("otp_attempts", 0) >= self.MAX_ATTEMPTS:
+            return "Too many attempts. Please request a new code."
+
         expected = sess.get("otp_code", "")
         # Constant-time compare to avoid timing leaks
         if not hmac.compare_digest(code, expected):
@@ -199,4 +220,6 @@ class OTPService:
         sess.pop("otp_code", None)
         sess.pop("otp_sent_at", None)
         sess.pop("otp_attempts", None)
+        # Keep the verified flag for one more TTL window ("already verified"), then let it expire
+        self._sessions.put(sess["id"], sess, self.OTP_TTL_SECONDS)
         return "Email verified successfully."
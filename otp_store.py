@@ -0,0 +1,74 @@
+# otp_store.py
+"""
+In-memory OTP state keyed per conversation, with expiry on a min-heap.
+
+Every entry carries an `expires_at`; the heap holds (expires_at, seq, key) and `sweep()` pops
+only the entries that are due, O(log n) each, so codes, cooldowns and attempt counters never
+outlive their TTL and memory stays proportional to the signups of the last TTL window.
+Re-setting a key pushes a new heap item; the old one is skipped as stale when it surfaces.
+"""
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class OtpStore:
+    """
+    Public methods used by OTPService:
+      - get(key) -> dict | None          # a live entry (mutate it, then put() to extend)
+      - put(key, entry, ttl) -> dict
+      - pop(key) -> dict | None
+      - sweep(now=None) -> int           # expired entries removed
+      - __len__()
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._sweep(time.time())
+            return self._entries.get(key)
+
+    def put(self, key: str, entry: Dict[str, Any], ttl: float) -> Dict[str, Any]:
+        with self._lock:
+            now = time.time()
+            self._sweep(now)
+            entry["expires_at"] = now + ttl
+            self._entries[key] = entry
+            heapq.heappush(self._heap, (entry["expires_at"], next(self._seq), key))
+            return entry
+
+    def pop(self, key: str) -> Optional[Dict[str, Any]]:
+        # The heap item stays behind and is discarded as stale when it comes due
+        with self._lock:
+            return self._entries.pop(key, None)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        with self._lock:
+            return self._sweep(time.time() if now is None else now)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    # ---------- internals ----------
+    def _sweep(self, now: float) -> int:
+        removed = 0
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(self._heap)
+            entry = self._entries.get(key)
+            # Only the newest heap item of a key matches its entry's expiry
+            if entry is not None and entry["expires_at"] == expires_at:
+                del self._entries[key]
+                removed += 1
+        # Stale items (keys re-put or popped) would otherwise pile up under a busy key
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [(t, s, k) for t, s, k in self._heap if k in self._entries and self._entries[k]["expires_at"] == t]
+            heapq.heapify(self._heap)
+        return removed
@@ -0,0 +1,207 @@
+# output_guard.py
+"""
+Deterministic formatting pass over every assistant reply (replaces the prompts' self-check rules).
+
+  - TableScanner: streaming, line-oriented markdown scanner; feed() returns text that can be
+    shown immediately, tables are held only until their last row, close() flushes the rest
+  - OutputGuard.apply(text, drop_snapshots=False) -> (text, fixes): one-shot helper for respond()
+
+Rules enforced (React-Markdown friendly):
+  - blank line before and after every table; first table line starts with `|`
+  - header separator row present; every row has the header's column count
+  - `__bold__` instead of `**bold**`; no HTML tags (<br> in a cell becomes ` • `)
+  - Snapshot (`| Field Name | Value |`) at most once, at the very end of the message, with at
+    most 3 entries per role row (members, managers, shareholders, directors, officers);
+    with drop_snapshots=True (server-rendered Snapshot modes) every model copy is removed
+Fenced code blocks are passed through untouched.
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+MAX_PER_ROLE = 3
+
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_SEPARATOR_CELL = re.compile(r"^:?-{3,}:?$")
+_BOLD = re.compile(r"\*\*(?=\S)(.+?)(?<=\S)\*\*")
+_BR = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_STRONG = re.compile(r"</?(?:b|strong)>", re.IGNORECASE)
+_EM = re.compile(r"</?(?:i|em)>", re.IGNORECASE)
+_OTHER_TAGS = re.compile(r"</?(?:p|div|span|u|small|sup|sub|font|ul|ol|li|table|thead|tbody|tr|td|th)(?:\s[^>]*)?>", re.IGNORECASE)
+_EMPHASIS = re.compile(r"[*_`]")
+_ROLE_LABEL = re.compile(r"member|manager|shareholder|director|officer", re.IGNORECASE)
+_SNAPSHOT_HEADER = ("field name", "value")
+
+
+def _split_row(line: str) -> List[str]:
+    inner = line.strip()
+    if inner.startswith("|"):
+        inner = inner[1:]
+    if inner.endswith("|"):
+        inner = inner[:-1]
+    return [c.strip() for c in inner.split("|")]
+
+
+def _plain(cell: str) -> str:
+    return _EMPHASIS.sub("", cell).strip().lower()
+
+
+class TableScanner:
+    """
+    Feed reply text in chunks of any size:
+
+        scanner = TableScanner()
+        for chunk in stream:
+            show(scanner.feed(chunk))
+        show(scanner.close())
+
+    `fixes` counts what was changed (for logs / metrics).
+    """
+
+    def __init__(self, drop_snapshots: bool = False) -> None:
+        self.drop_snapshots = drop_snapshots
+        self.fixes: Dict[str, int] = {}
+        self._partial = ""
+        self._table: List[str] = []
+        self._snapshot: Optional[List[str]] = None  # held back until close()
+        self._in_fence = False
+        self._out: List[str] = []
+        self._last_blank = True  # start of message counts as a blank line
+        self._blank_after_table = False
+
+    # ---------- API ----------
+    def feed(self, chunk: str) -> str:
+        self._partial += chunk or ""
+        *lines, self._partial = self._partial.split("\n")
+        for line in lines:
+            self._line(line)
+        return self._take()
+
+    def close(self) -> str:
+        if self._partial:
+            self._line(self._partial)
+            self._partial = ""
+        self._flush_table()
+        if self._snapshot is not None:
+            self._emit_table(self._snapshot)
+            self._snapshot = None
+        return self._take()
+
+    # ---------- line handling ----------
+    def _line(self, line: str) -> None:
+        if _FENCE.match(line):
+            self._flush_table()
+            self._in_fence = not self._in_fence
+            self._emit(line)
+            return
+        if self._in_fence:
+            self._emit(line)
+            return
+        if line.lstrip().startswith("|"):
+            if line != line.lstrip():
+                self._count("table_indent_removed")
+            self._table.append(line.strip())
+            return
+        self._flush_table()
+        self._emit(self._inline(line))
+
+    def _flush_table(self) -> None:
+        if not self._table:
+            return
+        rows, self._table = self._format(self._table), []
+        if tuple(_plain(c) for c in _split_row(rows[0])) == _SNAPSHOT_HEADER:
+            if self.drop_snapshots or self._snapshot is not None:
+                self._count("snapshots_dropped")
+            if not self.drop_snapshots:
+                # Keep the latest Snapshot and move it to the end of the message
+                self._snapshot = rows
+            return
+        self._emit_table(rows)
+
+    def _emit_table(self, rows: List[str]) -> None:
+        if not self._last_blank:
+            self._count("blank_lines_added")
+            self._emit("")
+        for row in rows:
+            self._emit(row)
+        self._blank_after_table = True
+
+    def _emit(self, line: str) -> None:
+        blank = not line.strip()
+        if self._blank_after_table and not line.lstrip().startswith("|"):
+            self._blank_after_table = False
+            if not blank:
+                self._count("blank_lines_added")
+                self._out.append("\n")
+        self._out.append(line + "\n")
+        self._last_blank = blank
+
+    def _take(self) -> str:
+        out, self._out = "".join(self._out), []
+        return out
+
+    # ---------- formatting ----------
+    def _format(self, lines: List[str]) -> List[str]:
+        rows = [_split_row(line) for line in lines]
+        width = len(rows[0])
+        if len(rows) < 2 or not all(_SEPARATOR_CELL.match(c.replace(" ", "")) for c in rows[1] if c):
+            self._count("separators_added")
+            rows.insert(1, ["---"] * width)
+        snapshot = tuple(_plain(c) for c in rows[0]) == _SNAPSHOT_HEADER
+        out = []
+        for i, cells in enumerate(rows):
+            if i == 1:
+                cells = [c.replace(" ", "") or "---" for c in cells]
+            else:
+                cells = [self._cell(c) for c in cells]
+            if len(cells) < width:
+                self._count("cells_padded")
+                cells += [""] * (width - len(cells))
+            elif len(cells) > width:
+                self._count("cells_merged")
+                cells = cells[:width - 1] + [" • ".join(c for c in cells[width - 1:] if c)]
+            if snapshot and i > 1 and width == 2 and _ROLE_LABEL.search(cells[0]):
+                items = [s.strip() for s in cells[1].split(" • ")]
+                if len(items) > MAX_PER_ROLE:
+                    self._count("role_rows_capped")
+                    cells[1] = " • ".join(items[:MAX_PER_ROLE])
+            out.append("| " + " | ".join(cells) + " |")
+        return out
+
+    def _cell(self, cell: str) -> str:
+        cell, n = _BR.subn(" • ", cell)
+        if n:
+            self._count("html_removed", n)
+        return self._inline(cell)
+
+    def _inline(self, text: str) -> str:
+        text, n = _BOLD.subn(r"__\1__", text)
+        if n:
+            self._count("bold_converted", n)
+        html = 0
+        text, k = _BR.subn("  \n", text)
+        html += k
+        text, k = _STRONG.subn("__", text)
+        html += k
+        text, k = _EM.subn("_", text)
+        html += k
+        text, k = _OTHER_TAGS.subn("", text)
+        html += k
+        if html:
+            self._count("html_removed", html)
+        return text
+
+    def _count(self, key: str, n: int = 1) -> None:
+        self.fixes[key] = self.fixes.get(key, 0) + n
+
+
+class OutputGuard:
+    """
+    Public methods used by the app:
+      - apply(text, drop_snapshots=False) -> (text, fixes)
+    """
+
+    @staticmethod
+    def apply(text: str, drop_snapshots: bool = False) -> Tuple[str, Dict[str, int]]:
+        scanner = TableScanner(drop_snapshots=drop_snapshots)
+        out = scanner.feed(text or "") + scanner.close()
+        return re.sub(r"\n{3,}", "\n\n", out).strip(), scanner.fixes
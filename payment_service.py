@@ -1,7 +1,13 @@
 # payment_service.py
+import hashlib
 import json
 import os
-from typing import Optional, Dict, Any
+import threading
+import time
+from typing import Optional, Dict, Any, Mapping
+
+import state_data
+import state_fuzzy
 
 # Stripe is optional at import-time so local dev won't crash if it's missing.
 try:
@@ -19,76 +25,27 @@ class PaymentService:
       - create_payment_link(product_name, price, billing_cycle, state_fee, total_due_now,
                             session_id, success_url=None, cancel_url=None) -> dict{id,url}
       - check_payment_status(session_id) -> 'completed' | 'pending' | 'failed' | 'unknown'
+      - invalidate_checkout_cache(session_id) -> None
+      - configure_catalog(catalog) -> None
     """
 
-    # ====== State + Fee Tables ======
-    STATE_CODE_TO_NAME: Dict[str, str] = {
-        "AL":"Alabama","AK":"Alaska","AZ":"Arizona","AR":"Arkansas","CA":"California","CO":"Colorado",
-        "CT":"Connecticut","DE":"Delaware","FL":"Florida","GA":"Georgia","HI":"Hawaii","ID":"Idaho",
-        "IL":"Illinois","IN":"Indiana","IA":"Iowa","KS":"Kansas","KY":"Kentucky","LA":"Louisiana",
-        "ME":"Maine","MD":"Maryland","MA":"Massachusetts","MI":"Michigan","MN":"Minnesota",
-        "MS":"Mississippi","MO":"Missouri","MT":"Montana","NE":"Nebraska","NV":"Nevada",
-        "NH":"New Hampshire","NJ":"New Jersey","NM":"New Mexico","NY":"New York",
-        "NC":"North Carolina","ND":"North Dakota","OH":"Ohio","OK":"Oklahoma","OR":"Oregon",
-        "PA":"Pennsylvania","RI":"Rhode Island","SC":"South Carolina","SD":"South Dakota",
-        "TN":"Tennessee","TX":"Texas","UT":"Utah","VT":"Vermont","VA":"Virginia",
-        "WA":"Washington","WV":"West Virginia","WI":"Wisconsin","WY":"Wyoming","DC":"Washington, DC"
-    }
+    # Pre-provisioned plan Prices (see stripe_catalog.py); None = inline price_data
+    _catalog = None
+
+    # ====== Checkout reuse (quote fingerprint -> open Checkout Session) ======
+    # Sessions are reused only while they have at least this much life left.
+    CHECKOUT_REUSE_MARGIN_SECONDS = 5 * 60
+    # Idempotency keys roll over per window so an expired session is never replayed.
+    IDEMPOTENCY_WINDOW_SECONDS = 60 * 60
+    _checkout_cache: Dict[str, Dict[str, Any]] = {}
+    _checkout_generation: Dict[str, int] = {}  # bumped on invalidation → fresh idempotency keys
+    _checkout_cache_lock = threading.Lock()
+
+    # ====== State + Fee Tables (shared, read-only; see state_data.py) ======
+    STATE_CODE_TO_NAME: Mapping[str, str] = state_data.STATE_CODE_TO_NAME
 
     # Canonical state names → fees (USD whole dollars)
-    STATE_FEES: Dict[str, Dict[str, int]] = {
-        "Alabama":        {"llc":200, "s-corp":208, "c-corp":208},
-        "Alaska":         {"llc":250, "s-corp":250, "c-corp":250},
-        "Arizona":        {"llc":50,  "s-corp":60,  "c-corp":60 },
-        "Arkansas":       {"llc":45,  "s-corp":50,  "c-corp":50 },
-        "California":     {"llc":70,  "s-corp":100, "c-corp":100},
-        "Colorado":       {"llc":50,  "s-corp":50,  "c-corp":50 },
-        "Connecticut":    {"llc":120, "s-corp":250, "c-corp":250},
-        "Delaware":       {"llc":90,  "s-corp":89,  "c-corp":89 },
-        "Florida":        {"llc":125, "s-corp":70,  "c-corp":70 },
-        "Georgia":        {"llc":100, "s-corp":100, "c-corp":100},
-        "Hawaii":         {"llc":50,  "s-corp":50,  "c-corp":50 },
-        "Idaho":          {"llc":100, "s-corp":100, "c-corp":100},
-        "Illinois":       {"llc":150, "s-corp":150, "c-corp":150},
-        "Indiana":        {"llc":95,  "s-corp":90,  "c-corp":90 },
-        "Iowa":           {"llc":50,  "s-corp":50,  "c-corp":50 },
-        "Kansas":         {"llc":160, "s-corp":90,  "c-corp":90 },
-        "Kentucky":       {"llc":40,  "s-corp":50,  "c-corp":50 },
-        "Louisiana":      {"llc":100, "s-corp":75,  "c-corp":75 },
-        "Maine":          {"llc":175, "s-corp":145, "c-corp":145},
-        "Maryland":       {"llc":150, "s-corp":120, "c-corp":120},
-        "Massachusetts":  {"llc":500, "s-corp":275, "c-corp":275},
-        "Michigan":       {"llc":50,  "s-corp":60,  "c-corp":60 },
-        "Minnesota":      {"llc":155, "s-corp":135, "c-corp":135},
-        "Mississippi":    {"llc":50,  "s-corp":50,  "c-corp":50 },
-        "Missouri":       {"llc":50,  "s-corp":58,  "c-corp":58 },
-        "Montana":        {"llc":35,  "s-corp":70,  "c-corp":70 },
-        "Nebraska":       {"llc":100, "s-corp":60,  "c-corp":60 },
-        "Nevada":         {"llc":425, "s-corp":725, "c-corp":725},
-        "New Hampshire":  {"llc":100, "s-corp":100, "c-corp":100},
-        "New Jersey":     {"llc":125, "s-corp":125, "c-corp":125},
-        "New Mexico":     {"llc":50,  "s-corp":100, "c-corp":100},
-        "New York":       {"llc":200, "s-corp":125, "c-corp":125},
-        "North Carolina": {"llc":125, "s-corp":125, "c-corp":125},
-        "North Dakota":   {"llc":135, "s-corp":100, "c-corp":100},
-        "Ohio":           {"llc":99,  "s-corp":99,  "c-corp":99 },
-        "Oklahoma":       {"llc":100, "s-corp":50,  "c-corp":50 },
-        "Oregon":         {"llc":100, "s-corp":100, "c-corp":100},
-        "Pennsylvania":   {"llc":125, "s-corp":125, "c-corp":125},
-        "Rhode Island":   {"llc":150, "s-corp":230, "c-corp":230},
-        "South Carolina": {"llc":110, "s-corp":125, "c-corp":125},
-        "South Dakota":   {"llc":150, "s-corp":150, "c-corp":150},
-        "Tennessee":      {"llc":300, "s-corp":100, "c-corp":100},
-        "Texas":          {"llc":300, "s-corp":300, "c-corp":300},
-        "Utah":           {"llc":70,  "s-corp":70,  "c-corp":70 },
-        "Vermont":        {"llc":125, "s-corp":125, "c-corp":125},
-        "Virginia":       {"llc":100, "s-corp":25,  "c-corp":25 },
-        "Washington":     {"llc":200, "s-corp":200, "c-corp":200},
-        "West Virginia":  {"llc":100, "s-corp":50,  "c-corp":50 },
-        "Wisconsin":      {"llc":130, "s-corp":100, "c-corp":100},
-        "Wyoming":        {"llc":100, "s-corp":100, "c-corp":100},
-        "Washington, DC": {"llc":99,  "s-corp":99,  "c-corp":99 }
-    }
+    STATE_FEES: Mapping[str, Mapping[str, int]] = state_data.STATE_FEES
 
     # ====== Public: State fee lookup ======
     @classmethod
@@ -111,14 +68,23 @@ class PaymentService:
 
         dollars = cls.get_state_filing_fee(canonical_state, normalized_entity)
         if dollars is None:
-            return {"error": "fee_not_found", "state": canonical_state, "entity_type": normalized_entity}
-
-        return {
+            out = {"error": "fee_not_found", "state": canonical_state, "entity_type": normalized_entity}
+            # Low-confidence fuzzy match: let the agent ask "Did you mean …?" instead of re-asking
+            match = state_fuzzy.match_state(state)
+            if match.name:
+                out["suggestion"] = match.name
+                out["confidence"] = match.confidence
+            return out
+
+        out = {
             "state": canonical_state,
             "entity_type": normalized_entity,
             "stateFilingFee": int(dollars),
             "stateFilingFeeCents": int(dollars) * 100
         }
+        if state_data.resolve_state(state) is None:
+            out["correctedFrom"] = state
+        return out
 
     # ====== Public: Create Stripe Checkout and return link ======
     @classmethod
@@ -140,7 +106,20 @@ class PaymentService:
           - Line item 1: Plan (e.g., "Classic Plan — yearly")
           - Line item 2: State filing fees
         Persists mapping: conversation session_id → checkout_session_id.
+
+        An identical quote for the same conversation returns the still-open
+        session from the fingerprint cache ({"reused": True}) instead of
+        creating a new one; creates are sent with a Stripe idempotency key.
         """
+        fingerprint = cls._quote_fingerprint(session_id, product_name, price, billing_cycle, state_fee)
+        cached = cls._get_cached_checkout(fingerprint)
+        if cached:
+            print(f"[PaymentService] ♻️ Reusing open Checkout Session {cached['id']} for unchanged quote")
+            # Switching A → B → A must point status checks back at A's session.
+            if session_id and cls._get_checkout_session_id(session_id) != cached["id"]:
+                cls._store_checkout_session_id(session_id, cached["id"])
+            return {"id": cached["id"], "url": cached["url"], "reused": True}
+
         if stripe is None:
             raise RuntimeError("Stripe SDK is not installed. Run: pip install stripe")
 
@@ -164,16 +143,23 @@ class PaymentService:
         plan_cents = to_cents(price)
         state_fee_cents = to_cents(state_fee)
 
-        # Build line items
-        line_items = [
-            {
+        # Reference the catalog Price when the amount matches; otherwise inline price_data
+        plan_price_id = cls._catalog.price_id(product_name, billing_cycle, plan_cents) if cls._catalog else None
+        if plan_price_id:
+            plan_item = {"quantity": 1, "price": plan_price_id}
+        else:
+            plan_item = {
                 "quantity": 1,
                 "price_data": {
                     "currency": "usd",
                     "unit_amount": plan_cents,
                     "product_data": {"name": plan_display},
                 },
-            },
+            }
+
+        # Build line items
+        line_items = [
+            plan_item,
             {
                 "quantity": 1,
                 "price_data": {
@@ -210,13 +196,15 @@ class PaymentService:
             metadata=metadata,
             allow_promotion_codes=True,
             invoice_creation={"enabled": False},
+            idempotency_key=cls._idempotency_key(fingerprint, session_id),
         )
 
         # Persist mapping for later status checks
         if session_id:
             cls._store_checkout_session_id(session_id, cs.id)
 
-        return {"id": cs.id, "url": cs.url}
+        cls._cache_checkout(fingerprint, session_id, cs)
+        return {"id": cs.id, "url": cs.url, "reused": False}
 
     # ====== Public: Check Stripe payment status ======
     @classmethod
@@ -253,57 +241,99 @@ class PaymentService:
         payment_status = getattr(cs, "payment_status", None)  # 'unpaid' | 'paid' | ...
 
         if status == "complete" and payment_status == "paid":
+            cls.invalidate_checkout_cache(session_id)
             return "completed"
         if status == "expired":
+            cls.invalidate_checkout_cache(session_id)
             return "failed"
         return "pending"
 
+    # ====== Public: Use pre-provisioned plan Prices ======
+    @classmethod
+    def configure_catalog(cls, catalog: Any) -> None:
+        """Install a synced StripeCatalog (or LocalCatalog stand-in) for plan line items."""
+        cls._catalog = catalog
+
+    # ====== Public: Drop reusable Checkout Sessions for a conversation ======
+    @classmethod
+    def invalidate_checkout_cache(cls, session_id: Optional[str]) -> None:
+        """Forget cached open sessions for a conversation (entity switch, paid, expired)."""
+        if not session_id:
+            return
+        with cls._checkout_cache_lock:
+            stale = [fp for fp, entry in cls._checkout_cache.items() if entry.get("conversation_id") == session_id]
+            for fp in stale:
+                cls._checkout_cache.pop(fp, None)
+            cls._checkout_generation[session_id] = cls._checkout_generation.get(session_id, 0) + 1
+        if stale:
+            print(f"[PaymentService] 🧹 Invalidated {len(stale)} cached Checkout Session(s) for {session_id}")
+
+    # ====== Internals: Checkout reuse helpers ======
+    @staticmethod
+    def _quote_fingerprint(
+        session_id: Optional[str],
+        product_name: str,
+        price: float,
+        billing_cycle: Optional[str],
+        state_fee: float,
+    ) -> str:
+        # Amounts are compared in cents so 299 and 299.0 hash identically.
+        raw = "|".join([
+            session_id or "",
+            product_name or "",
+            str(int(round(float(price or 0) * 100))),
+            billing_cycle or "",
+            str(int(round(float(state_fee or 0) * 100))),
+        ])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    @classmethod
+    def _idempotency_key(cls, fingerprint: str, session_id: Optional[str]) -> str:
+        window = int(time.time()) // cls.IDEMPOTENCY_WINDOW_SECONDS
+        generation = cls._checkout_generation.get(session_id or "", 0)
+        return f"checkout-{fingerprint}-{window}-{generation}"
+
+    @classmethod
+    def _get_cached_checkout(cls, fingerprint: str) -> Optional[Dict[str, Any]]:
+        with cls._checkout_cache_lock:
+            entry = cls._checkout_cache.get(fingerprint)
+            if not entry:
+                return None
+            if entry["expires_at"] - cls.CHECKOUT_REUSE_MARGIN_SECONDS <= time.time():
+                cls._checkout_cache.pop(fingerprint, None)
+                return None
+            return dict(entry)
+
+    @classmethod
+    def _cache_checkout(cls, fingerprint: str, session_id: Optional[str], cs: Any) -> None:
+        if not session_id:
+            return
+        # Checkout Sessions default to a 24h lifetime when Stripe omits expires_at.
+        expires_at = getattr(cs, "expires_at", None) or int(time.time()) + 24 * 60 * 60
+        with cls._checkout_cache_lock:
+            cls._checkout_cache[fingerprint] = {
+                "id": cs.id,
+                "url": cs.url,
+                "conversation_id": session_id,
+                "expires_at": int(expires_at),
+            }
+
     # ====== Internals: Fee helpers ======
     @classmethod
     def _normalize_entity(cls, entity: Optional[str]) -> Optional[str]:
-        if not entity:
-            return None
-        s = entity.strip().lower().replace('.', '').replace('-', ' ').replace('  ', ' ')
-        if s == "llc":
-            return "LLC"
-        if s in {"c corp", "ccorp", "c corp ", "c  corp"}:
-            return "C-Corp"
-        if s in {"s corp", "scorp", "s ccorp", "s c corp", "s corp "}:
-            return "S-Corp"
-        return None
+        return state_data.normalize_entity(entity)
 
     @classmethod
     def _resolve_state(cls, state: str) -> str:
         raw = (state or "").strip()
         if not raw:
             return ""
-        # 2-letter code?
-        upper = raw.upper()
-        canonical = cls.STATE_CODE_TO_NAME.get(upper)
-        if canonical:
-            return canonical
-
-        # Normalize DC variants
-        s = raw.lower().replace('.', '').replace(',', '').replace('  ', ' ').strip()
-        if s in {"dc", "d c", "washington dc", "washington d c", "district of columbia"}:
-            return "Washington, DC"
-
-        # Exact full-name match
-        for key in cls.STATE_FEES.keys():
-            if key.lower() == raw.lower():
-                return key
-        return raw  # fall through (may miss in fees)
+        # Exact alias, then a confident typo correction; else fall through (may miss in fees)
+        return state_fuzzy.correct_state(raw) or raw
 
     @classmethod
     def get_state_filing_fee(cls, state: str, entity_type: str) -> Optional[int]:
-        canonical_state = cls._resolve_state(state)
-        normalized_entity = cls._normalize_entity(entity_type)
-        if not canonical_state or not normalized_entity:
-            return None
-        fee_row = cls.STATE_FEES.get(canonical_state)
-        if not fee_row:
-            return None
-        return fee_row.get(normalized_entity.lower())
+        return state_data.filing_fee(state, entity_type)
 
     # ====== Internals: Mapping (conversation_id -> checkout_session_id) ======
     @staticmethod
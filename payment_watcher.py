@@ -0,0 +1,156 @@
+# payment_watcher.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from payment_service import PaymentService
+
+
+class PaymentWatcher:
+    """
+    Server-side payment status watcher for conversations in `awaiting_payment`.
+
+    Every open tab polls through the same watcher, so Stripe is asked at most once per
+    backoff step per conversation no matter how many tabs are open. Webhook-fed
+    statuses (record_status) short-circuit polling entirely. A conversation stops being
+    watched once its status is final; only its status and summary are kept (KEEP_FINAL most
+    recent) so late tabs neither call Stripe again nor rebuild the summary.
+
+    Public methods used by the app:
+      - watch(conversation_id) -> None
+      - poll(conversation_id) -> 'completed' | 'pending' | 'failed' | 'unknown'
+      - record_status(conversation_id, status) -> None
+      - summary_once(conversation_id, build) -> str
+      - unwatch(conversation_id) -> None
+    """
+
+    # Seconds between Stripe checks; the last value repeats until MAX_WATCH_SECONDS.
+    BACKOFF_SCHEDULE = (3, 5, 10, 20, 40, 60)
+    MAX_WATCH_SECONDS = 24 * 60 * 60
+    TERMINAL = ("completed", "failed")
+    KEEP_FINAL = 1000
+
+    def __init__(
+        self,
+        check_status: Callable[[Optional[str]], str] = PaymentService.check_payment_status,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._check_status = check_status
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._final: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    # ---------- API ----------
+    def watch(self, conversation_id: Optional[str]) -> None:
+        """Start (or restart) the backoff schedule, e.g. right after a payment link is created."""
+        if not conversation_id:
+            return
+        entry = self._new_entry()
+        # The user cannot have paid yet, so skip the immediate check
+        entry["next_check_at"] += self.BACKOFF_SCHEDULE[0]
+        with self._lock:
+            self._final.pop(conversation_id, None)
+            self._entries[conversation_id] = entry
+        print(f"[PaymentWatcher] 👀 Watching {conversation_id}")
+
+    def unwatch(self, conversation_id: Optional[str]) -> None:
+        """Stop polling (link replaced, session ended); a final status already recorded is kept."""
+        with self._lock:
+            entry = self._entries.pop(conversation_id or "", None)
+        if entry is not None:
+            print(f"[PaymentWatcher] 🙈 Stopped watching {conversation_id}")
+
+    def record_status(self, conversation_id: Optional[str], status: str) -> None:
+        """Feed a known status (webhook, tool call, redirect) so the next poll needs no API call."""
+        if not conversation_id or status not in ("completed", "pending", "failed"):
+            return
+        with self._lock:
+            entry = self._entries.get(conversation_id) or self._final.pop(conversation_id, None)
+            if entry is None:
+                entry = self._new_entry()
+            entry["status"] = status
+            if status in self.TERMINAL:
+                self._finish(conversation_id, entry)
+            else:
+                self._entries[conversation_id] = entry
+
+    def poll(self, conversation_id: Optional[str]) -> str:
+        """Return the conversation's status, calling Stripe only when the schedule says so.
+
+        Conversations that were never watched (or were unwatched) are not polled: 'unknown'.
+        """
+        if not conversation_id:
+            return "unknown"
+        now = self._clock()
+        with self._lock:
+            final = self._final.get(conversation_id)
+            if final is not None:
+                return final["status"]
+            entry = self._entries.get(conversation_id)
+            if entry is None:
+                return "unknown"
+            if entry["checking"] or now < entry["next_check_at"]:
+                return entry["status"]
+            if now - entry["started_at"] > self.MAX_WATCH_SECONDS:
+                entry["status"] = "failed"
+                self._finish(conversation_id, entry)
+                return "failed"
+            # Claim this check so concurrent tabs reuse the cached status instead
+            entry["checking"] = True
+
+        try:
+            status = self._check_status(conversation_id)
+        except Exception as e:
+            print(f"[PaymentWatcher] ⚠️ Status check failed for {conversation_id}: {e}")
+            status = "unknown"
+
+        with self._lock:
+            entry["checking"] = False
+            entry["attempts"] += 1
+            step = min(entry["attempts"], len(self.BACKOFF_SCHEDULE) - 1)
+            entry["next_check_at"] = self._clock() + self.BACKOFF_SCHEDULE[step]
+            if status in ("completed", "pending", "failed"):
+                entry["status"] = status
+            print(f"[PaymentWatcher] 🧾 {conversation_id} check #{entry['attempts']} -> {status}")
+            # Skip if the conversation was unwatched or re-watched while Stripe was being asked
+            if entry["status"] in self.TERMINAL and self._entries.get(conversation_id) is entry:
+                self._finish(conversation_id, entry)
+            return entry["status"]
+
+    def summary_once(self, conversation_id: str, build: Callable[[], str]) -> str:
+        """Build the post-payment message once per conversation and share it across tabs."""
+        with self._lock:
+            entry = self._final.get(conversation_id) or self._entries.get(conversation_id)
+            if entry is None:
+                # Summaries are only built for completed payments
+                entry = self._new_entry()
+                entry["status"] = "completed"
+                self._finish(conversation_id, entry)
+        with entry["summary_lock"]:
+            if entry["summary"] is None:
+                entry["summary"] = build()
+            return entry["summary"]
+
+    # ---------- internals ----------
+    def _finish(self, conversation_id: str, entry: Dict[str, Any]) -> None:
+        """Stop watching a conversation with a final status (caller holds the lock)."""
+        self._entries.pop(conversation_id, None)
+        self._final[conversation_id] = entry
+        self._final.move_to_end(conversation_id)
+        while len(self._final) > self.KEEP_FINAL:
+            self._final.popitem(last=False)
+        print(f"[PaymentWatcher] 🏁 {conversation_id} {entry['status']}; no longer watched")
+
+    def _new_entry(self) -> Dict[str, Any]:
+        now = self._clock()
+        return {
+            "status": "pending",
+            "attempts": 0,
+            "started_at": now,
+            "next_check_at": now,
+            "checking": False,
+            "summary": None,
+            "summary_lock": threading.Lock(),
+        }
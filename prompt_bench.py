@@ -0,0 +1,334 @@
+# prompt_bench.py
+"""
+Prompt variant benchmark: replays a fixed set of conversations against the mode prompts of
+one or more revisions and reports prompt tokens, output tokens, turns to completion and wall
+time side by side, so prompt edits can be gated on their cost.
+
+    python prompt_bench.py                         # HEAD vs working tree
+    python prompt_bench.py ef435b7 HEAD WORKTREE   # any git revisions, in column order
+    python prompt_bench.py HEAD WORKTREE --max-increase 2   # exit 1 if prompt tokens grow > 2 %
+    python prompt_bench.py --json
+
+Replay source, per conversation and variant:
+  - cassette: a conversation the app recorded (BENCH_CASSETTE_DIR=<dir>, named BENCH_SCRIPT or
+    else the session id) with the same prompts (matched by fingerprint()); its recorded usage,
+    turn count and model latency are reported. Each recording session (app session id) starts
+    the cassette afresh. Default directory: data/bench_cassettes
+  - fake model: the scripted conversations in data/bench_scripts.json; the scripted reply is
+    the model output, prompt tokens = the turn's mode/step instructions + history so far, and
+    wall time is the local instruction build + tokenization time. output_tokens and turns are
+    therefore constant across variants by construction: only cassettes can move them, so the
+    turns gate can never trip on fake-model rows
+Only the prompt modules differ between variants, so the app's routing header and server_state
+line are not counted. Each variant runs in a child process that imports its revision's prompt
+modules (`git show REV:<file>` into a temp dir), so revisions never mix.
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from token_metrics import TOKENIZER, count_tokens
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_PATH = os.path.join(ROOT, "data", "bench_scripts.json")
+CASSETTE_DIR = os.path.join(ROOT, "data", "bench_cassettes")  # committed recordings
+PROMPT_FILES = ("base_prompt.py", "llc_prompt.py", "corp_prompt.py", "payment_prompt.py", "prompt_fragments.py")
+WORKTREE = "WORKTREE"
+METRICS = ("prompt_tokens", "output_tokens", "turns", "wall_ms")
+
+
+# ---------- prompts of the imported revision ----------
+def _mode_prompts() -> Dict[str, str]:
+    from base_prompt import BasePrompt
+    from corp_prompt import CorpPrompt
+    from llc_prompt import LLCPrompt
+    from payment_prompt import PaymentPrompt
+    return {
+        "BASE": BasePrompt.get_mode_prompt(),
+        "LLC": LLCPrompt.get_mode_prompt(),
+        "CORP": CorpPrompt.get_mode_prompt(),
+        "PAYMENT": PaymentPrompt.get_mode_prompt(),
+    }
+
+
+def fingerprint() -> str:
+    """Short hash of the four mode prompts; cassettes are stored and matched under it."""
+    digest = hashlib.sha1()
+    for name, text in sorted(_mode_prompts().items()):
+        digest.update(f"{name}\0{text}\0".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def _instructions(mode: str, step: Optional[int]) -> str:
+    """What the agent for `mode` is sent; step-scoped LLC prompt when the revision has one."""
+    if mode == "LLC":
+        from llc_prompt import LLCPrompt
+        step_prompt = getattr(LLCPrompt, "get_step_prompt", None)
+        if step_prompt is not None and step is not None:
+            return step_prompt(step)
+        return LLCPrompt.get_mode_prompt()
+    prompts = _mode_prompts()
+    return prompts.get("CORP" if mode in ("C-CORP", "S-CORP") else mode, prompts["BASE"])
+
+
+# ---------- cassettes ----------
+class Cassette:
+    """
+    Recorded conversations: <dir>/<fingerprint>/<name>.json = {"name", "fingerprint", "turns": [...]},
+    one turn per user message:
+      {"mode", "step", "user", "assistant", "input_tokens", "output_tokens", "requests", "latency_ms", "completed"}
+
+    Public methods used by the app:
+      - record(directory, name, run_id, turn) -> bool   # False when nothing was written
+      - load(directory, fp) -> dict     # name -> cassette
+    """
+
+    _fingerprint: Optional[str] = None
+    _runs: Dict[str, str] = {}  # cassette path -> run id recording into it in this process
+
+    @classmethod
+    def record(cls, directory: str, name: Optional[str], run_id: Optional[str], turn: Mapping[str, Any]) -> bool:
+        """Append `turn` to `name`'s cassette; the first turn of a new run id replaces any earlier recording."""
+        if not name or not run_id:
+            print("[BENCH] ⚠️ Not recording: set BENCH_SCRIPT or wait for a session id")
+            return False
+        if cls._fingerprint is None:
+            cls._fingerprint = fingerprint()
+        folder = os.path.join(directory, cls._fingerprint)
+        path = os.path.join(folder, f"{name}.json")
+        try:
+            os.makedirs(folder, exist_ok=True)
+            cassette = None
+            if cls._runs.get(path) == run_id:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        cassette = json.load(f)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    pass
+            if cassette is None:
+                cassette = {"name": name, "fingerprint": cls._fingerprint, "run_id": run_id, "turns": []}
+                cls._runs[path] = run_id
+            cassette["turns"].append(dict(turn))
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(cassette, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            print(f"[BENCH] ⚠️ Failed to record cassette {path}: {e}")
+            return False
+        return True
+
+    @staticmethod
+    def load(directory: Optional[str], fp: str) -> Dict[str, Dict[str, Any]]:
+        folder = os.path.join(directory or "", fp)
+        if not directory or not os.path.isdir(folder):
+            return {}
+        out = {}
+        for file in sorted(os.listdir(folder)):
+            if file.endswith(".json"):
+                with open(os.path.join(folder, file), "r", encoding="utf-8") as f:
+                    cassette = json.load(f)
+                out[cassette.get("name") or file[:-5]] = cassette
+        return out
+
+
+# ---------- replay (child process) ----------
+def _turns_to_completion(turns: Sequence[Mapping[str, Any]], scripted: bool) -> Optional[int]:
+    for i, turn in enumerate(turns, 1):
+        if turn.get("completed"):
+            return i
+    # A script ends at its last turn; a recording that never completed has no turn count
+    return len(turns) if scripted else None
+
+
+def _replay_script(script: Mapping[str, Any]) -> Dict[str, Any]:
+    prompt = output = 0
+    history = 0
+    started = time.perf_counter()
+    for turn in script["turns"]:
+        user = count_tokens(turn["user"])
+        prompt += count_tokens(_instructions(turn["mode"], turn.get("step"))) + history + user
+        reply = count_tokens(turn["assistant"])
+        output += reply
+        history += user + reply
+    return {
+        "source": "fake",
+        "prompt_tokens": prompt,
+        "output_tokens": output,
+        "turns": _turns_to_completion(script["turns"], scripted=True),
+        "wall_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def _replay_cassette(cassette: Mapping[str, Any]) -> Dict[str, Any]:
+    turns = cassette.get("turns") or []
+    return {
+        "source": "cassette",
+        "prompt_tokens": sum(int(t.get("input_tokens") or 0) for t in turns),
+        "output_tokens": sum(int(t.get("output_tokens") or 0) for t in turns),
+        "turns": _turns_to_completion(turns, scripted=False),
+        "wall_ms": round(sum(float(t.get("latency_ms") or 0) for t in turns), 1),
+    }
+
+
+def measure(scripts: Sequence[Mapping[str, Any]], cassette_dir: Optional[str]) -> Dict[str, Any]:
+    """Replay every conversation against the prompt modules importable right now."""
+    fp = fingerprint()
+    cassettes = Cassette.load(cassette_dir, fp)
+    results = {}
+    for script in scripts:
+        cassette = cassettes.pop(script["name"], None)
+        results[script["name"]] = _replay_cassette(cassette) if cassette else _replay_script(script)
+    for name, cassette in cassettes.items():  # recordings without a script
+        results[name] = _replay_cassette(cassette)
+    sizes = {mode: count_tokens(text) for mode, text in _mode_prompts().items()}
+    return {"fingerprint": fp, "prompt_sizes": sizes, "conversations": results}
+
+
+# ---------- variants (parent process) ----------
+def _git(*args: str) -> str:
+    return subprocess.run(["git", *args], cwd=ROOT, check=True, capture_output=True, text=True).stdout
+
+
+def _checkout(revision: str, folder: str) -> None:
+    """Write the revision's prompt modules into `folder` (files the revision lacks are skipped)."""
+    for file in PROMPT_FILES:
+        try:
+            source = _git("show", f"{revision}:{file}")
+        except subprocess.CalledProcessError:
+            continue
+        with open(os.path.join(folder, file), "w", encoding="utf-8") as f:
+            f.write(source)
+
+
+def run_variant(revision: str, scripts_path: str, cassette_dir: Optional[str]) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="prompt_bench_") as folder:
+        if revision == WORKTREE:
+            label, prompt_dir = WORKTREE, ROOT
+        else:
+            label, prompt_dir = _git("rev-parse", "--short", revision).strip(), folder
+            _checkout(revision, folder)
+        cmd = [sys.executable, os.path.abspath(__file__), "--measure", prompt_dir, "--scripts", scripts_path]
+        if cassette_dir:
+            cmd += ["--cassettes", cassette_dir]
+        env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+        proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{revision}: {proc.stderr.strip().splitlines()[-1:] or proc.returncode}")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["variant"] = revision if revision == WORKTREE else f"{revision} ({label})" if label != revision else label
+    return result
+
+
+def _totals(result: Mapping[str, Any]) -> Dict[str, Any]:
+    convs = result["conversations"].values()
+    turns = [c["turns"] for c in convs]
+    return {
+        "prompt_tokens": sum(c["prompt_tokens"] for c in convs),
+        "output_tokens": sum(c["output_tokens"] for c in convs),
+        "turns": None if None in turns else sum(turns),
+        "wall_ms": round(sum(c["wall_ms"] for c in convs), 1),
+    }
+
+
+def _fmt(value: Any) -> str:
+    if value is None:
+        return "incomplete"
+    return f"{value:,.1f}" if isinstance(value, float) else f"{value:,}"
+
+
+def _delta(base: Any, value: Any) -> str:
+    if base is None or value is None:
+        return ""
+    diff = value - base
+    pct = f" ({diff / base:+.1%})" if base else ""
+    return f"{diff:+,.1f}{pct}" if isinstance(diff, float) else f"{diff:+,}{pct}"
+
+
+def render(results: Sequence[Mapping[str, Any]]) -> str:
+    """Side-by-side table: one block per conversation plus totals; Δ is last variant vs first."""
+    labels = [r["variant"] for r in results]
+    width = max(14, *(len(label) for label in labels))
+    head = f"{'conversation':<22} {'metric':<14} " + " ".join(f"{label:>{width}}" for label in labels)
+    if len(results) > 1:
+        head += f"   {'Δ last vs first':>18}"
+    lines = [head, "-" * len(head)]
+    names = list(dict.fromkeys(n for r in results for n in r["conversations"]))
+    blocks = [(n, [r["conversations"].get(n) for r in results]) for n in names]
+    blocks.append(("TOTAL", [_totals(r) for r in results]))
+    for name, rows in blocks:
+        for i, metric in enumerate(METRICS):
+            values = [row[metric] if row else None for row in rows]
+            line = f"{name if i == 0 else '':<22} {metric:<14} " + " ".join(f"{_fmt(v):>{width}}" for v in values)
+            if len(results) > 1:
+                line += f"   {_delta(values[0], values[-1]):>18}"
+            lines.append(line)
+        if name != "TOTAL":
+            sources = {row["source"] for row in rows if row}
+            lines.append(f"{'':<22} {'source':<14} " + ", ".join(sorted(sources)))
+    lines.append("")
+    lines.append("prompt sizes (tokens): " + " | ".join(
+        f"{r['variant']}: " + ", ".join(f"{m} {n:,}" for m, n in r["prompt_sizes"].items()) for r in results
+    ))
+    lines.append(f"tokenizer: {TOKENIZER}")
+    if any(c["source"] == "fake" for r in results for c in r["conversations"].values()):
+        lines.append("note: fake-model rows replay scripted replies, so their output_tokens and turns are "
+                     "constant by construction and the turns gate cannot trip on them; record cassettes to measure those")
+    return "\n".join(lines)
+
+
+def gate(results: Sequence[Mapping[str, Any]], max_increase: float) -> List[str]:
+    """Regressions of every variant against the first one (prompt tokens over the limit, more turns).
+
+    Turns only differ between variants on cassette rows; fake-model turns are fixed by the script.
+    """
+    problems = []
+    base = _totals(results[0])
+    for result in results[1:]:
+        totals = _totals(result)
+        limit = base["prompt_tokens"] * (1 + max_increase / 100)
+        if totals["prompt_tokens"] > limit:
+            problems.append(f"{result['variant']}: prompt tokens {totals['prompt_tokens']:,} > "
+                            f"{base['prompt_tokens']:,} + {max_increase:g}%")
+        if base["turns"] is not None and (totals["turns"] is None or totals["turns"] > base["turns"]):
+            problems.append(f"{result['variant']}: turns to completion {_fmt(totals['turns'])} > {base['turns']:,}")
+    return problems
+
+
+def _load_scripts(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["scripts"]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare prompt revisions on scripted / recorded conversations.")
+    parser.add_argument("revisions", nargs="*", help=f"git revisions or {WORKTREE} (default: HEAD {WORKTREE})")
+    parser.add_argument("--scripts", default=SCRIPTS_PATH, help="scripted conversations (JSON)")
+    parser.add_argument("--cassettes", default=os.getenv("BENCH_CASSETTE_DIR", CASSETTE_DIR), help="recorded conversations directory")
+    parser.add_argument("--max-increase", type=float, default=None, help="fail when prompt tokens grow more than this %%")
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    parser.add_argument("--measure", metavar="PROMPT_DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        sys.path.insert(0, args.measure)
+        print(json.dumps(measure(_load_scripts(args.scripts), args.cassettes)))
+        return 0
+
+    results = [run_variant(rev, args.scripts, args.cassettes) for rev in (args.revisions or ["HEAD", WORKTREE])]
+    print(json.dumps(results, indent=2) if args.json else render(results))
+    if args.max_increase is None:
+        return 0
+    problems = gate(results, args.max_increase)
+    for problem in problems:
+        print("❌", problem)
+    print("✅ no prompt regressions" if not problems else f"{len(problems)} regression(s)")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+# prompt_fragments.py
+"""
+Prompt blocks shared by the Base, LLC, Corp and Payment prompts, defined once.
+
+Prompt templates reference a fragment with an `@@NAME@@` marker on its own line (or
+inline for the field lists) and call `compose()` to expand them. Each prompt
+includes each fragment at most once; the copies that used to be repeated inside a
+single prompt (reassurance layers, table rules) are gone. Table and emphasis formatting
+is no longer a prompt rule at all: output_guard enforces it on every reply.
+
+Run `python prompt_fragments.py` for the byte/token savings report and the
+equivalence check (also run by tests/test_prompt_fragments.py). The check compares the
+assembled prompts line by line against the pre-refactor prompt text frozen in
+data/prompt_baseline/ (pinned by BASELINE_SHA256): every line that is gone must be listed
+in data/prompt_baseline/dropped.json with what covers it now.
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Tuple
+
+BASE_COMPANY_FIELDS = "Full Name, Email, Phone, Business Name, Business Purpose, State, NAICS Code, Entity Type"
+LLC_ONLY_FIELDS = (
+    "Designator, Governance Type, Sole Member, Members (max 3 shown), Managers (max 3 shown), Ownership Total, "
+    "Registered Agent, Virtual Business Address, Legal Business Name (LLC)"
+)
+CORP_ONLY_FIELDS = (
+    "Designator, Authorized Shares, Par Value, Shareholders (max 3 shown), Directors (max 3 shown), "
+    "Officers{President/CEO, Treasurer/CFO, Secretary}, Registered Agent, Virtual Business Address, "
+    "Legal Business Name (Corp)"
+)
+
+SINGLE_SNAPSHOT = """\
+ Server-Rendered Snapshot (MANDATORY)
+- The server appends the **Snapshot** table (`| Field Name | Value |`) to the end of every message from the recorded fields. __Never write that table yourself__; end your message with the narrative, menu or question.
+- Record every captured, corrected or cleared value with __one `setFields` call__ per message. Wherever these instructions say to render, re-render or show the Snapshot / summary table, that call is what updates it. Rows owned by `validateLlcMembers`, `validateCorpStructure` and `checkBusinessName` are recorded by those tools."""
+
+REASSURANCE = """\
+ LEGAL & SECURITY REASSURANCE LAYER (WHEN NEEDED)
+- __Your information is encrypted, stored securely, and reviewed by certified specialists before any state submission.__
+- On any legal concern: __I completely understand your concern. Our specialists review every detail before filing to ensure full compliance. You are fully protected and supported throughout the process.__"""
+
+SALES_RETENTION = """\
+ SALES AND RETENTION LAYER
+- __We handle everything end-to-end:__ paperwork, legal checks, and compliance. __You will not need to leave this chat.__
+- __You are making great progress__; each step brings you closer to launching your business."""
+
+FRAGMENTS: Mapping[str, str] = MappingProxyType({
+    "BASE_COMPANY_FIELDS": BASE_COMPANY_FIELDS,
+    "LLC_ONLY_FIELDS": LLC_ONLY_FIELDS,
+    "CORP_ONLY_FIELDS": CORP_ONLY_FIELDS,
+    "SINGLE_SNAPSHOT": SINGLE_SNAPSHOT,
+    "REASSURANCE": REASSURANCE,
+    "SALES_RETENTION": SALES_RETENTION,
+})
+_MARKER = re.compile(r"@@([A-Z_]+)@@")
+
+
+def compose(template: str) -> str:
+    """Expand every `@@NAME@@` marker; an unknown name is a programming error."""
+    def expand(m: "re.Match[str]") -> str:
+        name = m.group(1)
+        if name not in FRAGMENTS:
+            raise KeyError(f"Unknown prompt fragment @@{name}@@")
+        return FRAGMENTS[name]
+    return _MARKER.sub(expand, template)
+
+
+# ====== Savings report + equivalence check ======
+# get_mode_prompt() output of each prompt at the commit before the fragments existed (ef435b7^)
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "prompt_baseline")
+BASELINE_SHA256: Mapping[str, str] = MappingProxyType({
+    "base": "5bf06c48a4c7de0ff32266d74ea1f209d36ad88dcdf5e318cf107429ea60cc21",
+    "llc": "95bb99f7ccc4c74d7a40f36601843b8dca72acc3fb9ab622eb60eeb2bf95d8f6",
+    "corp": "df51b8b1dbf132cc5f219bed936c7c160f67ec4f134c3f9a3b762519d22fd262",
+    "payment": "9811ad9dca637c7f8d7b0b196f5ea9840c4040ae087c6155435a57bf5085ab26",
+})
+# Reasons in dropped.json: "fragment:<NAME>" (the fragment must be in the prompt), "output_guard"
+# (formatting enforced on every reply) or the server-side feature that replaced the rule
+_FRAGMENT_REASON = "fragment:"
+
+# Rules every assembled prompt must still state (lower-cased substrings).
+# Table / emphasis formatting is enforced by output_guard, not by the prompts
+_COMMON_RULES = (
+    "encrypted, stored securely, and reviewed by certified specialists",
+    "review every detail before filing to ensure full compliance",
+)
+_SNAPSHOT_RULES = ("appends the **snapshot** table", "never write that table yourself", "one `setfields` call")
+_SALES_RULES = ("end-to-end", "will not need to leave this chat", "great progress")
+REQUIRED_RULES: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "base": _COMMON_RULES + _SNAPSHOT_RULES + _SALES_RULES + (BASE_COMPANY_FIELDS.lower(), "legal & security reassurance layer"),
+    "llc": _COMMON_RULES + _SNAPSHOT_RULES + _SALES_RULES + (BASE_COMPANY_FIELDS.lower(), LLC_ONLY_FIELDS.lower()),
+    "corp": _COMMON_RULES + _SNAPSHOT_RULES + _SALES_RULES + (BASE_COMPANY_FIELDS.lower(), CORP_ONLY_FIELDS.lower()),
+    "payment": _COMMON_RULES + (BASE_COMPANY_FIELDS.lower(), LLC_ONLY_FIELDS.lower(), CORP_ONLY_FIELDS.lower(), "we use stripe"),
+})
+# Multi-line blocks that must appear once per prompt at most
+_BLOCKS = ("SINGLE_SNAPSHOT", "REASSURANCE", "SALES_RETENTION")
+
+
+def _prompts() -> Dict[str, Callable[[], str]]:
+    from base_prompt import BasePrompt
+    from corp_prompt import CorpPrompt
+    from llc_prompt import LLCPrompt
+    from payment_prompt import PaymentPrompt
+    return {
+        "base": BasePrompt.get_mode_prompt,
+        "llc": LLCPrompt.get_mode_prompt,
+        "corp": CorpPrompt.get_mode_prompt,
+        "payment": PaymentPrompt.get_mode_prompt,
+    }
+
+
+_ORDINAL = re.compile(r"^\d+\.\s+")
+
+
+def _lines(text: str) -> List[str]:
+    """Non-empty lines, whitespace-normalized; list numbers are dropped so renumbering isn't a change."""
+    return [_ORDINAL.sub("", " ".join(line.split())) for line in text.splitlines() if line.strip()]
+
+
+def baseline_prompt(name: str) -> bytes:
+    with open(os.path.join(BASELINE_DIR, f"{name}.txt"), "rb") as f:
+        return f.read()
+
+
+def _dropped() -> Dict[str, Dict[str, str]]:
+    with open(os.path.join(BASELINE_DIR, "dropped.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_to_baseline(name: str, text: str, dropped: Mapping[str, str]) -> List[str]:
+    """Pre-refactor lines of prompt `name` missing from `text` without a recorded reason, and stale reasons."""
+    problems = []
+    raw = baseline_prompt(name)
+    if hashlib.sha256(raw).hexdigest() != BASELINE_SHA256[name]:
+        return [f"{name}: {BASELINE_DIR}/{name}.txt is not the frozen pre-refactor prompt"]
+    current = set(_lines(text))
+    before = dict.fromkeys(_lines(raw.decode("utf-8")))
+    for line in before:
+        if line not in current and line not in dropped:
+            problems.append(f"{name}: pre-refactor line lost: {line[:100]!r}")
+    for line, reason in dropped.items():
+        if line not in before:
+            problems.append(f"{name}: dropped.json lists a line the baseline does not have: {line[:100]!r}")
+        elif line in current:
+            problems.append(f"{name}: dropped.json lists a line the prompt still has: {line[:100]!r}")
+        elif reason.startswith(_FRAGMENT_REASON):
+            fragment = FRAGMENTS.get(reason[len(_FRAGMENT_REASON):])
+            if fragment is None or fragment not in text:
+                problems.append(f"{name}: {line[:60]!r} was replaced by {reason}, which the prompt no longer includes")
+    return problems
+
+
+def check_equivalence() -> List[str]:
+    """Problems found in the assembled prompts (empty list = every rule survived the composition)."""
+    problems = []
+    dropped = _dropped()
+    for name, build in _prompts().items():
+        text = build()
+        problems += compare_to_baseline(name, text, dropped.get(name, {}))
+        lowered = " ".join(text.lower().split())
+        if _MARKER.search(text):
+            problems.append(f"{name}: unexpanded marker {_MARKER.search(text).group(0)}")
+        for rule in REQUIRED_RULES[name]:
+            if " ".join(rule.split()) not in lowered:
+                problems.append(f"{name}: missing rule {rule!r}")
+        for block in _BLOCKS:
+            if text.count(FRAGMENTS[block]) > 1:
+                problems.append(f"{name}: fragment {block} included more than once")
+    return problems
+
+
+def report() -> str:
+    from token_metrics import TOKENIZER, count_tokens
+    lines = [f"{'prompt':<8} {'bytes before':>12} {'after':>7} {'saved':>7}   {'tokens before':>13} {'after':>6} {'saved':>6}"]
+    total = [0, 0, 0, 0]
+    for name, build in _prompts().items():
+        text = build()
+        before = baseline_prompt(name).decode("utf-8")
+        b_before, t_before = len(before.encode("utf-8")), count_tokens(before)
+        b_after, t_after = len(text.encode("utf-8")), count_tokens(text)
+        total = [total[0] + b_before, total[1] + b_after, total[2] + t_before, total[3] + t_after]
+        lines.append(f"{name:<8} {b_before:>12,} {b_after:>7,} {b_before - b_after:>7,}   "
+                     f"{t_before:>13,} {t_after:>6,} {t_before - t_after:>6,}")
+    lines.append(f"{'total':<8} {total[0]:>12,} {total[1]:>7,} {total[0] - total[1]:>7,}   "
+                 f"{total[2]:>13,} {total[3]:>6,} {total[2] - total[3]:>6,}  (tokenizer: {TOKENIZER})")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(report())
+    issues = check_equivalence()
+    for issue in issues:
+        print("❌", issue)
+    print("✅ equivalence check passed" if not issues else f"{len(issues)} problem(s)")
+    sys.exit(1 if issues else 0)
@@ -0,0 +1,85 @@
+# quote_engine.py
+from typing import Any, Dict, Optional
+
+from payment_service import PaymentService
+from stripe_catalog import PLANS
+
+
+class QuoteEngine:
+    """
+    Deterministic checkout quotes: plan price + state filing fee, in integer cents.
+
+    Public methods used by the app:
+      - get_quote(product_name, billing_cycle, state, entity_type) -> dict
+      - format_usd(cents) -> str
+      - normalize_plan(product_name) -> Optional[str]
+    """
+
+    PLAN_NAMES = ("Classic", "Premium", "Elite")
+
+    @classmethod
+    def get_quote(
+        cls,
+        product_name: str,
+        billing_cycle: Optional[str],
+        state: str,
+        entity_type: str,
+    ) -> Dict[str, Any]:
+        """
+        Returns a dict:
+          {
+            "productName": "Classic", "billingCycle": "yearly",
+            "state": "<Canonical State Name>", "entity_type": "<LLC|C-Corp|S-Corp>",
+            "planPriceCents": int, "stateFilingFeeCents": int, "totalDueNowCents": int,
+            "price": float, "stateFilingFee": float, "totalDueNow": float
+          }
+        or {"error": "..."} on failure.
+        """
+        plan = cls.normalize_plan(product_name)
+        if not plan:
+            return {"error": "unknown_plan", "productName": product_name}
+
+        cycle = (billing_cycle or "").strip().lower() or None
+        if cycle is None:
+            if (plan, "monthly") in PLANS:
+                return {"error": "billing_cycle_required", "productName": plan}
+            cycle = "yearly"
+        plan_cents = PLANS.get((plan, cycle))
+        if plan_cents is None:
+            return {"error": "billing_cycle_unavailable", "productName": plan, "billingCycle": cycle}
+
+        fee = PaymentService.state_fee_lookup(state, entity_type)
+        if "error" in fee:
+            return fee
+        fee_cents = int(fee["stateFilingFeeCents"])
+        total_cents = plan_cents + fee_cents
+
+        quote = {
+            "productName": plan,
+            "billingCycle": cycle,
+            "state": fee["state"],
+            "entity_type": fee["entity_type"],
+            "planPriceCents": plan_cents,
+            "stateFilingFeeCents": fee_cents,
+            "totalDueNowCents": total_cents,
+            "price": plan_cents / 100,
+            "stateFilingFee": fee_cents / 100,
+            "totalDueNow": total_cents / 100,
+        }
+        if "correctedFrom" in fee:
+            quote["correctedFrom"] = fee["correctedFrom"]
+        return quote
+
+    @staticmethod
+    def format_usd(cents: int) -> str:
+        """29900 -> '$299', 123456 -> '$1,234.56'."""
+        dollars, rem = divmod(int(cents), 100)
+        return f"${dollars:,}" if rem == 0 else f"${dollars:,}.{rem:02d}"
+
+    @classmethod
+    def normalize_plan(cls, product_name: Optional[str]) -> Optional[str]:
+        s = (product_name or "").strip().lower().replace(" plan", "")
+        for name in cls.PLAN_NAMES:
+            if s == name.lower():
+                return name
+        return None
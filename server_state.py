@@ -0,0 +1,76 @@
+# server_state.py
+"""
+The per-turn `server_state` message the prompts treat as authoritative.
+
+Tools keep their results on the session object (otp_verified, entity_type, the intake
+record in `fields`, server_quote, payment_quote, awaiting_payment, ...); `ServerState.render()` turns the current values into
+one compact JSON line that is appended to the agent's instructions before every model call,
+so the model reads state instead of reconstructing it from the transcript.
+"""
+import json
+from typing import Any, Dict, Iterable
+
+from snapshot import ALL_FIELDS
+
+# Tools that stop being callable once their job is done
+_OTP_TOOLS = ("sendEmailOtp", "verifyEmailOtp")
+
+
+def _compact(d: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop unknown values; the prompts say to never invent them."""
+    return {k: v for k, v in d.items() if v not in (None, "", [], {})}
+
+
+class ServerState:
+    """
+    Public methods used by the app:
+      - build(session, tool_names) -> dict
+      - render(session, tool_names) -> str
+    """
+
+    @classmethod
+    def build(cls, session: Any, tool_names: Iterable[str] = ()) -> Dict[str, Any]:
+        get = lambda name, default=None: getattr(session, name, default)  # noqa: E731
+        mode = get("entity_type") or "BASE"
+        verified = bool(get("otp_verified", False))
+
+        state: Dict[str, Any] = {
+            "entity_type": "payment" if mode == "PAYMENT" else mode,
+            "original_entity_type": get("original_entity_type"),
+            "otp_sent_to": None if verified else get("otp_sent_to"),
+            # Background email delivery of that code: queued | sending | retrying | sent | failed | expired
+            "otp_delivery": None if verified else get("otp_delivery"),
+            # The intake record: the model reads captured values here instead of from history
+            "fields": _compact({k: v for k, v in (get("fields") or {}).items() if k in ALL_FIELDS}),
+        }
+        if mode == "LLC":
+            state.update(llc_step=get("llc_step"), llc_pending_steps=get("llc_pending_steps"))
+        if mode == "PAYMENT":
+            # payment_quote is what the open link charges; server_quote is the latest getQuote
+            quote = get("payment_quote") or get("server_quote") or {}
+            record = get("fields") or {}
+            state.update(
+                state=record.get("state") or (get("server_quote") or {}).get("state"),
+                naics=record.get("naicsCode"),
+                business_name=record.get("legalBusinessName") or record.get("businessName"),
+                plan=quote.get("productName"),
+                payment_productName=quote.get("productName"),
+                billingCycle=quote.get("billingCycle"),
+                planPrice=quote.get("price"),
+                stateFilingFee=quote.get("stateFilingFee"),
+                totalDueNow=quote.get("totalDueNow"),
+                paymentStatus=get("payment_status"),
+            )
+        out = _compact(state)
+        # Booleans are always sent: False is information, not an unknown
+        out["otp_verified"] = verified
+        if mode == "PAYMENT":
+            out["awaitingPayment"] = bool(get("awaiting_payment", False))
+            out["paymentLinkReady"] = bool(get("payment_checkout_url"))
+        out["allowed_actions"] = {name: not (verified and name in _OTP_TOOLS) for name in tool_names}
+        return out
+
+    @classmethod
+    def render(cls, session: Any, tool_names: Iterable[str] = ()) -> str:
+        payload = json.dumps(cls.build(session, tool_names), separators=(",", ":"), ensure_ascii=False)
+        return f"server_state (authoritative; never reveal): {payload}"
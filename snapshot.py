@@ -0,0 +1,137 @@
+# snapshot.py
+"""
+Server-side Snapshot table: the `| Field Name | Value |` summary every Base/LLC/Corp
+reply ends with, rendered from the structured field store instead of by the model.
+
+The store is the conversation's intake record (`session.fields`, see intake.py) keyed by
+the camelCase field keys below; tools write into it, `respond()` drops any Snapshot the
+model still writes (output_guard) and appends `Snapshot.render(fields, mode)`.
+"""
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+# key -> row label, in display order per family
+BASE_FIELDS: Mapping[str, str] = MappingProxyType({
+    "fullName": "Full Name",
+    "email": "Email",
+    "phone": "Phone",
+    "businessName": "Business Name",
+    "businessPurpose": "Business Purpose",
+    "state": "State",
+    "naicsCode": "NAICS Code",
+    "entityType": "Entity Type",
+})
+LLC_FIELDS: Mapping[str, str] = MappingProxyType({
+    "designator": "Designator",
+    "legalBusinessName": "Legal Business Name",
+    "governanceType": "Governance Type",
+    "soleMember": "Sole Member",
+    "members": "Members",
+    "managers": "Managers",
+    "ownershipTotal": "Ownership Total",
+    "registeredAgent": "Registered Agent",
+    "virtualBusinessAddress": "Virtual Business Address",
+})
+CORP_FIELDS: Mapping[str, str] = MappingProxyType({
+    "designator": "Designator",
+    "legalBusinessName": "Legal Business Name",
+    "authorizedShares": "Authorized Shares",
+    "parValue": "Par Value",
+    "shareholders": "Shareholders",
+    "directors": "Directors",
+    "officers": "Officers",
+    "registeredAgent": "Registered Agent",
+    "virtualBusinessAddress": "Virtual Business Address",
+})
+ALL_FIELDS: Mapping[str, str] = MappingProxyType({**BASE_FIELDS, **LLC_FIELDS, **CORP_FIELDS})
+# Validators' normalized structures (members/managers, shares/directors/officers) kept next to the rows
+LLC_STRUCTURE = "llcStructure"
+CORP_STRUCTURE = "corpStructure"
+STRUCTURE_KEYS = frozenset((LLC_STRUCTURE, CORP_STRUCTURE))
+# Validator `summary` labels -> store keys
+_BY_LABEL: Mapping[str, str] = MappingProxyType({label: key for key, label in ALL_FIELDS.items()})
+
+# Modes the server renders a Snapshot for (Payment keeps its own plan/summary tables)
+RENDERED_MODES = frozenset(("BASE", "LLC", "C-CORP", "S-CORP"))
+
+
+def _structure(mode: Optional[str]) -> Optional[str]:
+    return LLC_STRUCTURE if mode == "LLC" else CORP_STRUCTURE if mode in ("C-CORP", "S-CORP") else None
+
+
+def _family(mode: Optional[str]) -> Mapping[str, str]:
+    if mode == "LLC":
+        return LLC_FIELDS
+    if mode in ("C-CORP", "S-CORP"):
+        return CORP_FIELDS
+    return {}
+
+
+def _cell(value: Any) -> str:
+    """One table cell: a single line, no pipes, lists joined with ` • `."""
+    if isinstance(value, (list, tuple)):
+        value = " • ".join(str(v) for v in value if v not in (None, ""))
+    text = " ".join(str(value).split())
+    return text.replace("|", "/")
+
+
+class Snapshot:
+    """
+    Public methods used by the app:
+      - fields_for(mode) -> dict            # key -> label allowed in that mode
+      - update(store, values) -> (applied, rejected)
+      - from_summary(store, summary, owned) -> list  # validator summary rows -> store
+      - purge(store, mode) -> list           # drop the other entity family's fields
+      - render(store, mode) -> str
+    """
+
+    @staticmethod
+    def fields_for(mode: Optional[str]) -> Dict[str, str]:
+        return {**BASE_FIELDS, **_family(mode)}
+
+    @staticmethod
+    def update(store: Dict[str, Any], values: Mapping[str, Any]) -> Tuple[List[str], List[str]]:
+        """Set (or clear, with an empty value) known fields; unknown keys are returned as rejected."""
+        applied, rejected = [], []
+        for key, value in values.items():
+            if key not in ALL_FIELDS:
+                rejected.append(key)
+                continue
+            if value in (None, "", []):
+                store.pop(key, None)
+            else:
+                store[key] = value
+            applied.append(key)
+        return applied, rejected
+
+    @classmethod
+    def from_summary(cls, store: Dict[str, Any], summary: Mapping[str, str], owned: Tuple[str, ...] = ()) -> List[str]:
+        """
+        Copy a validator's `summary` rows (keyed by row label) into the store. `owned` keys
+        the validator is the source of truth for are cleared when its summary omits them.
+        """
+        values: Dict[str, Any] = {key: None for key in owned}
+        values.update({_BY_LABEL[label]: v for label, v in summary.items() if label in _BY_LABEL})
+        return cls.update(store, values)[0]
+
+    @staticmethod
+    def purge(store: Dict[str, Any], mode: Optional[str]) -> List[str]:
+        """Entity switch: keep Base + Company fields and the new family's fields only."""
+        keep = {**BASE_FIELDS, **_family(mode), _structure(mode): None}
+        dropped = [k for k in store if k not in keep]
+        for key in dropped:
+            del store[key]
+        return dropped
+
+    @classmethod
+    def render(cls, store: Mapping[str, Any], mode: Optional[str]) -> str:
+        """Captured rows only (progressive display), in the mode's order; "" when nothing is captured."""
+        rows = [
+            f"| __{label}__ | {_cell(store[key])} |"
+            for key, label in cls.fields_for(mode).items()
+            if store.get(key) not in (None, "", [])
+        ]
+        if not rows:
+            return ""
+        return "\n".join(["| __Field Name__ | __Value__ |", "| --- | --- |", *rows])
+
@@ -0,0 +1,150 @@
+# state_data.py
+"""
+Immutable state / entity reference data shared by every caller.
+
+Built once at import:
+  - STATES: (USPS code, canonical name) for the 50 states + DC
+  - FEE_MATRIX: dense (state × entity) filing fees in whole USD
+  - ALIAS_INDEX: normalized alias -> state row (codes, names, punctuation-stripped
+    and space-stripped forms, DC variants), so resolution is one dict lookup
+"""
+import re
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+# ====== Entities (column order of FEE_MATRIX) ======
+ENTITY_KEYS: Tuple[str, ...] = ("llc", "s-corp", "c-corp")
+ENTITY_LABELS: Tuple[str, ...] = ("LLC", "S-Corp", "C-Corp")
+
+# ====== States + fees (row order of FEE_MATRIX) ======
+#                code   canonical name      llc  s-corp c-corp
+_ROWS: Tuple[Tuple[str, str, int, int, int], ...] = (
+    ("AL", "Alabama",        200, 208, 208),
+    ("AK", "Alaska",         250, 250, 250),
+    ("AZ", "Arizona",         50,  60,  60),
+    ("AR", "Arkansas",        45,  50,  50),
+    ("CA", "California",      70, 100, 100),
+    ("CO", "Colorado",        50,  50,  50),
+    ("CT", "Connecticut",    120, 250, 250),
+    ("DE", "Delaware",        90,  89,  89),
+    ("FL", "Florida",        125,  70,  70),
+    ("GA", "Georgia",        100, 100, 100),
+    ("HI", "Hawaii",          50,  50,  50),
+    ("ID", "Idaho",          100, 100, 100),
+    ("IL", "Illinois",       150, 150, 150),
+    ("IN", "Indiana",         95,  90,  90),
+    ("IA", "Iowa",            50,  50,  50),
+    ("KS", "Kansas",         160,  90,  90),
+    ("KY", "Kentucky",        40,  50,  50),
+    ("LA", "Louisiana",      100,  75,  75),
+    ("ME", "Maine",          175, 145, 145),
+    ("MD", "Maryland",       150, 120, 120),
+    ("MA", "Massachusetts",  500, 275, 275),
+    ("MI", "Michigan",        50,  60,  60),
+    ("MN", "Minnesota",      155, 135, 135),
+    ("MS", "Mississippi",     50,  50,  50),
+    ("MO", "Missouri",        50,  58,  58),
+    ("MT", "Montana",         35,  70,  70),
+    ("NE", "Nebraska",       100,  60,  60),
+    ("NV", "Nevada",         425, 725, 725),
+    ("NH", "New Hampshire",  100, 100, 100),
+    ("NJ", "New Jersey",     125, 125, 125),
+    ("NM", "New Mexico",      50, 100, 100),
+    ("NY", "New York",       200, 125, 125),
+    ("NC", "North Carolina", 125, 125, 125),
+    ("ND", "North Dakota",   135, 100, 100),
+    ("OH", "Ohio",            99,  99,  99),
+    ("OK", "Oklahoma",       100,  50,  50),
+    ("OR", "Oregon",         100, 100, 100),
+    ("PA", "Pennsylvania",   125, 125, 125),
+    ("RI", "Rhode Island",   150, 230, 230),
+    ("SC", "South Carolina", 110, 125, 125),
+    ("SD", "South Dakota",   150, 150, 150),
+    ("TN", "Tennessee",      300, 100, 100),
+    ("TX", "Texas",          300, 300, 300),
+    ("UT", "Utah",            70,  70,  70),
+    ("VT", "Vermont",        125, 125, 125),
+    ("VA", "Virginia",       100,  25,  25),
+    ("WA", "Washington",     200, 200, 200),
+    ("WV", "West Virginia",  100,  50,  50),
+    ("WI", "Wisconsin",      130, 100, 100),
+    ("WY", "Wyoming",        100, 100, 100),
+    ("DC", "Washington, DC",  99,  99,  99),
+)
+
+STATES: Tuple[Tuple[str, str], ...] = tuple((code, name) for code, name, *_ in _ROWS)
+STATE_NAMES: Tuple[str, ...] = tuple(name for _, name in STATES)
+FEE_MATRIX: Tuple[Tuple[int, ...], ...] = tuple(tuple(row[2:]) for row in _ROWS)
+
+# Read-only dict views for callers that expect the old table shapes
+STATE_CODE_TO_NAME: Mapping[str, str] = MappingProxyType(dict(STATES))
+STATE_FEES: Mapping[str, Mapping[str, int]] = MappingProxyType({
+    name: MappingProxyType(dict(zip(ENTITY_KEYS, FEE_MATRIX[i]))) for i, name in enumerate(STATE_NAMES)
+})
+
+# ====== Alias normalization ======
+_DROP = re.compile(r"[.,'’]")
+_SPACE = re.compile(r"[\s\-_/]+")
+
+
+def alias_key(raw: Optional[str]) -> str:
+    """'  D.C. ' -> 'dc', 'North-Carolina' -> 'north carolina'."""
+    s = _DROP.sub("", (raw or "").lower())
+    return _SPACE.sub(" ", s).strip()
+
+
+def _build_state_index() -> Mapping[str, int]:
+    index = {}
+    for i, (code, name) in enumerate(STATES):
+        key = alias_key(name)
+        for alias in (code, name, key, key.replace(" ", "")):
+            index[alias_key(alias)] = i
+    dc = STATE_NAMES.index("Washington, DC")
+    for alias in ("d c", "washington dc", "washington d c", "district of columbia",
+                  "washington district of columbia", "dist of columbia"):
+        index[alias] = dc
+    return MappingProxyType(index)
+
+
+def _build_entity_index() -> Mapping[str, int]:
+    llc, s_corp, c_corp = (ENTITY_KEYS.index(k) for k in ("llc", "s-corp", "c-corp"))
+    aliases = {
+        "llc": llc, "l l c": llc, "limited liability company": llc,
+        "c corp": c_corp, "ccorp": c_corp, "c corporation": c_corp,
+        "s corp": s_corp, "scorp": s_corp, "s corporation": s_corp,
+        "s ccorp": s_corp, "s c corp": s_corp,
+    }
+    return MappingProxyType(aliases)
+
+
+ALIAS_INDEX: Mapping[str, int] = _build_state_index()
+ENTITY_ALIAS_INDEX: Mapping[str, int] = _build_entity_index()
+
+
+# ====== Lookups (all O(1)) ======
+def state_index(raw: Optional[str]) -> Optional[int]:
+    return ALIAS_INDEX.get(alias_key(raw))
+
+
+def resolve_state(raw: Optional[str]) -> Optional[str]:
+    """'ca' / 'CALIFORNIA' / 'd.c.' -> canonical name, or None."""
+    i = state_index(raw)
+    return None if i is None else STATE_NAMES[i]
+
+
+def entity_index(raw: Optional[str]) -> Optional[int]:
+    return ENTITY_ALIAS_INDEX.get(alias_key(raw))
+
+
+def normalize_entity(raw: Optional[str]) -> Optional[str]:
+    """'c-corp' / 'C corp' / 'S.Corp' -> 'C-Corp' / 'S-Corp'; 'llc' -> 'LLC'; else None."""
+    j = entity_index(raw)
+    return None if j is None else ENTITY_LABELS[j]
+
+
+def filing_fee(state: Optional[str], entity_type: Optional[str]) -> Optional[int]:
+    """Whole-dollar filing fee for any state/entity spelling, or None."""
+    i, j = state_index(state), entity_index(entity_type)
+    if i is None or j is None:
+        return None
+    return FEE_MATRIX[i][j]
@@ -0,0 +1,223 @@
+# state_fuzzy.py
+"""
+Typo-tolerant state resolution on top of state_data's exact alias index.
+
+  match_state("Calfornia")  -> StateMatch("California", 0.9)
+  match_state("N. Carolina") -> StateMatch("North Carolina", 1.0)
+  match_state("wash dc")    -> StateMatch("Washington, DC", 1.0)
+
+Built once at import:
+  - TRIGRAM_INDEX: character trigram -> alias ids (names, space-stripped names, DC variants)
+Lookups: exact alias -> abbreviation expansion -> trigram shortlist ranked by edit distance.
+
+Run `python state_fuzzy.py` for the accuracy / latency benchmark.
+"""
+import heapq
+import time
+from collections import Counter
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from state_data import ALIAS_INDEX, STATE_NAMES, alias_key
+
+# Tools auto-correct at or above this; below it they echo a suggestion instead.
+AUTO_CORRECT_CONFIDENCE = 0.8
+# Candidates (by trigram overlap) that get the edit-distance pass
+_SHORTLIST = 4
+
+# Token abbreviations users type for state names ("N. Carolina", "wash dc", "So Dakota")
+_ABBREVIATIONS: Mapping[str, str] = MappingProxyType({
+    "n": "north", "no": "north", "nth": "north",
+    "s": "south", "so": "south", "sth": "south",
+    "w": "west", "wv": "west virginia",
+    "wash": "washington", "wa": "washington",
+    "dist": "district", "mass": "massachusetts", "penn": "pennsylvania",
+    "calif": "california", "cali": "california",
+})
+
+
+class StateMatch(NamedTuple):
+    name: Optional[str]
+    confidence: float
+
+
+# ====== Index (built once) ======
+def _trigrams(key: str) -> Tuple[str, ...]:
+    padded = f"  {key} "
+    return tuple(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+# Two-letter codes carry no trigram signal; exact lookup already covers them
+_ALIASES: Tuple[str, ...] = tuple(a for a in ALIAS_INDEX if len(a) > 2)
+_ALIAS_STATE: Tuple[int, ...] = tuple(ALIAS_INDEX[a] for a in _ALIASES)
+_ALIAS_GRAMS: Tuple[int, ...] = tuple(len(_trigrams(a)) for a in _ALIASES)
+
+
+def _build_trigram_index() -> Mapping[str, Tuple[int, ...]]:
+    postings: Dict[str, List[int]] = {}
+    for alias_id, alias in enumerate(_ALIASES):
+        for gram in set(_trigrams(alias)):
+            postings.setdefault(gram, []).append(alias_id)
+    return MappingProxyType({gram: tuple(ids) for gram, ids in postings.items()})
+
+
+TRIGRAM_INDEX: Mapping[str, Tuple[int, ...]] = _build_trigram_index()
+
+
+# ====== Scoring ======
+def _char_masks(pattern: str) -> Dict[str, int]:
+    masks: Dict[str, int] = {}
+    for i, ch in enumerate(pattern):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    return masks
+
+
+def edit_distance(a: str, b: str, masks: Optional[Dict[str, int]] = None) -> int:
+    """
+    Levenshtein distance with adjacent transpositions ('texsa' -> 'texas' is 1).
+    Bit-parallel (Hyyrö): one pass over `b` with `a` packed into an int, so the cost
+    is O(len(b)) big-int ops instead of an O(len(a)·len(b)) table. Pass `masks`
+    (from _char_masks(a)) to reuse them across many `b`.
+    """
+    m = len(a)
+    if m == 0:
+        return len(b)
+    if masks is None:
+        masks = _char_masks(a)
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    vp, vn, d0, pm_prev, dist = full, 0, 0, 0, m
+    for ch in b:
+        pm = masks.get(ch, 0)
+        tr = (((~d0) & pm) << 1) & pm_prev
+        d0 = ((((pm & vp) + vp) ^ vp) | pm | vn | tr) & full
+        hp = (vn | ~(d0 | vp)) & full
+        hn = d0 & vp
+        if hp & last:
+            dist += 1
+        elif hn & last:
+            dist -= 1
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = (hn | ~(d0 | hp)) & full
+        vn = hp & d0
+        pm_prev = pm
+    return dist
+
+
+def _expand(key: str) -> str:
+    return " ".join(_ABBREVIATIONS.get(tok, tok) for tok in key.split(" "))
+
+
+def _match(raw: Optional[str]) -> StateMatch:
+    key = alias_key(raw)
+    if not key:
+        return StateMatch(None, 0.0)
+
+    # 1) Exact alias, then exact after abbreviation expansion
+    for candidate in (key, _expand(key)):
+        i = ALIAS_INDEX.get(candidate)
+        if i is not None:
+            return StateMatch(STATE_NAMES[i], 1.0)
+
+    query = _expand(key)
+    grams = _trigrams(query)
+    if len(query) < 3:
+        return StateMatch(None, 0.0)
+
+    # 2) Shortlist by Dice overlap of trigram sets
+    shared: Counter = Counter()
+    for gram in set(grams):
+        shared.update(TRIGRAM_INDEX.get(gram, ()))
+    if not shared:
+        return StateMatch(None, 0.0)
+    n = len(grams)
+    shortlist = heapq.nlargest(_SHORTLIST, shared, key=lambda a: 2 * shared[a] / (n + _ALIAS_GRAMS[a]))
+
+    # 3) Rank the shortlist by normalized edit distance
+    masks = _char_masks(query)
+    best_state, best_conf = None, 0.0
+    for alias_id in shortlist:
+        alias = _ALIASES[alias_id]
+        conf = 1.0 - edit_distance(query, alias, masks) / max(len(query), len(alias))
+        if conf > best_conf:
+            best_state, best_conf = _ALIAS_STATE[alias_id], conf
+    if best_state is None:
+        return StateMatch(None, 0.0)
+    return StateMatch(STATE_NAMES[best_state], round(best_conf, 3))
+
+
+@lru_cache(maxsize=2048)
+def match_state(raw: Optional[str]) -> StateMatch:
+    """Best canonical state for any spelling, with a 0..1 confidence (1.0 = exact alias)."""
+    return _match(raw)
+
+
+def correct_state(raw: Optional[str]) -> Optional[str]:
+    """Canonical name when the match is confident enough to auto-correct, else None."""
+    m = match_state(raw)
+    return m.name if m.confidence >= AUTO_CORRECT_CONFIDENCE else None
+
+
+# ====== Benchmark ======
+def _noisy_corpus() -> List[Tuple[str, str]]:
+    corpus: List[Tuple[str, str]] = []
+    for name in STATE_NAMES:
+        s = name.replace(",", "")
+        mid = len(s) // 2
+        corpus += [
+            (s.upper(), name),
+            (s[:mid] + s[mid + 1:], name),                              # deletion
+            (s[:mid] + s[mid + 1] + s[mid] + s[mid + 2:], name),        # transposition
+            (s[:mid] + ("x" if s[mid] != "x" else "z") + s[mid + 1:], name),  # substitution
+            (s[:mid] + s[mid] + s[mid:], name),                         # doubled letter
+        ]
+    corpus += [
+        ("Calfornia", "California"), ("N. Carolina", "North Carolina"), ("wash dc", "Washington, DC"),
+        ("S Dakota", "South Dakota"), ("W. Virginia", "West Virginia"), ("Masachusets", "Massachusetts"),
+        ("Pensylvania", "Pennsylvania"), ("Conneticut", "Connecticut"), ("Mississipi", "Mississippi"),
+        ("Tennesee", "Tennessee"), ("Lousiana", "Louisiana"), ("Arizonia", "Arizona"),
+        ("newyork", "New York"), ("new-jersy", "New Jersey"), ("District of Colombia", "Washington, DC"),
+        ("Floride", "Florida"), ("Texsa", "Texas"), ("Deleware", "Delaware"),
+    ]
+    return corpus
+
+
+def benchmark(rounds: int = 20) -> Dict[str, float]:
+    corpus = _noisy_corpus()
+    correct = auto = wrong_auto = 0
+    for raw, expected in corpus:
+        m = _match(raw)
+        correct += m.name == expected
+        if m.confidence >= AUTO_CORRECT_CONFIDENCE:
+            auto += 1
+            wrong_auto += m.name != expected
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for raw, _expected in corpus:
+            _match(raw)
+    elapsed = time.perf_counter() - start
+
+    match_state.cache_clear()
+    for raw, _expected in corpus:
+        match_state(raw)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for raw, _expected in corpus:
+            match_state(raw)
+    cached = time.perf_counter() - start
+    return {
+        "inputs": len(corpus),
+        "top1_accuracy": correct / len(corpus),
+        "auto_corrected": auto / len(corpus),
+        "wrong_auto_corrections": wrong_auto,
+        "us_per_lookup_uncached": elapsed / (rounds * len(corpus)) * 1e6,
+        "us_per_lookup_cached": cached / (rounds * len(corpus)) * 1e6,
+    }
+
+
+if __name__ == "__main__":
+    for k, v in benchmark().items():
+        print(f"{k:>24}: {v:.3f}" if isinstance(v, float) else f"{k:>24}: {v}")
@@ -0,0 +1,162 @@
+# stripe_catalog.py
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+# Stripe is optional at import-time so local dev won't crash if it's missing.
+try:
+    import stripe  # pip install stripe
+except Exception:  # pragma: no cover
+    stripe = None
+
+
+# Fixed plan prices (USD cents) — must match the plan table in payment_prompt.py.
+# Classic/Premium are yearly-only; Elite offers yearly or monthly.
+PLANS: Dict[Tuple[str, str], int] = {
+    ("Classic", "yearly"): 29900,
+    ("Premium", "yearly"): 149900,
+    ("Elite", "yearly"): 508900,
+    ("Elite", "monthly"): 49900,
+}
+
+# Version stamp: changes whenever a plan amount changes, which forces a re-sync
+# and new lookup keys (Stripe Prices are immutable once created).
+CATALOG_VERSION = "v1-" + hashlib.sha256(
+    json.dumps(sorted((f"{p}|{c}", cents) for (p, c), cents in PLANS.items())).encode("utf-8")
+).hexdigest()[:8]
+
+
+def plan_key(product_name: str, billing_cycle: Optional[str]) -> str:
+    """'Elite', 'monthly' -> 'Elite|monthly'. Missing cycle means yearly."""
+    return f"{product_name}|{billing_cycle or 'yearly'}"
+
+
+class StripeCatalog:
+    """
+    Creates or looks up Stripe Products/Prices for the fixed plans once (at startup)
+    and caches their ids locally with a version stamp.
+
+    Public methods used by the app:
+      - sync() -> bool
+      - price_id(product_name, billing_cycle, unit_amount_cents) -> Optional[str]
+    """
+
+    def __init__(self, cache_path: Optional[str] = None) -> None:
+        # You can override with STRIPE_CATALOG_PATH env var
+        self._cache_path = cache_path or os.getenv("STRIPE_CATALOG_PATH", "stripe_catalog.json")
+        self._prices: Dict[str, str] = {}
+
+    # ====== Public: Sync catalog (cache hit = no API calls) ======
+    def sync(self) -> bool:
+        account = self._account_fingerprint()
+        if account is None:
+            print("[StripeCatalog] ⚠️ Stripe not configured; checkout will use inline price_data")
+            return False
+
+        cached = self._load_cache()
+        if (
+            cached.get("version") == CATALOG_VERSION
+            and cached.get("account") == account
+            and all(plan_key(p, c) in cached.get("prices", {}) for p, c in PLANS)
+        ):
+            self._prices = dict(cached["prices"])
+            print(f"[StripeCatalog] ✅ Using cached catalog {CATALOG_VERSION} ({len(self._prices)} prices)")
+            return True
+
+        try:
+            prices = {plan_key(p, c): self._ensure_price(p, c, cents) for (p, c), cents in PLANS.items()}
+        except Exception as e:
+            print(f"[StripeCatalog] ⚠️ Catalog sync failed (non-fatal): {e}")
+            return False
+
+        self._prices = prices
+        self._save_cache({
+            "version": CATALOG_VERSION,
+            "account": account,
+            "synced_at": int(time.time()),
+            "prices": prices,
+        })
+        print(f"[StripeCatalog] 🔄 Synced catalog {CATALOG_VERSION} ({len(prices)} prices)")
+        return True
+
+    # ====== Public: Resolve a plan to its pre-provisioned price id ======
+    def price_id(self, product_name: str, billing_cycle: Optional[str], unit_amount_cents: int) -> Optional[str]:
+        """Returns the catalog price id, or None when the amount is not the catalog amount."""
+        cycle = billing_cycle or "yearly"
+        if PLANS.get((product_name, cycle)) != unit_amount_cents:
+            return None
+        return self._prices.get(plan_key(product_name, cycle))
+
+    # ====== Internals: Stripe lookups ======
+    @staticmethod
+    def _lookup_key(product_name: str, billing_cycle: str) -> str:
+        return f"incubation_{product_name.lower()}_{billing_cycle}_{CATALOG_VERSION}"
+
+    def _account_fingerprint(self) -> Optional[str]:
+        if stripe is None:
+            return None
+        secret = os.getenv("STRIPE_SECRET_KEY", "")
+        if not secret:
+            return None
+        stripe.api_key = secret
+        # Test and live keys (or different accounts) must never share cached ids.
+        return hashlib.sha256(secret.encode("utf-8")).hexdigest()[:12]
+
+    def _ensure_price(self, product_name: str, billing_cycle: str, unit_amount_cents: int) -> str:
+        lookup_key = self._lookup_key(product_name, billing_cycle)
+        found = stripe.Price.list(lookup_keys=[lookup_key], active=True, limit=1)
+        if found.data:
+            return found.data[0].id
+
+        product_id = f"incubation_{product_name.lower()}_{billing_cycle}"
+        try:
+            stripe.Product.retrieve(product_id)
+        except Exception:
+            stripe.Product.create(
+                id=product_id,
+                name=f"{product_name} Plan — {billing_cycle}",
+                metadata={"productName": product_name, "billingCycle": billing_cycle},
+            )
+
+        price = stripe.Price.create(
+            product=product_id,
+            currency="usd",
+            unit_amount=unit_amount_cents,
+            lookup_key=lookup_key,
+            metadata={"catalogVersion": CATALOG_VERSION},
+        )
+        return price.id
+
+    # ====== Internals: Local cache ======
+    def _load_cache(self) -> Dict:
+        try:
+            with open(self._cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save_cache(self, data: Dict) -> None:
+        try:
+            with open(self._cache_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, sort_keys=True)
+        except Exception as e:
+            print(f"[StripeCatalog] ⚠️ Failed to save catalog cache {self._cache_path}: {e}")
+
+
+class LocalCatalog(StripeCatalog):
+    """
+    Offline stand-in for tests/local dev: same interface, deterministic fake ids,
+    no Stripe SDK, network or cache file required.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(cache_path=os.devnull)
+
+    def sync(self) -> bool:
+        self._prices = {
+            plan_key(p, c): f"price_local_{p.lower()}_{c}_{CATALOG_VERSION}"
+            for p, c in PLANS
+        }
+        return True
@@ -0,0 +1,32 @@
+import pytest
+
+from address_normalizer import AddressNormalizer
+
+
+@pytest.mark.parametrize("address", [
+    "1 Main St Washington DC 20001",
+    "1 Main St, Washington DC 20001",
+    "1 Main St, Washington, DC 20001",
+])
+def test_washington_dc_keeps_the_city(address):
+    result = AddressNormalizer.normalize(address)
+    assert result["valid"], result["errors"]
+    assert result["normalized"] == "1 MAIN ST, WASHINGTON, DC 20001"
+
+
+@pytest.mark.parametrize("address", [
+    "PO Box 12, Dover DE 19901",
+    "P.O. Box 5, Austin TX 78701",
+    "POB 12, Austin TX 78701",
+    "P.O.B. 12, Austin TX 78701",
+    "Post Office Box 3, Austin TX 78701",
+])
+def test_po_boxes_are_rejected(address):
+    codes = [e["code"] for e in AddressNormalizer.normalize(address)["errors"]]
+    assert "po_box_not_allowed" in codes
+
+
+def test_street_named_pob_is_not_a_po_box():
+    result = AddressNormalizer.normalize("123 Pob Rd, Austin, TX 78701")
+    assert result["valid"], result["errors"]
+    assert result["normalized"] == "123 POB RD, AUSTIN, TX 78701"
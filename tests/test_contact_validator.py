@@ -0,0 +1,41 @@
+import pytest
+
+from contact_validator import ContactValidator
+
+
+@pytest.mark.parametrize("message", [
+    "Sounds good, my email is jane@x.com",
+    "Oops typo, it is jane@x.com",
+    "sounds good, jane@x.com",
+    "Please send to jane@x.com",
+    "i'm really sorry about that, jane@x.com",
+])
+def test_chat_filler_is_not_a_name(message):
+    found = ContactValidator.extract(message)
+    assert found["fullName"] is None
+    assert found["email"] == "jane@x.com"
+
+
+@pytest.mark.parametrize("message, name", [
+    ("Jane Doe, jane@x.com, 555-123-4567", "Jane Doe"),
+    ("jane doe, jane@x.com", "Jane Doe"),
+    ("I'm Jane Doe, jane@x.com", "Jane Doe"),
+    ("my name is Jane Doe and my email is jane@x.com", "Jane Doe"),
+    ("Full name: JOHN SMITH, email john@x.com", "John Smith"),
+])
+def test_names_next_to_contact_fields(message, name):
+    assert ContactValidator.extract(message)["fullName"] == name
+
+
+def test_name_on_file_is_only_replaced_by_a_labeled_name():
+    # guess_name=False is what the app passes once a fullName is recorded
+    assert ContactValidator.extract("Jane Roe, jane@x.com", guess_name=False)["fullName"] is None
+    assert ContactValidator.extract("I'm Jane Roe, jane@x.com", guess_name=False)["fullName"] is None
+    found = ContactValidator.extract("Sorry, my name is Jane Roe", guess_name=False)
+    assert found["fullName"] == "Jane Roe"
+
+
+def test_extract_phone_and_email():
+    found = ContactValidator.extract("reach me at (555) 123-4567 or Jane.Doe@Example.COM")
+    assert found["phone"] == "5551234567"
+    assert ContactValidator.normalize_email(found["email"]) == "Jane.Doe@example.com"
@@ -0,0 +1,89 @@
+from corp_structure import CorpStructureValidator
+
+ADDRESS = "1 Main St, Dover, DE 19901"
+
+
+def codes(result):
+    return [e["code"] for e in result["errors"]]
+
+
+def test_complete_structure_is_normalized():
+    result = CorpStructureValidator.validate({
+        "designator": "inc",
+        "authorizedShares": "1,500",
+        "parValue": "$0.01",
+        "shareholders": [
+            {"name": "Jane Doe", "address": ADDRESS, "percent": "60"},
+            {"name": "John Roe", "address": ADDRESS, "shares": 600},
+        ],
+        "directors": [{"name": "Jane Doe"}],
+        "officers": [
+            {"role": "CEO", "name": "Jane Doe"},
+            {"role": "cfo", "name": "John Roe"},
+            {"role": "Secretary", "name": "John Roe"},
+        ],
+    })
+    assert result["valid"] and result["complete"], result["errors"]
+    norm = result["normalized"]
+    assert norm["designator"] == "Inc." and norm["authorizedShares"] == 1500 and norm["parValue"] == "0.01"
+    # Percentages become whole share counts and shares get their percentage
+    assert [(s["shares"], s["percent"]) for s in norm["shareholders"]] == [(900, "60"), (600, "40")]
+    # A director without an address reuses their shareholder address, with a warning
+    assert norm["directors"][0]["address"] == "1 MAIN ST, DOVER, DE 19901"
+    assert [w["code"] for w in result["warnings"]] == ["director_address_reused"]
+    assert result["summary"]["Officers"] == "President/CEO: Jane Doe • Treasurer/CFO: John Roe • Secretary: John Roe"
+
+
+def test_nothing_captured_is_missing_not_invalid():
+    result = CorpStructureValidator.validate({})
+    assert result["valid"] and not result["complete"]
+    assert result["missing"] == [
+        "designator", "authorizedShares", "parValue", "shareholders", "directors",
+        "officers.President/CEO", "officers.Treasurer/CFO", "officers.Secretary",
+    ]
+
+
+def test_issued_shares_must_equal_authorized_shares():
+    result = CorpStructureValidator.validate({
+        "authorizedShares": 1000, "shareholders": [{"name": "Jane Doe", "address": ADDRESS, "shares": 100}],
+    })
+    assert codes(result) == ["shares_total_mismatch"]
+    assert "short by 900" in result["errors"][0]["message"]
+
+
+def test_percent_must_give_whole_shares():
+    result = CorpStructureValidator.validate({
+        "authorizedShares": 1000, "shareholders": [
+            {"name": "Jane Doe", "address": ADDRESS, "percent": "33.33"},
+            {"name": "John Roe", "address": ADDRESS, "percent": "66.67"},
+        ],
+    })
+    assert codes(result) == ["percent_not_whole_shares"]
+
+
+def test_more_than_three_shareholders():
+    rows = [{"name": n, "address": ADDRESS, "percent": p} for n, p in (("A B", 50), ("C D", 50), ("E F", 10), ("G H", 1))]
+    result = CorpStructureValidator.validate({"entityType": "S-Corp", "totalShareholders": 101, "shareholders": rows})
+    assert codes(result) == ["shareholders_over_limit", "s_corp_shareholder_limit", "percent_total_mismatch"]
+    assert len(result["normalized"]["shareholders"]) == 3
+
+
+def test_invalid_values():
+    result = CorpStructureValidator.validate({
+        "designator": "LLC", "parValue": 0, "authorizedShares": -1,
+        "shareholders": [{"name": "A B", "address": "PO Box 1, Dover DE 19901", "shares": 5}],
+        "officers": [{"role": "Chairman", "name": "X Y"}, {"role": "CEO", "name": "A B"}, {"role": "President", "name": "C D"}],
+    })
+    assert codes(result) == [
+        "designator_invalid", "authorized_shares_invalid", "par_value_invalid", "po_box_not_allowed",
+        "officer_role_unknown", "officer_role_duplicate",
+    ]
+
+
+def test_duplicates_are_rejected():
+    result = CorpStructureValidator.validate({
+        "shareholders": [{"name": "Jane Doe", "address": ADDRESS, "shares": 1}, {"name": "jane  doe", "address": ADDRESS, "shares": 1}],
+        "directors": [{"name": "Jane Doe"}, {"name": "JANE DOE"}],
+    })
+    assert "shareholder_duplicate" in codes(result)
+    assert "director_duplicate" in codes(result)
@@ -0,0 +1,149 @@
+import json
+import threading
+import time
+
+import pytest
+
+from email_outbox import EXPIRED, FAILED, QUEUED, RETRYING, SENDING, SENT, EmailOutbox, PermanentEmailError
+
+
+def wait_for(predicate, timeout=3.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def pending(message_id, status=QUEUED, attempts=0, **extra):
+    msg = {
+        "id": message_id, "key": f"conv_{message_id}", "to": "jane@x.com", "subject": "Code",
+        "text": "code 123456", "html": "<b>123456</b>", "status": status, "attempts": attempts,
+        "created_at": 0, "expires_at": None, "next_attempt_at": 0, "sent_at": None, "last_error": None,
+    }
+    msg.update(extra)
+    return msg
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "outbox.json")
+
+
+def saved(path):
+    with open(path, encoding="utf-8") as f:
+        return {m["id"]: m for m in json.load(f)}
+
+
+def saved_status(path, message_id):
+    try:
+        return saved(path).get(message_id, {}).get("status")
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def test_queued_sending_sent_and_bodies_dropped(path):
+    seen = []
+    outbox = EmailOutbox(lambda m: seen.append((m["text"], outbox.status(m["id"])["status"])), path=path, workers=1)
+    msg = outbox.enqueue("jane@x.com", "Code", "code 123456", "<b>123456</b>", key="conv_a")
+    assert msg["status"] == QUEUED and "text" not in msg
+    assert wait_for(lambda: outbox.status(msg["id"])["status"] == SENT)
+    outbox.stop()
+
+    assert seen == [("code 123456", SENDING)]
+    record = saved(path)[msg["id"]]
+    assert record["status"] == SENT and record["attempts"] == 1
+    assert "text" not in record and "html" not in record
+
+
+def test_pending_bodies_stay_on_disk_until_final(path):
+    release = threading.Event()
+    outbox = EmailOutbox(lambda m: release.wait(2), path=path, workers=1)
+    msg = outbox.enqueue("jane@x.com", "Code", "code 123456", "<b>123456</b>")
+    assert wait_for(lambda: saved_status(path, msg["id"]) == SENDING)
+    assert saved(path)[msg["id"]]["text"] == "code 123456"
+    release.set()
+    outbox.stop()
+    assert "text" not in saved(path)[msg["id"]]
+
+
+def test_transient_error_retries_then_sends(path):
+    attempts = []
+
+    def deliver(m):
+        attempts.append(m["attempts"])
+        if len(attempts) == 1:
+            raise ConnectionError("timeout")
+
+    outbox = EmailOutbox(deliver, path=path, workers=1)
+    outbox.BACKOFF_SCHEDULE = (0.3,)
+    msg = outbox.enqueue("jane@x.com", "Code", "t", "h")
+    assert wait_for(lambda: outbox.status(msg["id"])["status"] == RETRYING)
+    assert outbox.status(msg["id"])["last_error"] == "timeout"
+    assert wait_for(lambda: outbox.status(msg["id"])["status"] == SENT)
+    outbox.stop()
+    assert attempts == [1, 2]
+
+
+def test_permanent_error_fails_without_retry(path):
+    def deliver(m):
+        raise PermanentEmailError("sender not verified")
+
+    outbox = EmailOutbox(deliver, path=path, workers=1)
+    msg = outbox.enqueue("jane@x.com", "Code", "t", "h")
+    assert wait_for(lambda: outbox.status(msg["id"])["status"] == FAILED)
+    outbox.stop()
+    record = saved(path)[msg["id"]]
+    assert record["attempts"] == 1 and record["last_error"] == "sender not verified"
+    assert "text" not in record
+
+
+def test_fails_once_retries_are_exhausted(path):
+    def deliver(m):
+        raise ConnectionError("down")
+
+    outbox = EmailOutbox(deliver, path=path, workers=1)
+    outbox.BACKOFF_SCHEDULE = (0, 0)
+    msg = outbox.enqueue("jane@x.com", "Code", "t", "h")
+    assert wait_for(lambda: outbox.status(msg["id"])["status"] == FAILED)
+    outbox.stop()
+    assert outbox.status(msg["id"])["attempts"] == 3
+
+
+def test_expired_before_delivery(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([pending("late", expires_at=500)], f)
+    delivered = []
+    outbox = EmailOutbox(delivered.append, path=path, workers=1, clock=lambda: 1000.0)
+    outbox.start()
+    assert wait_for(lambda: outbox.status("late")["status"] == EXPIRED)
+    outbox.stop()
+    assert delivered == []
+    assert "text" not in saved(path)["late"]
+
+
+def test_start_resumes_pending_mail(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([pending("queued"), pending("cut_off", status=SENDING, attempts=1), pending("done", status=SENT)], f)
+    delivered = []
+    outbox = EmailOutbox(lambda m: delivered.append((m["id"], m["attempts"])), path=path, workers=1)
+    outbox.start()
+    assert wait_for(lambda: len(delivered) == 2)
+    outbox.stop()
+    assert sorted(delivered) == [("cut_off", 2), ("queued", 1)]
+    assert {m["status"] for m in saved(path).values()} == {SENT}
+
+
+def test_start_expires_mail_that_is_no_longer_live(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([pending("lost"), pending("kept")], f)
+    delivered = []
+    outbox = EmailOutbox(
+        lambda m: delivered.append(m["id"]), path=path, workers=1, is_live=lambda m: m["id"] == "kept"
+    )
+    outbox.start()
+    assert wait_for(lambda: delivered == ["kept"])
+    outbox.stop()
+    lost = saved(path)["lost"]
+    assert lost["status"] == EXPIRED and "text" not in lost
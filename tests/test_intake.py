@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+
+from intake import IntakeRecord, IntakeStore, session_key
+
+
+def _sdk_session(conversation_id=None):
+    # What OpenAIConversationsSession holds: the conversation id in `_session_id`, no `conversation_id`
+    return SimpleNamespace(_session_id=conversation_id)
+
+
+def test_record_round_trips_through_a_new_session(tmp_path):
+    path = str(tmp_path / "intake_records.json")
+    first = _sdk_session("conv_123")
+    record = {}
+    out = IntakeRecord.apply(record, {"fullName": "jane carter", "state": "wyoming", "businessName": "Carter Ceramics"})
+    assert not out["errors"]
+    IntakeStore(path).save(session_key(first), record)
+
+    # A fresh store (restart) and a fresh session object for the same conversation
+    resumed = _sdk_session("conv_123")
+    assert IntakeStore(path).get(session_key(resumed)) == record
+    assert resumed.conversation_id == "conv_123"
+
+
+def test_session_key_prefers_explicit_conversation_id():
+    session = SimpleNamespace(_session_id="conv_sdk", conversation_id="conv_app")
+    assert session_key(session) == "conv_app"
+    assert session_key(None) is None
+
+
+def test_store_without_key_is_a_no_op(tmp_path):
+    path = str(tmp_path / "intake_records.json")
+    IntakeStore(path).save(session_key(_sdk_session()), {"fullName": "Jane Carter"})
+    assert IntakeStore(path).get(None) == {}
+    assert not (tmp_path / "intake_records.json").exists()
+
+
+def test_registered_agent_rejects_po_box():
+    record = {}
+    out = IntakeRecord.apply(record, {"registeredAgent": "PO Box 12, Dover DE 19901"})
+    assert [e["code"] for e in out["errors"]] == ["po_box_not_allowed"]
+    assert "registeredAgent" not in record
+
+
+def test_registered_agent_address_is_normalized():
+    record = {}
+    out = IntakeRecord.apply(record, {
+        "registeredAgent": "Acme Agents, 8 The Green, Dover, DE 19901",
+        "virtualBusinessAddress": "Incubation.AI virtual address",
+    })
+    assert not out["errors"]
+    assert record["registeredAgent"] == "Acme Agents, 8 THE GREEN, DOVER, DE 19901"
+    assert record["virtualBusinessAddress"] == "Incubation.AI virtual address"
+
+
+def test_naics_code_outside_the_catalog_is_kept_with_a_warning():
+    from naics_index import NaicsIndex
+
+    index = NaicsIndex()
+    record = {}
+    out = IntakeRecord.apply(record, {"naicsCode": "459991"}, naics_lookup=index.lookup)
+    assert not out["errors"]
+    assert [w["code"] for w in out["warnings"]] == ["naics_unknown"]
+    assert record["naicsCode"] == "459991"
+
+    out = IntakeRecord.apply(record, {"naicsCode": "cannabis"}, naics_lookup=index.lookup)
+    assert [e["code"] for e in out["errors"]] == ["naics_invalid"]
+
+
+def test_apply_normalizes_and_keeps_rejected_values_out():
+    record = {"email": "old@x.com", "businessName": "Carter Ceramics", "designator": "LLC"}
+    out = IntakeRecord.apply(record, {
+        "fullName": "JANE CARTER",
+        "email": "not-an-email",
+        "phone": "(555) 123-4567",
+        "state": "Calfornia",
+        "businessPurpose": None,
+        "businessName": "",
+        "designator": "Inc.",
+    })
+    assert out["applied"] == {"fullName": "Jane Carter", "phone": "5551234567", "state": "California"}
+    assert out["cleared"] == ["businessName"]
+    assert [e["code"] for e in out["errors"]] == ["email_invalid"]
+    assert [w["code"] for w in out["warnings"]] == ["state_corrected"]
+    assert out["rejected"] == ["designator"]
+    # An invalid value never overwrites the recorded one; tool-owned rows are untouched
+    assert record == {
+        "email": "old@x.com", "designator": "LLC", "fullName": "Jane Carter", "phone": "5551234567", "state": "California",
+    }
+
+
+def test_unknown_state_suggests_the_closest_one():
+    out = IntakeRecord.apply({}, {"state": "Narnia"})
+    assert out["errors"][0]["code"] == "state_invalid"
+    assert "Did you mean" in out["errors"][0]["message"]
+
+
+def test_naics_code_is_recorded_with_its_title():
+    from naics_index import NaicsIndex
+
+    record = {}
+    IntakeRecord.apply(record, {"naicsCode": "541511"}, naics_lookup=NaicsIndex().lookup)
+    assert record["naicsCode"].startswith("541511 - Custom Computer Programming Services — ")
+
+
+def test_missing_lists_the_modes_empty_fields():
+    record = {"fullName": "Jane Carter", "email": "jane@x.com"}
+    assert IntakeRecord.missing(record, None)[:2] == ["phone", "businessName"]
+    assert "governanceType" in IntakeRecord.missing(record, "LLC")
+    assert "governanceType" not in IntakeRecord.missing(record, "C-CORP")
@@ -0,0 +1,86 @@
+from llc_members import LlcMembersValidator
+
+ADDRESS = "1 Main St, Dover, DE 19901"
+
+
+def codes(result):
+    return [e["code"] for e in result["errors"]]
+
+
+def test_manager_managed_llc_is_complete():
+    result = LlcMembersValidator.validate({
+        "governanceType": "manager managed",
+        "soleMember": "no",
+        "members": [{"name": "Jane Doe", "address": ADDRESS, "percent": "60%"}, {"name": "John Roe", "address": ADDRESS, "percent": 40}],
+        "managers": [{"name": "jane doe", "address": ADDRESS}],
+    })
+    assert result["valid"] and result["complete"], (result["errors"], result["missing"])
+    assert result["ownershipTotal"] == "100"
+    assert result["normalized"]["managers"][0]["isMember"] is True
+    assert result["summary"]["Governance Type"] == "Manager-Managed"
+    assert result["summary"]["Ownership Total"] == "100%"
+
+
+def test_sole_member_owns_everything():
+    result = LlcMembersValidator.validate({
+        "governanceType": "Member-Managed", "soleMember": True, "members": [{"name": "Jane Doe", "address": ADDRESS}],
+    })
+    assert result["complete"]
+    assert result["normalized"]["members"][0]["percent"] == "100"
+    assert result["summary"]["Sole Member"] == "Yes"
+
+
+def test_sole_member_contradictions():
+    result = LlcMembersValidator.validate({
+        "soleMember": "yes", "members": [{"name": "Jane Doe", "percent": 50}, {"name": "John Roe", "percent": 50}],
+    })
+    assert "sole_member_contradiction" in codes(result)
+    result = LlcMembersValidator.validate({"soleMember": "yes", "members": [{"name": "Jane Doe", "percent": 80}]})
+    assert codes(result) == ["sole_member_percent"]
+
+
+def test_ownership_must_total_100():
+    result = LlcMembersValidator.validate({
+        "members": [{"name": "Jane Doe", "percent": 50}, {"name": "John Roe", "percent": "16.67"}],
+    })
+    assert codes(result) == ["ownership_total_mismatch"]
+    assert result["ownershipTotal"] == "66.67"
+    assert "66.67% of 100%" in result["errors"][0]["message"]
+
+
+def test_incomplete_split_is_missing_not_a_mismatch():
+    result = LlcMembersValidator.validate({"members": [{"name": "Jane Doe", "percent": 50}, {"name": "John Roe"}]})
+    assert result["valid"]
+    assert "members[1].percent" in result["missing"]
+    assert "members[0].address" in result["missing"]
+
+
+def test_member_and_manager_limits():
+    members = [{"name": n, "address": ADDRESS, "percent": 25} for n in ("A B", "C D", "E F", "G H")]
+    managers = [{"name": n, "address": ADDRESS} for n in ("A B", "C D", "E F", "G H")]
+    result = LlcMembersValidator.validate({"governanceType": "Manager-Managed", "members": members, "managers": managers})
+    assert "members_over_limit" in codes(result)
+    assert "managers_over_limit" in codes(result)
+    assert len(result["normalized"]["members"]) == 3
+    assert len(result["normalized"]["managers"]) == 3
+
+
+def test_member_managed_llc_has_no_managers():
+    result = LlcMembersValidator.validate({"governanceType": "member", "managers": [{"name": "Jane Doe"}]})
+    assert codes(result) == ["managers_not_allowed"]
+
+
+def test_manager_cannot_own_with_a_sole_member():
+    result = LlcMembersValidator.validate({
+        "governanceType": "Manager-Managed", "soleMember": "yes",
+        "members": [{"name": "Jane Doe", "address": ADDRESS}],
+        "managers": [{"name": "John Roe", "address": ADDRESS, "isMember": "yes"}],
+    })
+    assert codes(result) == ["manager_member_sole"]
+
+
+def test_invalid_values():
+    result = LlcMembersValidator.validate({
+        "governanceType": "board", "members": [{"name": "Jane Doe", "percent": "half"}, {"name": "jane doe", "percent": 50}],
+    })
+    assert codes(result) == ["governance_invalid", "percent_invalid", "member_duplicate"]
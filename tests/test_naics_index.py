@@ -0,0 +1,52 @@
+import pytest
+
+from naics_index import NaicsIndex, tokenize
+
+
+@pytest.fixture(scope="module")
+def index():
+    return NaicsIndex()
+
+
+@pytest.mark.parametrize("query, code", [
+    ("bakery", "311812"),
+    ("software development", "541511"),
+    ("dog grooming", "812910"),
+])
+def test_search_ranks_the_expected_code_first(index, query, code):
+    hits = index.search(query)
+    assert hits[0]["code"] == code
+    assert [h["score"] for h in hits] == sorted((h["score"] for h in hits), reverse=True)
+
+
+def test_six_digit_query_is_an_exact_lookup(index):
+    assert [h["code"] for h in index.search("541511")] == ["541511"]
+    assert index.search("999999") == []
+    assert index.lookup("999999") is None
+    assert index.lookup(" 541511 ")["formatted"].startswith("541511 - Custom Computer Programming Services")
+
+
+@pytest.mark.parametrize("query", ["", "qwertyuiop", "the and of"])
+def test_no_match_returns_an_empty_list(index, query):
+    assert index.search(query) == []
+
+
+def test_k_limits_the_hits(index):
+    assert len(index.search("farming", k=2)) == 2
+
+
+def test_tokenize_drops_stopwords_and_stems():
+    assert tokenize("Bakeries and Cleaning services") == ["bakery", "clean"]
+
+
+def test_title_terms_outweigh_index_terms(tmp_path):
+    catalog = tmp_path / "naics.tsv"
+    catalog.write_text(
+        "# code\ttitle\tsummary\tindex terms\n"
+        "100001\tWidget Making\tMaking things.\tgadget\n"
+        "100002\tGadget Making\tMaking things.\twidget\n",
+        encoding="utf-8",
+    )
+    index = NaicsIndex(str(catalog))
+    assert index.search("widget")[0]["code"] == "100001"
+    assert index.search("gadget")[0]["code"] == "100002"
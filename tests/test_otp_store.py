@@ -0,0 +1,70 @@
+import pytest
+
+import otp_store
+from otp_store import OtpStore
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(otp_store.time, "time", lambda: now[0])
+    return now
+
+
+def test_get_returns_live_entries_and_drops_expired_ones(clock):
+    store = OtpStore()
+    store.put("conv_a", {"otp_code": "123456"}, ttl=60)
+    clock[0] += 59
+    assert store.get("conv_a")["otp_code"] == "123456"
+    clock[0] += 1
+    assert store.get("conv_a") is None
+    assert len(store) == 0
+
+
+def test_put_sweeps_other_expired_keys(clock):
+    store = OtpStore()
+    store.put("old", {}, ttl=10)
+    clock[0] += 10
+    store.put("new", {}, ttl=10)
+    assert len(store) == 1
+    assert store.get("new") is not None
+
+
+def test_sweep_removes_only_due_entries():
+    store = OtpStore()
+    store.put("a", {}, ttl=10)
+    store.put("b", {}, ttl=100)
+    assert store.sweep(now=0) == 0
+    assert store.sweep(now=otp_store.time.time() + 50) == 1
+    assert len(store) == 1
+
+
+def test_overwriting_a_key_extends_it_and_skips_the_stale_expiry(clock):
+    store = OtpStore()
+    store.put("conv_a", {"otp_code": "111111"}, ttl=10)
+    clock[0] += 5
+    store.put("conv_a", {"otp_code": "222222"}, ttl=10)
+    clock[0] += 6
+    # The first put's heap item is due now but no longer matches the entry
+    assert store.sweep() == 0
+    assert store.get("conv_a")["otp_code"] == "222222"
+    clock[0] += 4
+    assert store.get("conv_a") is None
+
+
+def test_stale_heap_items_are_compacted(clock):
+    store = OtpStore()
+    for i in range(200):
+        clock[0] += 1
+        store.put("busy", {"n": i}, ttl=600)
+    assert len(store) == 1
+    assert len(store._heap) <= 2 * len(store) + 64 + 1
+
+
+def test_pop_removes_the_entry(clock):
+    store = OtpStore()
+    store.put("conv_a", {}, ttl=10)
+    assert store.pop("conv_a") is not None
+    assert store.pop("conv_a") is None
+    clock[0] += 10
+    assert store.sweep() == 0
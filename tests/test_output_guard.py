@@ -0,0 +1,51 @@
+from output_guard import OutputGuard, TableScanner
+
+SNAPSHOT = "| Field Name | Value |\n| --- | --- |\n| Full Name | Jane Doe |"
+
+
+def test_tables_get_blank_lines_a_separator_and_even_rows():
+    text, fixes = OutputGuard.apply("Here you go:\n  | A | B |\n| 1 | 2 | 3 |\n| 4 |\nNext step")
+    assert text == "Here you go:\n\n| A | B |\n| --- | --- |\n| 1 | 2 • 3 |\n| 4 |  |\n\nNext step"
+    assert fixes["separators_added"] == 1
+    assert fixes["cells_merged"] == 1 and fixes["cells_padded"] == 1
+    assert fixes["table_indent_removed"] == 1
+    assert fixes["blank_lines_added"] == 2
+
+
+def test_bold_and_html_are_rewritten():
+    text, fixes = OutputGuard.apply("**Note:** <b>one</b><br>two <span>three</span>\n| A |\n| --- |\n| x<br>y |")
+    assert text == "__Note:__ __one__  \ntwo three\n\n| A |\n| --- |\n| x • y |"
+    assert fixes["bold_converted"] == 1
+
+
+def test_only_the_last_snapshot_is_kept_at_the_end():
+    first = SNAPSHOT.replace("Jane Doe", "Old Name")
+    text, fixes = OutputGuard.apply(f"{first}\nWhat is your email?\n{SNAPSHOT}\nThanks!")
+    assert text == f"What is your email?\nThanks!\n\n{SNAPSHOT}"
+    assert fixes["snapshots_dropped"] == 1
+
+
+def test_role_rows_are_capped():
+    text, fixes = OutputGuard.apply("| Field Name | Value |\n| --- | --- |\n| Members | A • B • C • D |\n| Business Name | A • B • C • D |")
+    assert "| Members | A • B • C |" in text
+    assert "| Business Name | A • B • C • D |" in text
+    assert fixes["role_rows_capped"] == 1
+
+
+def test_server_rendered_modes_drop_every_model_snapshot():
+    text, fixes = OutputGuard.apply(f"Hello\n{SNAPSHOT}", drop_snapshots=True)
+    assert text == "Hello"
+    assert fixes == {"snapshots_dropped": 1}
+
+
+def test_fenced_code_is_untouched():
+    raw = "```\n**x** | a | b |\n| 1 |\n```"
+    assert OutputGuard.apply(raw) == (raw, {})
+
+
+def test_streaming_holds_tables_until_their_last_row():
+    scanner = TableScanner()
+    assert scanner.feed("Hi\n| A ") == "Hi\n"
+    assert scanner.feed("| B |\n| --- | --- |\n| 1 | 2 |") == ""
+    assert scanner.feed("\nbye") == ""
+    assert scanner.close() == "\n| A | B |\n| --- | --- |\n| 1 | 2 |\n\nbye\n"
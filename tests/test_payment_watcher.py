@@ -0,0 +1,62 @@
+from payment_watcher import PaymentWatcher
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_final_status_stops_watching_without_new_stripe_calls():
+    calls = []
+    clock = _Clock()
+    watcher = PaymentWatcher(check_status=lambda cid: calls.append(cid) or "completed", clock=clock)
+    watcher.watch("conv_1")
+
+    clock.now = 10
+    assert watcher.poll("conv_1") == "completed"
+    assert "conv_1" not in watcher._entries
+    # Late tabs get the cached status and the same summary
+    clock.now = 100
+    assert watcher.poll("conv_1") == "completed"
+    assert calls == ["conv_1"]
+    built = []
+    assert watcher.summary_once("conv_1", lambda: built.append(1) or "paid") == "paid"
+    assert watcher.summary_once("conv_1", lambda: built.append(1) or "again") == "paid"
+    assert built == [1]
+
+
+def test_record_status_and_unwatch_drop_the_entry():
+    watcher = PaymentWatcher(check_status=lambda cid: "pending", clock=_Clock())
+    watcher.watch("conv_1")
+    watcher.record_status("conv_1", "failed")
+    assert "conv_1" not in watcher._entries
+    assert watcher.poll("conv_1") == "failed"
+
+    watcher.watch("conv_2")
+    watcher.unwatch("conv_2")
+    assert "conv_2" not in watcher._entries
+
+    # A new link after a failure is watched again
+    watcher.watch("conv_1")
+    assert watcher.poll("conv_1") == "pending"
+
+
+def test_poll_ignores_conversations_that_are_not_watched():
+    calls = []
+    watcher = PaymentWatcher(check_status=lambda cid: calls.append(cid) or "pending", clock=_Clock())
+    assert watcher.poll("conv_1") == "unknown"
+    watcher.watch("conv_2")
+    watcher.unwatch("conv_2")
+    assert watcher.poll("conv_2") == "unknown"
+    assert watcher._entries == {} and calls == []
+
+
+def test_recorded_pending_status_is_polled_until_final():
+    clock = _Clock()
+    watcher = PaymentWatcher(check_status=lambda cid: "completed", clock=clock)
+    watcher.record_status("conv_1", "pending")
+    assert watcher.poll("conv_1") == "completed"
+    assert "conv_1" not in watcher._entries
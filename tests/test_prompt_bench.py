@@ -0,0 +1,28 @@
+import json
+import os
+
+from prompt_bench import Cassette, fingerprint
+
+
+def _turns(directory, name):
+    with open(os.path.join(directory, fingerprint(), f"{name}.json"), encoding="utf-8") as f:
+        return json.load(f)["turns"]
+
+
+def test_cassette_starts_fresh_for_each_recording_run(tmp_path):
+    directory = str(tmp_path)
+    turn = {"mode": "BASE", "user": "hi", "assistant": "hello"}
+    assert Cassette.record(directory, "llc_single_member", "conv_1", turn)
+    assert Cassette.record(directory, "llc_single_member", "conv_1", turn)
+    assert len(_turns(directory, "llc_single_member")) == 2
+
+    # Re-recording the same script in a new session replaces the old turns
+    assert Cassette.record(directory, "llc_single_member", "conv_2", turn)
+    assert len(_turns(directory, "llc_single_member")) == 1
+
+
+def test_cassette_requires_a_name_and_run_id(tmp_path):
+    turn = {"mode": "BASE", "user": "hi", "assistant": "hello"}
+    assert not Cassette.record(str(tmp_path), None, None, turn)
+    assert not Cassette.record(str(tmp_path), "script", None, turn)
+    assert not os.listdir(tmp_path)
@@ -0,0 +1,29 @@
+import pytest
+
+import prompt_fragments
+from base_prompt import BasePrompt
+from prompt_fragments import REASSURANCE, check_equivalence, compare_to_baseline, compose
+
+
+def test_assembled_prompts_match_the_pre_refactor_baseline():
+    assert check_equivalence() == []
+
+
+def test_losing_a_fragment_is_reported():
+    dropped = prompt_fragments._dropped()["base"]
+    text = BasePrompt.get_mode_prompt().replace(REASSURANCE, "")
+    problems = compare_to_baseline("base", text, dropped)
+    assert any("fragment:REASSURANCE" in p for p in problems)
+
+
+def test_losing_an_unlisted_line_is_reported():
+    text = BasePrompt.get_mode_prompt()
+    line = next(l for l in prompt_fragments._lines(prompt_fragments.baseline_prompt("base").decode("utf-8"))
+                if l in text and l not in prompt_fragments._dropped()["base"])
+    problems = compare_to_baseline("base", text.replace(line, ""), prompt_fragments._dropped()["base"])
+    assert any("pre-refactor line lost" in p for p in problems)
+
+
+def test_unknown_marker_is_an_error():
+    with pytest.raises(KeyError):
+        compose("@@NOT_A_FRAGMENT@@")
@@ -0,0 +1,45 @@
+import pytest
+
+from payment_service import PaymentService
+from quote_engine import QuoteEngine
+from stripe_catalog import PLANS
+
+
+def test_quote_adds_plan_price_and_state_fee_in_cents():
+    quote = QuoteEngine.get_quote("Classic", None, "Delaware", "LLC")
+    fee = PaymentService.state_fee_lookup("Delaware", "LLC")["stateFilingFeeCents"]
+    assert quote["billingCycle"] == "yearly"
+    assert quote["planPriceCents"] == PLANS[("Classic", "yearly")]
+    assert quote["stateFilingFeeCents"] == fee
+    assert quote["totalDueNowCents"] == PLANS[("Classic", "yearly")] + fee
+    assert quote["totalDueNow"] == quote["totalDueNowCents"] / 100
+
+
+def test_plan_names_are_normalized():
+    assert QuoteEngine.get_quote("premium plan", "yearly", "Texas", "C-Corp")["productName"] == "Premium"
+    assert QuoteEngine.get_quote("Elite", "MONTHLY", "Texas", "LLC")["planPriceCents"] == PLANS[("Elite", "monthly")]
+
+
+@pytest.mark.parametrize("plan, cycle, error", [
+    ("Gold", "yearly", "unknown_plan"),
+    ("Elite", None, "billing_cycle_required"),
+    ("Premium", "monthly", "billing_cycle_unavailable"),
+])
+def test_plan_errors(plan, cycle, error):
+    assert QuoteEngine.get_quote(plan, cycle, "Delaware", "LLC")["error"] == error
+
+
+def test_misspelled_state_is_corrected():
+    quote = QuoteEngine.get_quote("Classic", "yearly", "Califronia", "llc")
+    assert quote["state"] == "California"
+    assert quote["entity_type"] == "LLC"
+    assert quote["correctedFrom"] == "Califronia"
+
+
+def test_missing_state_is_an_error():
+    assert QuoteEngine.get_quote("Classic", "yearly", "", "LLC")["error"] == "missing_params"
+
+
+@pytest.mark.parametrize("cents, text", [(29900, "$299"), (123456, "$1,234.56"), (5, "$0.05")])
+def test_format_usd(cents, text):
+    assert QuoteEngine.format_usd(cents) == text
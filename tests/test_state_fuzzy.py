@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from state_fuzzy import AUTO_CORRECT_CONFIDENCE, correct_state, edit_distance, match_state
+
+
+@pytest.mark.parametrize("raw, name", [
+    ("Texas", "Texas"),
+    ("TX", "Texas"),
+    ("N. Carolina", "North Carolina"),
+    ("wash dc", "Washington, DC"),
+    ("Calfornia", "California"),
+    ("Missisippi", "Mississippi"),
+    ("Nw York", "New York"),
+    ("texsa", "Texas"),
+])
+def test_spellings_resolve_to_the_state(raw, name):
+    match = match_state(raw)
+    assert match.name == name
+    assert match.confidence >= AUTO_CORRECT_CONFIDENCE
+    assert correct_state(raw) == name
+
+
+def test_exact_aliases_have_full_confidence():
+    assert match_state("n carolina").confidence == 1.0
+    assert match_state("Calfornia").confidence < 1.0
+
+
+@pytest.mark.parametrize("raw", ["", None, "zzzz"])
+def test_no_match(raw):
+    assert match_state(raw).name is None
+    assert correct_state(raw) is None
+
+
+def test_low_confidence_is_only_a_suggestion():
+    match = match_state("Kansas City")
+    assert match.name == "Kansas"
+    assert match.confidence < AUTO_CORRECT_CONFIDENCE
+    assert correct_state("Kansas City") is None
+
+
+def _reference_distance(a, b):
+    # Optimal string alignment distance, the textbook table
+    d = [[i + j if i * j == 0 else 0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[len(a)][len(b)]
+
+
+def test_edit_distance_matches_the_table_version():
+    rng = random.Random(7)
+    for _ in range(500):
+        a = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 8)))
+        b = "".join(rng.choice("abcd") for _ in range(rng.randint(0, 8)))
+        assert edit_distance(a, b) == _reference_distance(a, b), (a, b)
@@ -0,0 +1,50 @@
+from token_metrics import TokenMetrics
+
+
+def test_handoffs_without_a_session_id_are_not_pooled():
+    metrics = TokenMetrics()
+    assert metrics.record_handoff(None, "Base", "LLC") == 0
+    assert metrics.record_handoff("", "Base", "LLC") == 0
+    assert metrics.record_handoff("conv_a", "Base", "LLC") == 1
+
+    assert "handoffs" not in metrics.snapshot(None)
+    assert "handoffs" not in metrics.snapshot("")
+    assert metrics.snapshot("conv_a")["handoffs"]["turns_saved"] == 1
+    assert metrics.snapshot("conv_a")["turns_saved"] == 3
+
+
+def test_register_agents_measures_wrapped_static_instructions():
+    class Agent:
+        def __init__(self, name, instructions):
+            self.name, self.instructions, self.model = name, instructions, "gpt-4o"
+
+    def wrapped(ctx, agent):
+        return "You are the base assistant."
+    wrapped.static_instructions = "You are the base assistant."
+
+    def dynamic(ctx, agent):
+        return "step prompt"
+
+    sizes = TokenMetrics().register_agents([Agent("Base", wrapped), Agent("LLC", dynamic), Agent("Pay", "plain text")])
+    assert sizes["Base"]["chars"] == len("You are the base assistant.")
+    assert sizes["LLC"]["tokens"] is None
+    assert sizes["Pay"]["chars"] == len("plain text")
+
+
+def test_per_conversation_counters_keep_only_recent_conversations():
+    from types import SimpleNamespace
+
+    usage = SimpleNamespace(requests=1, input_tokens=100, output_tokens=10, input_tokens_details=None)
+    result = SimpleNamespace(context_wrapper=SimpleNamespace(usage=usage))
+    metrics = TokenMetrics()
+    metrics.KEEP_CONVERSATIONS = 2
+    for conv in ("conv_a", "conv_b", "conv_a", "conv_c"):
+        metrics.record_run(conv, "Base", "gpt-4o", result)
+        metrics.record_handoff(conv, "Base", "LLC")
+
+    # conv_b was the least recently active
+    assert "conversation" not in metrics.snapshot("conv_b")
+    assert "handoffs" not in metrics.snapshot("conv_b")
+    assert metrics.snapshot("conv_a")["conversation"]["total"]["runs"] == 2
+    assert metrics.snapshot("conv_c")["handoffs"]["turns_saved"] == 1
+    assert metrics.snapshot()["agents"]["Base"]["runs"] == 4
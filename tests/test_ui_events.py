@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+from ui_events import (
+    ENTITY_SWITCHED, OTP_DELIVERY_FAILED, OTP_SENT, PAYMENT_LINK_PENDING, PAYMENT_LINK_READY, UiEvents,
+)
+
+
+def test_emit_queues_per_session_and_drain_empties_it():
+    session, other = SimpleNamespace(), SimpleNamespace()
+    UiEvents.emit(session, OTP_SENT, email="jane@x.com")
+    UiEvents.emit(session, ENTITY_SWITCHED, old="BASE", new="LLC")
+    assert [e["type"] for e in UiEvents.drain(session)] == [OTP_SENT, ENTITY_SWITCHED]
+    assert UiEvents.drain(session) == []
+    assert UiEvents.drain(other) == []
+
+
+def test_payment_link_renders_amounts_and_url():
+    text = UiEvents.render({
+        "type": PAYMENT_LINK_READY, "url": "https://checkout.example/abc", "productName": "Classic",
+        "price": 299, "billingCycle": "yearly", "stateFilingFee": 90, "totalDueNow": 389,
+    })
+    assert "Total Due Now: $389.00" in text
+    assert "Plan: Classic — $299.00/yearly" in text
+    assert "State filing fees: $90.00" in text
+    assert "https://checkout.example/abc" in text
+
+
+def test_pending_link_and_unknown_amount():
+    text = UiEvents.render({"type": PAYMENT_LINK_PENDING, "url": "https://checkout.example/abc", "totalDueNow": None})
+    assert "(— due)" in text and text.endswith("https://checkout.example/abc")
+
+
+def test_entity_switch_and_otp_events():
+    assert UiEvents.render({"type": ENTITY_SWITCHED, "old": "BASE", "new": "C-CORP"}) == "🔁 _Entity type switched: General → C-Corp_"
+    assert "jane@x.com" in UiEvents.render({"type": OTP_SENT, "email": "jane@x.com"})
+    assert "couldn't deliver" in UiEvents.render({"type": OTP_DELIVERY_FAILED, "email": "jane@x.com", "status": "failed"})
+
+
+def test_render_all_skips_unknown_events():
+    events = [{"type": "something_else"}, {"type": OTP_SENT, "email": "jane@x.com"}]
+    assert UiEvents.render_all(events) == UiEvents.render(events[1])
+    assert UiEvents.render_all([]) == ""
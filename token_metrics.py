@@ -0,0 +1,245 @@
+# token_metrics.py
+"""
+Token accounting for the agents: instruction sizes at startup and per-run usage.
+
+  - count_tokens(text): exact with tiktoken (o200k_base, the gpt-4o encoding) when it is
+    installed, otherwise an offline estimate that follows the same pre-tokenization
+    (words, punctuation runs, whitespace, non-ASCII)
+  - TokenMetrics: thread-safe per-agent / per-conversation counters fed from
+    RunResult.context_wrapper.usage, with estimated cost from PRICING
+"""
+import math
+import re
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+try:
+    import tiktoken  # optional
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:  # not installed / no cached encoding
+    _ENCODING = None
+
+TOKENIZER = "o200k_base" if _ENCODING is not None else "estimate"
+
+# USD per 1M tokens: (input, cached input, output)
+PRICING: Mapping[str, Tuple[float, float, float]] = MappingProxyType({
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+})
+DEFAULT_MODEL = "gpt-4o"
+
+# Same split o200k applies before BPE: letter runs (with one leading space/apostrophe),
+# digit groups of up to 3, punctuation runs, newlines, other whitespace
+_PIECES = re.compile(r" ?[A-Za-z]+|'[a-z]+|\d{1,3}| ?[^\sA-Za-z\d]+|\s*\n+|\s+")
+# Average characters per BPE token inside one piece of each kind
+_WORD_CHARS = 7.0
+_PUNCT_CHARS = 2.0
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """Token count of `text` for gpt-4o (exact with tiktoken, estimated otherwise)."""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    n = 0
+    for piece in _PIECES.findall(text):
+        core = piece.lstrip(" ")
+        if not core or core.isspace():
+            n += 1
+        elif core[0].isalpha() or core[0] == "'":
+            n += math.ceil(len(core) / _WORD_CHARS)
+        elif core[0].isdigit():
+            n += 1
+        else:
+            ascii_len = sum(1 for c in core if ord(c) < 128)
+            n += math.ceil(ascii_len / _PUNCT_CHARS) + (len(core) - ascii_len)
+    return n
+
+
+def estimate_cost(model: Optional[str], input_tokens: int, cached_tokens: int, output_tokens: int) -> float:
+    """USD for one usage record; cached input is billed at the cached rate."""
+    price_in, price_cached, price_out = PRICING.get(model or DEFAULT_MODEL, PRICING[DEFAULT_MODEL])
+    uncached = max(input_tokens - cached_tokens, 0)
+    return (uncached * price_in + cached_tokens * price_cached + output_tokens * price_out) / 1_000_000
+
+
+def _new_counter() -> Dict[str, Any]:
+    return {"runs": 0, "requests": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0, "cost_usd": 0.0}
+
+
+def _touch(table: "OrderedDict[str, Dict[str, Any]]", key: str, new: Callable[[], Dict[str, Any]], keep: int) -> Dict[str, Any]:
+    """LRU get-or-create: `key` becomes the most recent entry; the oldest beyond `keep` are dropped."""
+    entry = table.get(key)
+    if entry is None:
+        entry = table[key] = new()
+        while len(table) > keep:
+            table.popitem(last=False)
+    else:
+        table.move_to_end(key)
+    return entry
+
+
+class TokenMetrics:
+    """
+    Process-wide token counters for every agent and for the KEEP_CONVERSATIONS most recently
+    active conversations (older ones are dropped; agent totals keep counting them).
+
+    Public methods used by the app:
+      - register_agents(agents) -> dict          # instruction sizes, logged at startup
+      - record_run(conversation_id, agent_name, model, result) -> dict
+      - record_handoff(conversation_id, from_agent, to_agent) -> int   # same-turn re-dispatch
+      - snapshot(conversation_id=None) -> dict
+      - render_markdown(conversation_id=None) -> str
+    """
+
+    KEEP_CONVERSATIONS = 1000
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._instructions: Dict[str, Dict[str, Any]] = {}
+        self._agents: Dict[str, Dict[str, Any]] = {}
+        self._conversations: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Same-turn handoffs: each one is a user turn the mode switch no longer costs
+        self._handoffs: Dict[str, Any] = {"total": 0, "conversations": OrderedDict()}
+
+    # ---------- API ----------
+    def register_agents(self, agents: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Measure each agent's static instructions once; callable instructions are measured per run.
+        A callable that wraps static text exposes it as `static_instructions` and is measured by it.
+        """
+        sizes = {}
+        for agent in agents:
+            text = agent.instructions
+            if callable(text):
+                text = getattr(text, "static_instructions", None)
+            text = text if isinstance(text, str) else None
+            sizes[agent.name] = {
+                "model": getattr(agent, "model", None) or DEFAULT_MODEL,
+                "chars": len(text) if text is not None else None,
+                "bytes": len(text.encode("utf-8")) if text is not None else None,
+                "tokens": count_tokens(text) if text is not None else None,
+            }
+        with self._lock:
+            self._instructions.update(sizes)
+        for name, s in sizes.items():
+            if s["tokens"] is None:
+                print(f"[METRICS] 📏 {name}: dynamic instructions (measured per turn)")
+            else:
+                per_turn = estimate_cost(s["model"], s["tokens"], 0, 0)
+                print(f"[METRICS] 📏 {name}: {s['bytes']:,} bytes ≈ {s['tokens']:,} tokens ({TOKENIZER}) "
+                      f"≈ ${per_turn:.4f}/request uncached")
+        return sizes
+
+    def set_instruction_size(self, agent_name: str, text: str) -> Dict[str, Any]:
+        """Latest per-turn size for agents whose instructions are built dynamically."""
+        with self._lock:
+            entry = self._instructions.setdefault(agent_name, {"model": DEFAULT_MODEL})
+            entry.update(chars=len(text), bytes=len(text.encode("utf-8")), tokens=count_tokens(text))
+            return dict(entry)
+
+    def record_run(self, conversation_id: Optional[str], agent_name: str, model: Optional[str], result: Any) -> Dict[str, Any]:
+        """Add one Runner.run result's usage (all model requests in the run) to the counters."""
+        usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+        if usage is None:
+            return {}
+        details = getattr(usage, "input_tokens_details", None)
+        delta = {
+            "requests": int(getattr(usage, "requests", 0) or 0),
+            "input_tokens": int(getattr(usage, "input_tokens", 0) or 0),
+            "cached_tokens": int(getattr(details, "cached_tokens", 0) or 0),
+            "output_tokens": int(getattr(usage, "output_tokens", 0) or 0),
+        }
+        delta["cost_usd"] = estimate_cost(model, delta["input_tokens"], delta["cached_tokens"], delta["output_tokens"])
+        with self._lock:
+            targets = [self._agents.setdefault(agent_name, _new_counter())]
+            if conversation_id:
+                conv = _touch(
+                    self._conversations, conversation_id,
+                    lambda: {"total": _new_counter(), "agents": {}}, self.KEEP_CONVERSATIONS,
+                )
+                targets += [conv["total"], conv["agents"].setdefault(agent_name, _new_counter())]
+            for counter in targets:
+                counter["runs"] += 1
+                for key, value in delta.items():
+                    counter[key] += value
+        print(f"[METRICS] 🧮 {agent_name} run: requests={delta['requests']} in={delta['input_tokens']:,} "
+              f"(cached {delta['cached_tokens']:,}) out={delta['output_tokens']:,} ≈ ${delta['cost_usd']:.4f}")
+        return delta
+
+    def record_handoff(self, conversation_id: Optional[str], from_agent: str, to_agent: str) -> int:
+        """Count one same-turn re-dispatch; returns the conversation's turns saved so far."""
+        route = f"{from_agent} → {to_agent}"
+        with self._lock:
+            self._handoffs["total"] += 1
+            if not conversation_id:
+                # No real id yet: count it globally but never pool anonymous sessions into one bucket
+                saved = 0
+            else:
+                conv = _touch(
+                    self._handoffs["conversations"], conversation_id,
+                    lambda: {"turns_saved": 0, "routes": {}}, self.KEEP_CONVERSATIONS,
+                )
+                conv["turns_saved"] += 1
+                conv["routes"][route] = conv["routes"].get(route, 0) + 1
+                saved = conv["turns_saved"]
+        print(f"[METRICS] 🔀 handoff {route}: {saved} turn(s) saved in this conversation")
+        return saved
+
+    def snapshot(self, conversation_id: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            out = {
+                "tokenizer": TOKENIZER,
+                "instructions": {k: dict(v) for k, v in self._instructions.items()},
+                "agents": {k: dict(v) for k, v in self._agents.items()},
+                "turns_saved": self._handoffs["total"],
+            }
+            handoffs = self._handoffs["conversations"].get(conversation_id) if conversation_id else None
+            if handoffs is not None:
+                out["handoffs"] = {"turns_saved": handoffs["turns_saved"], "routes": dict(handoffs["routes"])}
+            conv = self._conversations.get(conversation_id) if conversation_id else None
+            if conv is not None:
+                out["conversation"] = {
+                    "id": conversation_id,
+                    "total": dict(conv["total"]),
+                    "agents": {k: dict(v) for k, v in conv["agents"].items()},
+                }
+        return out
+
+    def render_markdown(self, conversation_id: Optional[str] = None) -> str:
+        snap = self.snapshot(conversation_id)
+        lines = [
+            f"**Instruction sizes** (tokenizer: {snap['tokenizer']})",
+            "",
+            "| Agent | Bytes | Tokens |",
+            "|---|---:|---:|",
+        ]
+        for name, s in snap["instructions"].items():
+            bytes_ = f"{s['bytes']:,}" if s.get("bytes") is not None else "dynamic"
+            tokens = f"{s['tokens']:,}" if s.get("tokens") is not None else "dynamic"
+            lines.append(f"| {name} | {bytes_} | {tokens} |")
+
+        def usage_table(title: str, rows: Mapping[str, Dict[str, Any]]) -> None:
+            lines.extend(["", f"**{title}**", "",
+                          "| Agent | Runs | Requests | Input | Cached | Output | Est. cost |",
+                          "|---|---:|---:|---:|---:|---:|---:|"])
+            for name, c in rows.items():
+                lines.append(f"| {name} | {c['runs']} | {c['requests']} | {c['input_tokens']:,} | "
+                             f"{c['cached_tokens']:,} | {c['output_tokens']:,} | ${c['cost_usd']:.4f} |")
+
+        if "conversation" in snap:
+            conv = snap["conversation"]
+            usage_table("This conversation", {**conv["agents"], "**Total**": conv["total"]})
+        if snap["agents"]:
+            usage_table("All conversations (since start)", snap["agents"])
+        if snap["turns_saved"]:
+            conv_saved = snap.get("handoffs", {"turns_saved": 0, "routes": {}})
+            routes = " • ".join(f"{route} ×{n}" for route, n in conv_saved["routes"].items())
+            lines.extend(["", f"**Same-turn handoffs:** {conv_saved['turns_saved']} turn(s) saved in this conversation"
+                          + (f" ({routes})" if routes else "") + f" • {snap['turns_saved']} since start"])
+        return "\n".join(lines)
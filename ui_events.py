@@ -0,0 +1,89 @@
+# ui_events.py
+"""
+Typed events from tools to the Gradio layer.
+
+Tools call `UiEvents.emit(session, kind, **data)`; after the run, `respond()` drains the
+session's queue and renders each event itself, so nothing has to be parsed out of the
+model's reply (and the model never writes URLs or amounts for the UI).
+
+Event kinds:
+  - payment_link_ready   {url, productName, price, billingCycle, stateFilingFee, totalDueNow, reused}
+  - payment_link_pending {url, totalDueNow}          # reminder while awaiting payment
+  - entity_switched      {old, new}
+  - otp_sent             {email}
+  - otp_delivery_failed  {email, status, error}     # outbox gave up (failed / expired)
+"""
+from typing import Any, Dict, List, Optional
+
+PAYMENT_LINK_READY = "payment_link_ready"
+PAYMENT_LINK_PENDING = "payment_link_pending"
+ENTITY_SWITCHED = "entity_switched"
+OTP_SENT = "otp_sent"
+OTP_DELIVERY_FAILED = "otp_delivery_failed"
+
+_ENTITY_LABELS = {"BASE": "General", "LLC": "LLC", "C-CORP": "C-Corp", "S-CORP": "S-Corp", "PAYMENT": "Payment"}
+
+
+def _usd(amount: Any) -> str:
+    try:
+        return f"${float(amount):,.2f}"
+    except (TypeError, ValueError):
+        return "—"
+
+
+class UiEvents:
+    """
+    Public methods used by the app:
+      - emit(session, kind, **data) -> dict
+      - drain(session) -> list
+      - render(event) -> str
+      - render_all(events) -> str
+    """
+
+    @staticmethod
+    def emit(session: Any, kind: str, **data: Any) -> Dict[str, Any]:
+        event = {"type": kind, **data}
+        queue = getattr(session, "ui_events", None)
+        if queue is None:
+            queue = []
+            setattr(session, "ui_events", queue)
+        queue.append(event)
+        print(f"[UI EVENT] 📣 {kind} {({k: v for k, v in data.items() if k != 'url'})}")
+        return event
+
+    @staticmethod
+    def drain(session: Any) -> List[Dict[str, Any]]:
+        queue = getattr(session, "ui_events", None) or []
+        setattr(session, "ui_events", [])
+        return queue
+
+    @staticmethod
+    def render(event: Dict[str, Any]) -> Optional[str]:
+        kind = event.get("type")
+        if kind == PAYMENT_LINK_READY:
+            return (
+                "🔗 **Your secure payment link is ready!**\n\n"
+                f"**Total Due Now: {_usd(event.get('totalDueNow'))}**\n"
+                f"- Plan: {event.get('productName')} — {_usd(event.get('price'))}/{event.get('billingCycle') or 'yearly'}\n"
+                f"- State filing fees: {_usd(event.get('stateFilingFee'))}\n\n"
+                f"**Click here to complete your payment:**\n{event.get('url')}\n\n"
+                "Once you complete payment, return here and I'll automatically verify your payment status."
+            )
+        if kind == PAYMENT_LINK_PENDING:
+            return f"🔗 Your secure payment link is still open ({_usd(event.get('totalDueNow'))} due): {event.get('url')}"
+        if kind == ENTITY_SWITCHED:
+            old = _ENTITY_LABELS.get(event.get("old"), event.get("old"))
+            new = _ENTITY_LABELS.get(event.get("new"), event.get("new"))
+            return f"🔁 _Entity type switched: {old} → {new}_"
+        if kind == OTP_SENT:
+            return f"✉️ _Verification code sent to {event.get('email')}_"
+        if kind == OTP_DELIVERY_FAILED:
+            return (
+                f"⚠️ _We couldn't deliver the verification code to {event.get('email')}. "
+                "Please check the address or ask me to send a new code._"
+            )
+        return None
+
+    @classmethod
+    def render_all(cls, events: List[Dict[str, Any]]) -> str:
+        return "\n\n".join(block for block in (cls.render(e) for e in events) if block)
@@ -0,0 +1,64 @@
+# validation_utils.py
+"""
+Small parsing helpers shared by the intake validators (corp structure, LLC members).
+"""
+import re
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional
+
+from address_normalizer import AddressNormalizer
+
+_NUMBER_NOISE = re.compile(r"[\s,$%_]")
+
+
+def issue(code: str, field: str, message: str) -> Dict[str, str]:
+    """One violation / warning row: {"code", "field", "message"}."""
+    return {"code": code, "field": field, "message": message}
+
+
+def name_key(name: Optional[str]) -> str:
+    """Case/space/punctuation-insensitive identity for people ('Jane  Doe.' == 'jane doe')."""
+    return " ".join(re.sub(r"[^\w\s'-]", " ", (name or "").casefold()).split())
+
+
+def clean_name(name: Optional[str]) -> str:
+    return " ".join((name or "").split()).strip(" ,")
+
+
+def check_address(raw: Optional[str], field: str, name: str, errors: List[Dict[str, str]]) -> Optional[str]:
+    """Normalize a person's mailing address; appends scoped errors and returns None when unusable."""
+    if not (raw or "").strip():
+        errors.append(issue("address_missing", field + ".address", f"Please provide {name}'s mailing address (no PO boxes)."))
+        return None
+    result = AddressNormalizer.normalize(raw)
+    for e in result["errors"]:
+        errors.append(issue(e["code"], field + ".address", f"{name}: {e['message']}"))
+    return result["normalized"]
+
+
+def parse_decimal(value: Any) -> Optional[Decimal]:
+    """'$0.01' / '33.33%' / '1,500' / 12 -> Decimal; None when absent or not a finite number."""
+    if value is None or isinstance(value, bool):
+        return None
+    s = _NUMBER_NOISE.sub("", str(value))
+    if not s:
+        return None
+    try:
+        d = Decimal(s)
+    except InvalidOperation:
+        return None
+    return d if d.is_finite() else None
+
+
+def parse_int(value: Any) -> Optional[int]:
+    """'1,500' / 1500 / '1500.0' -> 1500; None for fractions, blanks or non-numbers."""
+    d = parse_decimal(value)
+    if d is None or d != d.to_integral_value():
+        return None
+    return int(d)
+
+
+def fmt_decimal(d: Decimal) -> str:
+    """Decimal('33.330') -> '33.33', Decimal('100.00') -> '100'."""
+    s = format(d.normalize(), "f")
+    return s.rstrip("0").rstrip(".") if "." in s else s